@@ -0,0 +1,105 @@
+import re
+from web3 import Web3
+
+_INT_TYPE = re.compile(r"^(u?)int(\d*)$")
+_FIXED_BYTES_TYPE = re.compile(r"^bytes(\d+)$")
+
+def _pad_right(data):
+    return data + b'\x00' * (-len(data) % 32)
+
+def _encode_static(abi_type, value):
+    """32-byte head word for a static ABI type"""
+    if abi_type == 'address':
+        if isinstance(value, str):
+            value = bytes.fromhex(value[2:] if value.startswith(('0x', '0X')) else value)
+        if not isinstance(value, (bytes, bytearray)) or len(value) != 20:
+            raise ValueError(f"Invalid address value: {value!r}")
+        return bytes(12) + bytes(value)
+
+    if abi_type == 'bool':
+        if not isinstance(value, bool):
+            raise TypeError(f"Expected bool, got {type(value).__name__}")
+        return int(value).to_bytes(32, 'big')
+
+    int_match = _INT_TYPE.match(abi_type)
+    if int_match:
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise TypeError(f"Expected int for {abi_type}, got {type(value).__name__}")
+        bits = int(int_match.group(2) or 256)
+        signed = not int_match.group(1)
+        low, high = (-(1 << (bits - 1)), (1 << (bits - 1)) - 1) if signed else (0, (1 << bits) - 1)
+        if not low <= value <= high:
+            raise ValueError(f"Value {value} out of range for {abi_type}")
+        return value.to_bytes(32, 'big', signed=signed)
+
+    bytes_match = _FIXED_BYTES_TYPE.match(abi_type)
+    if bytes_match:
+        if not isinstance(value, (bytes, bytearray)) or len(value) > int(bytes_match.group(1)):
+            raise ValueError(f"Invalid {abi_type} value: {value!r}")
+        return _pad_right(bytes(value))
+
+    raise ValueError(f"Unsupported ABI type: {abi_type}")
+
+def _encode_dynamic(abi_type, value):
+    """Length-prefixed, right-padded tail for string and bytes"""
+    if abi_type == 'string':
+        if not isinstance(value, str):
+            raise TypeError(f"Expected str, got {type(value).__name__}")
+        value = value.encode('utf-8')
+    elif not isinstance(value, (bytes, bytearray)):
+        raise TypeError(f"Expected bytes, got {type(value).__name__}")
+    return len(value).to_bytes(32, 'big') + _pad_right(bytes(value))
+
+def _is_supported(abi_type):
+    if abi_type in ('string', 'bytes', 'address', 'bool'):
+        return True
+    return bool(_INT_TYPE.match(abi_type) or _FIXED_BYTES_TYPE.match(abi_type))
+
+class ContractEncoder:
+    """Calldata encoder for a contract's functions, precompiled from its ABI.
+
+    Selectors and argument types are resolved once, so encoding a call needs no
+    web3 contract machinery and no RPC. Functions taking tuple or array
+    arguments are not supported.
+    """
+
+    def __init__(self, abi):
+        self.functions = {}
+        for entry in abi:
+            if entry.get('type') != 'function':
+                continue
+
+            types = tuple(arg['type'] for arg in entry.get('inputs', []))
+            if not all(_is_supported(abi_type) for abi_type in types):
+                continue
+
+            signature = f"{entry['name']}({','.join(types)})"
+            selector = bytes(Web3.keccak(text=signature)[:4])
+            self.functions[entry['name']] = (selector, types)
+
+    def selector(self, function_name):
+        """4-byte function selector as a 0x-prefixed hex string"""
+        return '0x' + self.functions[function_name][0].hex()
+
+    def encode(self, function_name, *args):
+        """ABI-encode a call to ``function_name`` as 0x-prefixed hex calldata"""
+        if function_name not in self.functions:
+            raise ValueError(f"Function '{function_name}' is not available in the encoder")
+
+        selector, types = self.functions[function_name]
+        if len(args) != len(types):
+            raise TypeError(f"{function_name} expects {len(types)} arguments, got {len(args)}")
+
+        head = []
+        tail = []
+        tail_offset = 32 * len(types)
+        for abi_type, value in zip(types, args):
+            if abi_type in ('string', 'bytes'):
+                encoded = _encode_dynamic(abi_type, value)
+                head.append(tail_offset.to_bytes(32, 'big'))
+                tail.append(encoded)
+                tail_offset += len(encoded)
+            else:
+                head.append(_encode_static(abi_type, value))
+
+        return '0x' + (selector + b''.join(head) + b''.join(tail)).hex()
@@ -1,80 +1,42 @@
-from flask import Flask, request, jsonify
-import logging
+from flask import Flask, Response, request, jsonify
 import os
-from datetime import datetime
 from flask_cors import CORS
-import joblib
 from web3 import Web3
-import re
-import numpy as np
-from collections import Counter
 from datetime import datetime, timedelta
-import json
-import traceback
-import sys
 from admin_auth import verify_admin_credentials, generate_token, admin_required
+import time
+import metrics
+from app_logging import write_log, log_writer, create_audit_store
+from log_ingest import LogIngestor, LOG_STATUSES, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, transaction_stats
+from prediction_events import PredictionEventLog, StageTimer, prediction_log_file, parse_event_line, event_entry
+from rollups import RollupEngine, summarize, status_totals
+from event_stream import EventBroadcaster, format_sse
+from log_export import EXPORT_FORMATS, CONTENT_TYPES, export_rows, encode_chunks
+from xss_detection import create_detector, MAX_BATCH_SIZE
+from user_data_contract import CONTRACT_ADDRESS, CONTRACT_ABI, build_user_data_transaction
+from gas_oracle import GasPriceOracle
+from block_window import RecentBlockWindow
 
 app = Flask(__name__)
 CORS(app)
 
-# Ensure logs directory exists
-current_dir = os.path.dirname(os.path.abspath(__file__))
-log_dir = os.path.join(current_dir, 'logs')
-os.makedirs(log_dir, exist_ok=True)
-
-# Define log file paths
-app_log_file = os.path.join(log_dir, 'app.log')
-security_log_file = os.path.join(log_dir, 'security.log')
-
-# Create log files if they don't exist, but don't clear existing content
-if not os.path.exists(app_log_file):
-    with open(app_log_file, 'w', encoding='utf-8') as f:
-        f.write('')
-if not os.path.exists(security_log_file):
-    with open(security_log_file, 'w', encoding='utf-8') as f:
-        f.write('')
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(message)s',
-    handlers=[
-        logging.FileHandler(app_log_file, mode='a', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-# Configure werkzeug logger
-werkzeug_logger = logging.getLogger('werkzeug')
-werkzeug_logger.setLevel(logging.INFO)
-
-# Function to write logs
-def write_log(message):
-    """Write log message to file and console"""
-    logging.info(message)
-
-# Function to write security logs
-def write_security_log(message):
-    """Write security log message to both files"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    with open(security_log_file, 'a', encoding='utf-8') as f:
-        f.write(f"{timestamp} - {message}\n")
-    write_log(f"{timestamp} - {message}")
-
 # Test logging
 write_log("Server starting...")
 
 # Load vectorizer and model using joblib
 try:
-    vectorizer = joblib.load('models/vectorizer.pkl')
-    model = joblib.load('models/naive_bayes_model.pkl')
-    write_log(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Successfully loaded ML models")
+    model_load_started = time.perf_counter()
+    detector = create_detector()
+    metrics.record_model_load(time.perf_counter() - model_load_started, detector.model_version,
+                              detector.scorer.backend)
+    detector.verdict_cache.listeners.append(metrics.observe_cache_lookup)
+    write_log(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Successfully loaded ML models (version {detector.model_version}, {detector.scorer.backend} backend)")
 except Exception as e:
     write_log(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Error loading models: {str(e)}")
     raise
 
 # Connect to Ganache blockchain
-GANACHE_URL = "http://127.0.0.1:8545"
+GANACHE_URL = os.getenv('GANACHE_URL', "http://127.0.0.1:8545")
 web3 = Web3(Web3.HTTPProvider(GANACHE_URL))
 
 # Remove automatic account setting
@@ -86,137 +48,99 @@ if not web3.is_connected():
 
 write_log(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Connected to blockchain network")
 
-# Contract configuration
-CONTRACT_ADDRESS = "0x7635615a00cbC897Bd020468C4338B194C8CC948"
-CONTRACT_ABI = [
-  {
-    "anonymous": False,
-    "inputs": [
-      {
-        "indexed": True,
-        "internalType": "address",
-        "name": "userAccount",
-        "type": "address"
-      },
-      {
-        "indexed": False,
-        "internalType": "string",
-        "name": "name",
-        "type": "string"
-      },
-      {
-        "indexed": False,
-        "internalType": "string",
-        "name": "userAddress",
-        "type": "string"
-      },
-      {
-        "indexed": False,
-        "internalType": "string",
-        "name": "location",
-        "type": "string"
-      }
-    ],
-    "name": "UserDataSaved",
-    "type": "event"
-  },
-  {
-    "inputs": [
-      {
-        "internalType": "string",
-        "name": "_name",
-        "type": "string"
-      },
-      {
-        "internalType": "string",
-        "name": "_userAddress",
-        "type": "string"
-      },
-      {
-        "internalType": "string",
-        "name": "_location",
-        "type": "string"
-      }
-    ],
-    "name": "saveUserData",
-    "outputs": [],
-    "stateMutability": "nonpayable",
-    "type": "function"
-  },
-  {
-    "inputs": [],
-    "name": "getUserData",
-    "outputs": [
-      {
-        "components": [
-          {
-            "internalType": "string",
-            "name": "name",
-            "type": "string"
-          },
-          {
-            "internalType": "string",
-            "name": "userAddress",
-            "type": "string"
-          },
-          {
-            "internalType": "string",
-            "name": "location",
-            "type": "string"
-          }
-        ],
-        "internalType": "struct UserDataStorage.UserData[]",
-        "name": "",
-        "type": "tuple[]"
-      }
-    ],
-    "stateMutability": "view",
-    "type": "function",
-    "constant": True
-  },
-  {
-    "inputs": [
-      {
-        "internalType": "address",
-        "name": "_userAddress",
-        "type": "address"
-      }
-    ],
-    "name": "getUserDataByAddress",
-    "outputs": [
-      {
-        "components": [
-          {
-            "internalType": "string",
-            "name": "name",
-            "type": "string"
-          },
-          {
-            "internalType": "string",
-            "name": "userAddress",
-            "type": "string"
-          },
-          {
-            "internalType": "string",
-            "name": "location",
-            "type": "string"
-          }
-        ],
-        "internalType": "struct UserDataStorage.UserData[]",
-        "name": "",
-        "type": "tuple[]"
-      }
-    ],
-    "stateMutability": "view",
-    "type": "function",
-    "constant": True
-  }
-]
+def create_gas_oracle(w3):
+    """Gas price refreshed in the background ('interval' or 'block' mode) and read in O(1)"""
+    return GasPriceOracle(
+        w3,
+        refresh_interval=float(os.getenv('GAS_PRICE_REFRESH_INTERVAL', '5')),
+        mode=os.getenv('GAS_PRICE_REFRESH_MODE', 'interval'),
+        on_error=lambda e: metrics.RPC_ERRORS.labels('gas_price').inc()
+    )
+
+gas_oracle = create_gas_oracle(web3)
+
+def create_block_window(w3):
+    """Last RECENT_BLOCKS blocks with full transactions, advanced in the background"""
+    return RecentBlockWindow(
+        w3,
+        size=int(os.getenv('RECENT_BLOCKS', '5')),
+        refresh_interval=float(os.getenv('RECENT_BLOCKS_REFRESH_INTERVAL', '1')),
+        on_error=lambda e: metrics.RPC_ERRORS.labels('block_window').inc()
+    )
+
+block_window = create_block_window(web3)
+
+def start_chain_refreshers():
+    """Fetch the first gas price and block window and start refreshing them, so requests never wait on the node.
+
+    A node that is down here is counted and logged; the first read then tries again.
+    """
+    for refresher, call in ((gas_oracle, 'gas_price'), (block_window, 'block_window')):
+        try:
+            refresher.start()
+        except Exception as e:
+            metrics.RPC_ERRORS.labels(call).inc()
+            write_log(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Starting {call} refresh failed: {str(e)}")
 
 # Load the smart contract
 contract = web3.eth.contract(address=CONTRACT_ADDRESS, abi=CONTRACT_ABI)
 write_log("Smart contract loaded successfully")
 
+audit_store = create_audit_store()
+
+# Structured record of every /predict decision, also counted for /metrics and
+# queued for the audit store. The in-memory rollups answer /admin/stats only
+# when the audit store is disabled, as each worker sees just its own requests.
+rollups = RollupEngine()
+prediction_events = PredictionEventLog(
+    prediction_log_file, log_writer,
+    listeners=[rollups.record, metrics.observe_event] + ([audit_store.add] if audit_store is not None else [])
+)
+
+# Pushes new log entries to /admin/stream subscribers. The entries come from
+# the shared event log rather than this process, so every worker's decisions
+# reach every subscriber, and one poll per process serves all of them.
+event_broadcaster = EventBroadcaster(
+    buffer_size=int(os.getenv('ADMIN_STREAM_BUFFER', '256')),
+    poll=lambda: log_ingestor.refresh(),
+    poll_interval=float(os.getenv('ADMIN_STREAM_POLL_INTERVAL', '0.5')),
+    # Each open stream holds one of the worker's threads; keep some for /predict
+    max_subscribers=int(os.getenv('ADMIN_STREAM_MAX_SUBSCRIBERS', '2'))
+)
+
+# Seconds between keep-alive comments on an idle stream
+STREAM_HEARTBEAT_SECONDS = 15
+
+def create_log_ingestor():
+    """Incremental prediction event reader behind /admin/logs and /admin/stream"""
+    return LogIngestor(
+        prediction_log_file,
+        recent_entries=int(os.getenv('ADMIN_LOGS_RECENT', '1000')),
+        parse_line=parse_event_line,
+        listeners=[event_broadcaster.publish]
+    )
+
+log_ingestor = create_log_ingestor()
+
+def init_worker():
+    """Give a forked worker its own Web3 session, contract handle, gas price oracle, block window and log reader.
+
+    Models and the ABI encoder stay shared with the master; HTTP sessions,
+    open files and background threads must not cross a fork.
+    """
+    global web3, contract, gas_oracle, block_window, log_ingestor
+    web3 = Web3(Web3.HTTPProvider(GANACHE_URL))
+    contract = web3.eth.contract(address=CONTRACT_ADDRESS, abi=CONTRACT_ABI)
+    gas_oracle = create_gas_oracle(web3)
+    block_window = create_block_window(web3)
+    log_ingestor = create_log_ingestor()
+    start_chain_refreshers()
+
+def log_access(timer, client_ip, timestamp, path, http_status):
+    """Write the access line for a prediction decision, timed as the 'logging' stage"""
+    with timer.stage('logging'):
+        write_log(f"{client_ip} - - [{timestamp}] \"POST {path} HTTP/1.1\" {http_status} -")
+
 def get_client_ip():
     if request.headers.get('X-Forwarded-For'):
         return request.headers['X-Forwarded-For'].split(',')[0].strip()
@@ -232,7 +156,7 @@ def check_blockchain_fraud(transaction_data):
     
     try:
         # Check gas price against network average
-        avg_gas_price = web3.eth.gas_price
+        avg_gas_price = gas_oracle.get()
         if transaction_data.get('gasPrice', 0) > avg_gas_price * 2:
             fraud_indicators['high_gas_price'] = True
             
@@ -240,21 +164,21 @@ def check_blockchain_fraud(transaction_data):
         if transaction_data.get('value', 0) > web3.to_wei(100, 'ether'):
             fraud_indicators['suspicious_value'] = True
             
-        # Check for rapid transactions from same address
-        recent_blocks = [web3.eth.get_block('latest', full_transactions=True) for _ in range(5)]
-        sender_txs = sum(1 for block in recent_blocks for tx in block['transactions'] 
-                        if tx['from'] == transaction_data.get('from'))
-        if sender_txs > 10:  # More than 10 transactions in last 5 blocks
+        # Check for rapid transactions from same address, from the window's sender index
+        sender_txs = block_window.sender_count(transaction_data.get('from'))
+        if sender_txs > 10:  # More than 10 transactions in the recent block window
             fraud_indicators['rapid_transactions'] = True
             
         return fraud_indicators
         
     except Exception as e:
+        metrics.RPC_ERRORS.labels('fraud_check').inc()
         write_log(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Error in blockchain fraud check: {str(e)}")
         return fraud_indicators
 
 @app.route('/predict', methods=['POST'])
 def predict():
+    timer = StageTimer()
     try:
         # Log request details
         client_ip = request.remote_addr
@@ -265,9 +189,11 @@ def predict():
             write_log(f"{client_ip} - - [{timestamp}] \"OPTIONS /predict HTTP/1.1\" 200 -")
             return jsonify({"status": "ok"}), 200
 
-        data = request.json
+        with timer.stage('parse'):
+            data = request.json
         if not data:
-            write_log(f"{client_ip} - - [{timestamp}] \"POST /predict HTTP/1.1\" 400 -")
+            log_access(timer, client_ip, timestamp, '/predict', 400)
+            prediction_events.record(client_ip, '/predict', 400, latency=timer.latency_ms())
             return jsonify({"error": "No data provided"}), 400
 
         # Extract fields
@@ -282,127 +208,392 @@ def predict():
             'location': location
         }
         
-        for field_name, field_value in fields_to_check.items():
-            if not field_value:
-                continue
-            
-            # Transform input using vectorizer
-            X = vectorizer.transform([field_value])
-            
-            # Get prediction and confidence
-            prediction = model.predict(X)[0]
-            confidence = np.max(model.predict_proba(X)[0])
-            
-            # If ML model detects attack with high confidence
-            if prediction == 'attack' and confidence > 0.75:
-                write_log(f"{client_ip} - - [{timestamp}] \"POST /predict HTTP/1.1\" 403 -")
-                return jsonify({
-                    "error": "Security threat detected - Transaction blocked",
-                    "status": "blocked",
-                    "field": field_name,
-                    "confidence": float(confidence)
-                }), 403
+        # Score all fields in a single vectorizer/model pass
+        with timer.stage('scoring'):
+            blocked_field, confidence, stage = detector.find_blocked_field(fields_to_check, timer)
+        
+        # If ML model detects attack with high confidence
+        if blocked_field:
+            log_access(timer, client_ip, timestamp, '/predict', 403)
+            prediction_events.record(client_ip, '/predict', 403, blocked_field, confidence, stage,
+                                     detector.model_version, timer.latency_ms())
+            return jsonify({
+                "error": "Security threat detected - Transaction blocked",
+                "status": "blocked",
+                "field": blocked_field,
+                "confidence": confidence,
+                "stage": stage
+            }), 403
 
+        gas_price = None
         try:
             # Build transaction for MetaMask
-            transaction = contract.functions.saveUserData(
-                name,
-                user_address,
-                location
-            ).build_transaction({
-                'gas': 2000000,
-                'gasPrice': web3.eth.gas_price,
-                'nonce': 0,  # This will be set by MetaMask
-                'chainId': 1337  # Ganache chain ID
-            })
+            with timer.stage('gas_price'):
+                gas_price = gas_oracle.get()
+            with timer.stage('transaction'):
+                transaction_data = build_user_data_transaction(
+                    name,
+                    user_address,
+                    location,
+                    gas_price
+                )
             
-            write_log(f"{client_ip} - - [{timestamp}] \"POST /predict HTTP/1.1\" 200 -")
+            log_access(timer, client_ip, timestamp, '/predict', 200)
+            prediction_events.record(client_ip, '/predict', 200, stage=stage,
+                                     model_version=detector.model_version, latency=timer.latency_ms())
             
             return jsonify({
                 "status": "pending",
                 "message": "Please confirm the transaction in MetaMask",
-                "transaction_data": {
-                    "to": CONTRACT_ADDRESS,
-                    "data": transaction['data'],
-                    "gas": str(transaction['gas']),
-                    "gasPrice": str(transaction['gasPrice']),
-                    "chainId": transaction['chainId']
-                }
+                "stage": stage,
+                "transaction_data": transaction_data
             })
             
         except Exception as e:
-            write_log(f"{client_ip} - - [{timestamp}] \"POST /predict HTTP/1.1\" 500 -")
+            # Only reading the gas price can reach the node; the transaction is encoded locally
+            if gas_price is None:
+                metrics.RPC_ERRORS.labels('gas_price').inc()
+            else:
+                metrics.ENCODE_ERRORS.labels('/predict').inc()
+            log_access(timer, client_ip, timestamp, '/predict', 500)
+            prediction_events.record(client_ip, '/predict', 500, stage=stage,
+                                     model_version=detector.model_version, latency=timer.latency_ms())
             return jsonify({"error": f"Blockchain error: {str(e)}"}), 500
 
     except Exception as e:
-        write_log(f"{client_ip} - - [{timestamp}] \"POST /predict HTTP/1.1\" 500 -")
+        log_access(timer, client_ip, timestamp, '/predict', 500)
+        prediction_events.record(client_ip, '/predict', 500, latency=timer.latency_ms())
         return jsonify({"error": f"Error in /predict endpoint: {str(e)}"}), 500
 
-@app.route('/admin/logs', methods=['GET'])
-def get_logs():
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Score many user-data records at once and build transactions for the safe ones"""
+    timer = StageTimer()
     try:
-        with open(app_log_file, 'r') as f:
-            logs = f.readlines()
+        client_ip = request.remote_addr
+        timestamp = datetime.now().strftime('%d/%b/%Y %H:%M:%S')
+        
+        with timer.stage('parse'):
+            data = request.json
+        records = data.get('records') if isinstance(data, dict) else data
+        if not records or not isinstance(records, list):
+            log_access(timer, client_ip, timestamp, '/predict/batch', 400)
+            prediction_events.record(client_ip, '/predict/batch', 400, latency=timer.latency_ms())
+            return jsonify({"error": "No records provided"}), 400
+        
+        if len(records) > MAX_BATCH_SIZE:
+            log_access(timer, client_ip, timestamp, '/predict/batch', 400)
+            prediction_events.record(client_ip, '/predict/batch', 400, latency=timer.latency_ms())
+            return jsonify({"error": f"Batch too large - at most {MAX_BATCH_SIZE} records allowed"}), 400
+        
+        if not all(isinstance(record, dict) for record in records):
+            log_access(timer, client_ip, timestamp, '/predict/batch', 400)
+            prediction_events.record(client_ip, '/predict/batch', 400, latency=timer.latency_ms())
+            return jsonify({"error": "Each record must be an object"}), 400
         
-        # Parse and format logs
-        parsed_logs = []
-        for log in logs:
+        # Check every field of every record for XSS in one pass
+        records_to_check = [{
+            'name': record.get('name', ''),
+            'address': record.get('address', ''),
+            'location': record.get('location', '')
+        } for record in records]
+        with timer.stage('scoring'):
+            verdicts = detector.find_blocked_fields(records_to_check, timer)
+        
+        # Read the gas price once for the whole batch
+        gas_price = None
+        if any(blocked_field is None for blocked_field, _, _ in verdicts):
+            with timer.stage('gas_price'):
+                gas_price = gas_oracle.get()
+        
+        results = []
+        decisions = []
+        for index, (fields, (blocked_field, confidence, stage)) in enumerate(zip(records_to_check, verdicts)):
+            if blocked_field:
+                log_access(timer, client_ip, timestamp, '/predict/batch', 403)
+                decisions.append((index, 403, blocked_field, confidence, stage))
+                results.append({
+                    "index": index,
+                    "status": "blocked",
+                    "field": blocked_field,
+                    "confidence": confidence,
+                    "stage": stage
+                })
+                continue
+            
             try:
-                # Only process logs that contain actual transactions
-                if "POST /predict" in log:
-                    # Extract timestamp if it exists in the log
-                    timestamp_match = re.search(r'\[(.*?)\]', log)
-                    if timestamp_match:
-                        timestamp = timestamp_match.group(1)
-                    else:
-                        # If log starts with timestamp in different format
-                        timestamp_parts = log.split(' - ', 1)
-                        if len(timestamp_parts) > 1:
-                            timestamp = timestamp_parts[0]
-                        else:
-                            continue
-
-                    # Determine status and type based on response code
-                    if '403' in log:
-                        status = 'Blocked'
-                        log_type = 'Security Alert'
-                        message = 'Security threat detected - Transaction blocked'
-                    elif '200' in log:
-                        status = 'Success'
-                        log_type = 'Transaction'
-                        message = 'New blockchain transaction processed'
-                    else:
-                        status = 'Failed'
-                        log_type = 'Transaction'
-                        message = 'Transaction failed to process'
-
-                    parsed_logs.append({
-                        'timestamp': timestamp,
-                        'type': log_type,
-                        'message': message,
-                        'status': status
-                    })
-            except:
+                with timer.stage('transaction'):
+                    transaction_data = build_user_data_transaction(
+                        fields['name'],
+                        fields['address'],
+                        fields['location'],
+                        gas_price
+                    )
+            except Exception as e:
+                metrics.ENCODE_ERRORS.labels('/predict/batch').inc()
+                log_access(timer, client_ip, timestamp, '/predict/batch', 500)
+                decisions.append((index, 500, None, None, stage))
+                results.append({
+                    "index": index,
+                    "status": "error",
+                    "error": f"Blockchain error: {str(e)}"
+                })
                 continue
+            
+            log_access(timer, client_ip, timestamp, '/predict/batch', 200)
+            decisions.append((index, 200, None, None, stage))
+            results.append({
+                "index": index,
+                "status": "pending",
+                "stage": stage,
+                "transaction_data": transaction_data
+            })
+        
+        # Stage latencies cover the whole batch, so every record shares them
+        latency = timer.latency_ms()
+        for index, http_status, blocked_field, confidence, stage in decisions:
+            prediction_events.record(client_ip, '/predict/batch', http_status, blocked_field, confidence, stage,
+                                     detector.model_version, latency, index)
         
         return jsonify({
-            'logs': parsed_logs,
-            'stats': {
-                'total_transactions': len(parsed_logs),
-                'successful_transactions': sum(1 for log in parsed_logs if log['status'] == 'Success'),
-                'blocked_transactions': sum(1 for log in parsed_logs if log['status'] == 'Blocked'),
-                'failed_transactions': sum(1 for log in parsed_logs if log['status'] == 'Failed')
+            "results": results,
+            "summary": {
+                "total": len(results),
+                "pending": sum(1 for result in results if result['status'] == 'pending'),
+                "blocked": sum(1 for result in results if result['status'] == 'blocked'),
+                "failed": sum(1 for result in results if result['status'] == 'error')
             }
         })
+    
+    except Exception as e:
+        log_access(timer, client_ip, timestamp, '/predict/batch', 500)
+        prediction_events.record(client_ip, '/predict/batch', 500, latency=timer.latency_ms())
+        return jsonify({"error": f"Error in /predict/batch endpoint: {str(e)}"}), 500
+
+def parse_time_param(name):
+    """Read a query parameter given as epoch seconds or an ISO 8601 timestamp"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid '{name}' - expected epoch seconds or an ISO 8601 timestamp")
+
+def parse_log_filters():
+    """since, until and status list from the query string"""
+    since = parse_time_param('since')
+    until = parse_time_param('until')
+    statuses = [status for status in request.args.get('status', '').split(',') if status]
+    unknown = [status for status in statuses if status not in LOG_STATUSES]
+    if unknown:
+        raise ValueError(f"Unknown status '{unknown[0]}' - expected one of {', '.join(LOG_STATUSES)}")
+    return since, until, statuses
+
+@app.route('/admin/logs', methods=['GET'])
+@admin_required
+def get_logs():
+    """Recent log entries, or one filtered page, newest first, when any query parameter is given.
+
+    Query parameters: since/until (epoch seconds or ISO 8601), status
+    (comma-separated Success, Blocked, Failed), limit and cursor (the
+    next_cursor of the previous page, for older entries). Answered by the
+    audit store when it is enabled, otherwise from the event log files.
+    """
+    try:
+        if not request.args:
+            if audit_store is not None:
+                recent = audit_store.recent(int(os.getenv('ADMIN_LOGS_RECENT', '1000')))
+                return jsonify({
+                    'logs': [event_entry(event) for event in recent],
+                    'stats': transaction_stats(audit_store.status_counts())
+                })
+            # Only lines appended since the last request are parsed
+            return jsonify(log_ingestor.snapshot())
+
+        try:
+            since, until, statuses = parse_log_filters()
+            limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+            if not 1 <= limit <= MAX_PAGE_SIZE:
+                raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+            if audit_store is not None:
+                events, next_cursor = audit_store.query(since, until, statuses, limit, request.args.get('cursor'))
+                logs = [event_entry(event) for event in events]
+                stats = transaction_stats(audit_store.status_counts())
+            else:
+                logs, next_cursor = log_ingestor.query(since, until, statuses, limit, request.args.get('cursor'))
+                stats = log_ingestor.stats()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({
+            'logs': logs,
+            'next_cursor': next_cursor,
+            'stats': stats
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/admin/top-ips', methods=['GET'])
+@admin_required
+def get_top_ips():
+    """Client IPs with the most decisions of one status from the audit store.
+
+    Query parameters: status (default Blocked), since (default 7 days ago),
+    until and limit (1-100, default 10).
+    """
+    if audit_store is None:
+        return jsonify({'error': 'Audit store is disabled'}), 503
+    try:
+        since = parse_time_param('since')
+        if since is None:
+            since = (datetime.now() - timedelta(days=7)).timestamp()
+        until = parse_time_param('until')
+        status = request.args.get('status', 'Blocked')
+        if status not in LOG_STATUSES:
+            raise ValueError(f"Unknown status '{status}' - expected one of {', '.join(LOG_STATUSES)}")
+        limit = int(request.args.get('limit', 10))
+        if not 1 <= limit <= 100:
+            raise ValueError("limit must be between 1 and 100")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'status': status,
+        'since': since,
+        'until': until,
+        'ips': audit_store.top_ips(status, since, until, limit)
+    })
+
+@app.route('/admin/export', methods=['GET'])
+@admin_required
+def export_logs():
+    """Stream the decision history as NDJSON or CSV, optionally gzipped.
+
+    Query parameters: format (ndjson or csv), since/until, status, ip, field
+    and compress=gzip. Rows are read lazily from the rotated segments and the
+    live log and sent in chunks, so memory use does not grow with the export.
+    """
+    try:
+        since, until, statuses = parse_log_filters()
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown format '{export_format}' - expected one of {', '.join(EXPORT_FORMATS)}")
+        compress = request.args.get('compress')
+        if compress not in (None, 'gzip'):
+            raise ValueError("compress must be 'gzip'")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    ip = request.args.get('ip')
+    field = request.args.get('field')
+
+    def entries():
+        for _, entry in log_ingestor.iter_entries(since, until, statuses):
+            if (ip is None or entry.get('ip') == ip) and (field is None or entry.get('field') == field):
+                yield entry
+
+    filename = f"predictions-{datetime.now().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    mimetype = CONTENT_TYPES[export_format]
+    if compress:
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    return Response(encode_chunks(export_rows(entries(), export_format), compress=bool(compress)),
+                    mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+def audit_stats(resolution, window):
+    """/admin/stats counted by the audit store, so it covers every worker's decisions"""
+    if window == 'all':
+        # Trigger-kept totals and the field index; no scan of the whole table
+        return {
+            'resolution': resolution,
+            'window': window,
+            'totals': status_totals(audit_store.status_counts()),
+            'fields': audit_store.field_counts(),
+            'latency_ms': None,
+            'series': []
+        }
+    until = time.time()
+    since = rollups.window_start(resolution, window, until)
+    return summarize(audit_store.rollup(rollups.levels[resolution].resolution, since, until), resolution, window)
+
+@app.route('/admin/stats', methods=['GET'])
+@admin_required
+def get_stats():
+    """Decision counts, blocked fields and latency percentiles over a time window.
+
+    Query parameters: resolution (second, minute or hour; default minute)
+    and window in seconds (default 24 hours, at most what that resolution
+    keeps). Counted by the audit store when it is enabled, where window=all
+    gives all-time totals and fields; otherwise read from this worker's
+    in-memory rollups, where window=all covers everything they keep.
+    """
+    try:
+        resolution = request.args.get('resolution', 'minute')
+        if resolution not in rollups.levels:
+            raise ValueError(f"Unknown resolution '{resolution}' - expected one of {', '.join(rollups.levels)}")
+        window = request.args.get('window', str(24 * 3600))
+        if window == 'all':
+            if audit_store is None:
+                # The rollups only hold their own span; answer with all of it
+                window = rollups.span(resolution)
+        else:
+            window = int(window)
+            if not 1 <= window <= rollups.span(resolution):
+                raise ValueError(f"window must be between 1 and {rollups.span(resolution)} seconds for {resolution} resolution")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if audit_store is not None:
+        return jsonify(audit_stats(resolution, window))
+    return jsonify(rollups.stats(resolution, window))
+
+@app.route('/admin/stream', methods=['GET'])
+@admin_required
+def stream_events():
+    """Server-sent events: a 'decision' event per new log entry, 'lagged' when a slow client lost some.
+
+    Answers 503 once ADMIN_STREAM_MAX_SUBSCRIBERS streams are open on this worker.
+    """
+    subscription = event_broadcaster.subscribe()
+    if subscription is None:
+        return jsonify({'error': 'Too many open streams, try again later'}), 503
+
+    def generate():
+        yield ': connected\n\n'
+        while True:
+            events, dropped = subscription.next(timeout=STREAM_HEARTBEAT_SECONDS)
+            chunk = format_sse({'dropped': dropped}, 'lagged') if dropped else ''
+            chunk += ''.join(format_sse(event, 'decision') for event in events)
+            # A comment keeps idle connections open and detects clients that went away
+            yield chunk or ': keep-alive\n\n'
+
+    response = Response(generate(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Frees the slot even if the client goes away before the first chunk is sent
+    response.call_on_close(subscription.close)
+    return response
+
+@app.route('/admin/cache', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    """Verdict cache size and hit/miss/eviction counters"""
+    return jsonify(detector.verdict_cache.stats())
+
+@app.route('/admin/logging', methods=['GET'])
+@admin_required
+def get_logging_stats():
+    """Log writer and audit store queue depths and written/dropped record counters"""
+    return jsonify(dict(log_writer.stats(), audit=audit_store.stats() if audit_store is not None else None))
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Endpoint to verify server is running and healthy"""
     try:
         # Check if ML models are loaded
-        if not (vectorizer and model):
+        if not detector.scorer:
             return jsonify({"status": "error", "message": "ML models not loaded"}), 503
         
         # Check blockchain connection
@@ -421,6 +612,12 @@ def health_check():
             "message": f"Server error: {str(e)}"
         }), 500
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics, summed across workers when served by serve.py"""
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
 @app.route('/admin/login', methods=['POST'])
 def admin_login():
     try:
@@ -448,5 +645,7 @@ def admin_login():
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
+    # Development server only - use serve.py for production
+    start_chain_refreshers()
     print("Server is running on http://0.0.0.0:5002")
     app.run(host='0.0.0.0', port=5002)
\ No newline at end of file
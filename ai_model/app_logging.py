@@ -0,0 +1,91 @@
+import atexit
+import logging
+import os
+from datetime import datetime
+from log_writer import BatchingLogWriter, QueuedFileHandler
+from log_segments import LogRotator
+from log_ingest import summarize_access_line, summarize_json_line
+from audit_store import AuditStore
+
+# Ensure logs directory exists
+current_dir = os.path.dirname(os.path.abspath(__file__))
+log_dir = os.path.join(current_dir, 'logs')
+os.makedirs(log_dir, exist_ok=True)
+
+# Define log file paths
+app_log_file = os.path.join(log_dir, 'app.log')
+security_log_file = os.path.join(log_dir, 'security.log')
+prediction_log_file = os.path.join(log_dir, 'predictions.jsonl')
+audit_db_file = os.path.join(log_dir, 'audit.db')
+
+# Create log files if they don't exist, but don't clear existing content
+if not os.path.exists(app_log_file):
+    with open(app_log_file, 'w', encoding='utf-8') as f:
+        f.write('')
+if not os.path.exists(security_log_file):
+    with open(security_log_file, 'w', encoding='utf-8') as f:
+        f.write('')
+
+def create_log_rotator(path, summarize_line=None):
+    """Rotate ``path`` into compressed segments by size (LOG_ROTATE_BYTES) or age (LOG_ROTATE_SECONDS)"""
+    return LogRotator(
+        path,
+        max_bytes=int(os.getenv('LOG_ROTATE_BYTES', str(50 * 1024 * 1024))),
+        max_age=float(os.getenv('LOG_ROTATE_SECONDS', '0')) or None,
+        keep=int(os.getenv('LOG_ROTATE_KEEP', '20')),
+        summarize_line=summarize_line
+    )
+
+# Log lines are queued and written in batches by a background thread, so a
+# slow disk never holds up a request; lines are dropped (and counted) if the
+# queue fills up
+log_writer = BatchingLogWriter(
+    max_queue=int(os.getenv('LOG_QUEUE_SIZE', '10000')),
+    batch_size=int(os.getenv('LOG_BATCH_SIZE', '256')),
+    flush_interval=float(os.getenv('LOG_FLUSH_INTERVAL', '0.5')),
+    fsync=os.getenv('LOG_FSYNC', 'never'),
+    fsync_interval=float(os.getenv('LOG_FSYNC_INTERVAL', '1')),
+    rotators=[
+        create_log_rotator(app_log_file, summarize_access_line),
+        create_log_rotator(security_log_file),
+        create_log_rotator(prediction_log_file, summarize_json_line)
+    ]
+)
+atexit.register(log_writer.close)
+
+def create_audit_store():
+    """SQLite audit store shared by both servers' workers, or None if AUDIT_DB is set empty"""
+    path = os.getenv('AUDIT_DB', audit_db_file)
+    if not path:
+        return None
+    store = AuditStore(
+        path,
+        batch_size=int(os.getenv('AUDIT_BATCH_SIZE', '500')),
+        flush_interval=float(os.getenv('AUDIT_FLUSH_INTERVAL', '0.5')),
+        retention_days=float(os.getenv('AUDIT_RETENTION_DAYS', '90')) or None
+    )
+    atexit.register(store.close)
+    return store
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(message)s',
+    handlers=[QueuedFileHandler(log_writer, app_log_file)]
+)
+
+# Configure werkzeug logger
+werkzeug_logger = logging.getLogger('werkzeug')
+werkzeug_logger.setLevel(logging.INFO)
+
+# Function to write logs
+def write_log(message):
+    """Write log message to file and console"""
+    logging.info(message)
+
+# Function to write security logs
+def write_security_log(message):
+    """Write security log message to both files"""
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    log_writer.submit(security_log_file, f"{timestamp} - {message}\n")
+    write_log(f"{timestamp} - {message}")
@@ -0,0 +1,318 @@
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from aiohttp import web
+from web3 import AsyncWeb3
+import metrics
+from app_logging import write_log, log_writer, create_audit_store
+from xss_detection import create_detector, MAX_BATCH_SIZE
+from user_data_contract import build_user_data_transaction
+from gas_oracle import AsyncGasPriceOracle
+from prediction_events import PredictionEventLog, StageTimer, prediction_log_file
+
+GANACHE_URL = os.getenv('GANACHE_URL', "http://127.0.0.1:8545")
+
+# Threads available for model scoring; the event loop itself never runs sklearn
+SCORING_THREADS = int(os.getenv('SCORING_THREADS', '4'))
+
+WEB3_KEY = web.AppKey('web3', AsyncWeb3)
+GAS_ORACLE_KEY = web.AppKey('gas_oracle', AsyncGasPriceOracle)
+SCORING_POOL_KEY = web.AppKey('scoring_pool', ThreadPoolExecutor)
+
+audit_store = create_audit_store()
+
+# Structured record of every /predict decision, shared with app.py, counted
+# for /metrics and queued for the audit store app.py's admin routes read
+prediction_events = PredictionEventLog(
+    prediction_log_file, log_writer,
+    listeners=[metrics.observe_event] + ([audit_store.add] if audit_store is not None else [])
+)
+
+write_log("Async server starting...")
+
+# Load vectorizer and model using joblib
+try:
+    model_load_started = time.perf_counter()
+    detector = create_detector()
+    metrics.record_model_load(time.perf_counter() - model_load_started, detector.model_version,
+                              detector.scorer.backend)
+    detector.verdict_cache.listeners.append(metrics.observe_cache_lookup)
+    write_log(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Successfully loaded ML models (version {detector.model_version}, {detector.scorer.backend} backend)")
+except Exception as e:
+    write_log(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Error loading models: {str(e)}")
+    raise
+
+async def score_off_loop(request, method, *args):
+    """Run a detector method on the bounded scoring pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(request.app[SCORING_POOL_KEY], method, *args)
+
+async def read_json(request):
+    """Parsed JSON body, or None when the body is empty or not JSON"""
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+@web.middleware
+async def cors_middleware(request, handler):
+    """Allow cross-origin calls from the React client, as flask_cors does for app.py"""
+    if request.method == 'OPTIONS':
+        response = web.Response()
+    else:
+        response = await handler(request)
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Allow-Headers'] = request.headers.get('Access-Control-Request-Headers', '*')
+    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+    return response
+
+async def predict(request):
+    timer = StageTimer()
+    client_ip = request.remote
+    timestamp = datetime.now().strftime('%d/%b/%Y %H:%M:%S')
+    try:
+        with timer.stage('parse'):
+            data = await read_json(request)
+        if not data:
+            write_log(f"{client_ip} - - [{timestamp}] \"POST /predict HTTP/1.1\" 400 -")
+            prediction_events.record(client_ip, '/predict', 400, latency=timer.latency_ms())
+            return web.json_response({"error": "No data provided"}, status=400)
+
+        # Extract fields
+        name = data.get('name', '')
+        user_address = data.get('address', '')
+        location = data.get('location', '')
+
+        # Check each field for XSS
+        fields_to_check = {
+            'name': name,
+            'address': user_address,
+            'location': location
+        }
+
+        # Score all fields off the event loop
+        with timer.stage('scoring'):
+            blocked_field, confidence, stage = await score_off_loop(request, detector.find_blocked_field, fields_to_check)
+
+        # If ML model detects attack with high confidence
+        if blocked_field:
+            write_log(f"{client_ip} - - [{timestamp}] \"POST /predict HTTP/1.1\" 403 -")
+            prediction_events.record(client_ip, '/predict', 403, blocked_field, confidence, stage,
+                                     detector.model_version, timer.latency_ms())
+            return web.json_response({
+                "error": "Security threat detected - Transaction blocked",
+                "status": "blocked",
+                "field": blocked_field,
+                "confidence": confidence,
+                "stage": stage
+            }, status=403)
+
+        try:
+            # Build transaction for MetaMask
+            with timer.stage('gas_price'):
+                gas_price = await request.app[GAS_ORACLE_KEY].get()
+            with timer.stage('transaction'):
+                transaction_data = build_user_data_transaction(
+                    name,
+                    user_address,
+                    location,
+                    gas_price
+                )
+
+            write_log(f"{client_ip} - - [{timestamp}] \"POST /predict HTTP/1.1\" 200 -")
+            prediction_events.record(client_ip, '/predict', 200, stage=stage,
+                                     model_version=detector.model_version, latency=timer.latency_ms())
+
+            return web.json_response({
+                "status": "pending",
+                "message": "Please confirm the transaction in MetaMask",
+                "stage": stage,
+                "transaction_data": transaction_data
+            })
+
+        except Exception as e:
+            write_log(f"{client_ip} - - [{timestamp}] \"POST /predict HTTP/1.1\" 500 -")
+            prediction_events.record(client_ip, '/predict', 500, stage=stage,
+                                     model_version=detector.model_version, latency=timer.latency_ms())
+            return web.json_response({"error": f"Blockchain error: {str(e)}"}, status=500)
+
+    except Exception as e:
+        write_log(f"{client_ip} - - [{timestamp}] \"POST /predict HTTP/1.1\" 500 -")
+        prediction_events.record(client_ip, '/predict', 500, latency=timer.latency_ms())
+        return web.json_response({"error": f"Error in /predict endpoint: {str(e)}"}, status=500)
+
+async def predict_batch(request):
+    """Score many user-data records at once and build transactions for the safe ones"""
+    timer = StageTimer()
+    client_ip = request.remote
+    timestamp = datetime.now().strftime('%d/%b/%Y %H:%M:%S')
+    try:
+        with timer.stage('parse'):
+            data = await read_json(request)
+        records = data.get('records') if isinstance(data, dict) else data
+        if not records or not isinstance(records, list):
+            write_log(f"{client_ip} - - [{timestamp}] \"POST /predict/batch HTTP/1.1\" 400 -")
+            prediction_events.record(client_ip, '/predict/batch', 400, latency=timer.latency_ms())
+            return web.json_response({"error": "No records provided"}, status=400)
+
+        if len(records) > MAX_BATCH_SIZE:
+            write_log(f"{client_ip} - - [{timestamp}] \"POST /predict/batch HTTP/1.1\" 400 -")
+            prediction_events.record(client_ip, '/predict/batch', 400, latency=timer.latency_ms())
+            return web.json_response({"error": f"Batch too large - at most {MAX_BATCH_SIZE} records allowed"}, status=400)
+
+        if not all(isinstance(record, dict) for record in records):
+            write_log(f"{client_ip} - - [{timestamp}] \"POST /predict/batch HTTP/1.1\" 400 -")
+            prediction_events.record(client_ip, '/predict/batch', 400, latency=timer.latency_ms())
+            return web.json_response({"error": "Each record must be an object"}, status=400)
+
+        records_to_check = [{
+            'name': record.get('name', ''),
+            'address': record.get('address', ''),
+            'location': record.get('location', '')
+        } for record in records]
+
+        # Score the batch and read the gas price concurrently
+        with timer.stage('scoring'):
+            verdicts, gas_price = await asyncio.gather(
+                score_off_loop(request, detector.find_blocked_fields, records_to_check),
+                request.app[GAS_ORACLE_KEY].get()
+            )
+
+        results = []
+        decisions = []
+        for index, (fields, (blocked_field, confidence, stage)) in enumerate(zip(records_to_check, verdicts)):
+            if blocked_field:
+                write_log(f"{client_ip} - - [{timestamp}] \"POST /predict/batch HTTP/1.1\" 403 -")
+                decisions.append((index, 403, blocked_field, confidence, stage))
+                results.append({
+                    "index": index,
+                    "status": "blocked",
+                    "field": blocked_field,
+                    "confidence": confidence,
+                    "stage": stage
+                })
+                continue
+
+            try:
+                with timer.stage('transaction'):
+                    transaction_data = build_user_data_transaction(
+                        fields['name'],
+                        fields['address'],
+                        fields['location'],
+                        gas_price
+                    )
+            except Exception as e:
+                write_log(f"{client_ip} - - [{timestamp}] \"POST /predict/batch HTTP/1.1\" 500 -")
+                decisions.append((index, 500, None, None, stage))
+                results.append({
+                    "index": index,
+                    "status": "error",
+                    "error": f"Blockchain error: {str(e)}"
+                })
+                continue
+
+            write_log(f"{client_ip} - - [{timestamp}] \"POST /predict/batch HTTP/1.1\" 200 -")
+            decisions.append((index, 200, None, None, stage))
+            results.append({
+                "index": index,
+                "status": "pending",
+                "stage": stage,
+                "transaction_data": transaction_data
+            })
+
+        # Stage latencies cover the whole batch, so every record shares them
+        latency = timer.latency_ms()
+        for index, http_status, blocked_field, confidence, stage in decisions:
+            prediction_events.record(client_ip, '/predict/batch', http_status, blocked_field, confidence, stage,
+                                     detector.model_version, latency, index)
+
+        return web.json_response({
+            "results": results,
+            "summary": {
+                "total": len(results),
+                "pending": sum(1 for result in results if result['status'] == 'pending'),
+                "blocked": sum(1 for result in results if result['status'] == 'blocked'),
+                "failed": sum(1 for result in results if result['status'] == 'error')
+            }
+        })
+
+    except Exception as e:
+        write_log(f"{client_ip} - - [{timestamp}] \"POST /predict/batch HTTP/1.1\" 500 -")
+        prediction_events.record(client_ip, '/predict/batch', 500, latency=timer.latency_ms())
+        return web.json_response({"error": f"Error in /predict/batch endpoint: {str(e)}"}, status=500)
+
+async def health_check(request):
+    """Endpoint to verify server is running and healthy"""
+    try:
+        # Check if ML models are loaded
+        if not detector.scorer:
+            return web.json_response({"status": "error", "message": "ML models not loaded"}, status=503)
+
+        # Check blockchain connection
+        if not await request.app[WEB3_KEY].is_connected():
+            return web.json_response({"status": "error", "message": "Blockchain not connected"}, status=503)
+
+        return web.json_response({
+            "status": "healthy",
+            "message": "Server is running and all components are healthy",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        write_log(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Health check failed: {str(e)}")
+        return web.json_response({
+            "status": "error",
+            "message": f"Server error: {str(e)}"
+        }, status=500)
+
+async def get_metrics(request):
+    """Prometheus metrics"""
+    body, content_type = metrics.render()
+    # The content type carries parameters, which aiohttp only takes as a raw header
+    return web.Response(body=body, headers={'Content-Type': content_type})
+
+async def chain_context(app):
+    """Open the async Web3 session, gas price oracle and scoring pool for the app's lifetime"""
+    w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(GANACHE_URL))
+    if not await w3.is_connected():
+        write_log("Cannot connect to blockchain!")
+        raise Exception("Blockchain connection failed")
+    write_log(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Connected to blockchain network")
+
+    gas_oracle = AsyncGasPriceOracle(
+        w3,
+        refresh_interval=float(os.getenv('GAS_PRICE_REFRESH_INTERVAL', '5')),
+        mode=os.getenv('GAS_PRICE_REFRESH_MODE', 'interval'),
+        on_error=lambda e: metrics.RPC_ERRORS.labels('gas_price').inc()
+    )
+    await gas_oracle.start()
+
+    app[WEB3_KEY] = w3
+    app[GAS_ORACLE_KEY] = gas_oracle
+    app[SCORING_POOL_KEY] = ThreadPoolExecutor(max_workers=SCORING_THREADS, thread_name_prefix='scoring')
+    yield
+
+    await gas_oracle.stop()
+    app[SCORING_POOL_KEY].shutdown(wait=False)
+    await w3.provider.disconnect()
+
+def create_app(context=chain_context):
+    """Build the aiohttp application; ``context`` opens what the handlers use, and tests pass their own"""
+    app = web.Application(middlewares=[cors_middleware])
+    app.cleanup_ctx.append(context)
+    app.router.add_post('/predict', predict)
+    app.router.add_post('/predict/batch', predict_batch)
+    app.router.add_get('/health', health_check)
+    app.router.add_get('/metrics', get_metrics)
+    return app
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the asyncio variant of the AI model API")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5002)
+    args = parser.parse_args()
+
+    print(f"Async server is running on http://{args.host}:{args.port}")
+    web.run_app(create_app(), host=args.host, port=args.port, access_log=None)
@@ -0,0 +1,372 @@
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from rollups import LatencySketch, RollupBucket
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS decisions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    ip TEXT,
+    endpoint TEXT,
+    status TEXT NOT NULL,
+    http_status INTEGER,
+    field TEXT,
+    confidence REAL,
+    stage TEXT,
+    model_version TEXT,
+    latency_total REAL,
+    latency_ms TEXT,
+    batch_index INTEGER
+);
+CREATE INDEX IF NOT EXISTS decisions_ts ON decisions (ts);
+CREATE INDEX IF NOT EXISTS decisions_status_ts ON decisions (status, ts, ip);
+CREATE INDEX IF NOT EXISTS decisions_ip_ts ON decisions (ip, ts);
+CREATE INDEX IF NOT EXISTS decisions_field_ts ON decisions (field, ts);
+
+-- Running totals per status, so unfiltered counts never scan the table
+CREATE TABLE IF NOT EXISTS decision_counts (
+    status TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS decisions_counted AFTER INSERT ON decisions BEGIN
+    INSERT INTO decision_counts (status, count) VALUES (NEW.status, 1)
+    ON CONFLICT (status) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS decisions_uncounted AFTER DELETE ON decisions BEGIN
+    UPDATE decision_counts SET count = count - 1 WHERE status = OLD.status;
+END;
+'''
+
+_INSERT = '''
+INSERT INTO decisions (ts, ip, endpoint, status, http_status, field, confidence, stage,
+                       model_version, latency_total, latency_ms, batch_index)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_COLUMNS = ('id, ts, ip, endpoint, status, http_status, field, confidence, stage, '
+            'model_version, latency_ms, batch_index')
+
+# Latency sketch bucket of a row, computed inside SQLite so sketches can be counted with GROUP BY
+_latency_key = LatencySketch().key
+
+# Rows deleted per statement while pruning, so writers are never locked out for long
+PRUNE_CHUNK = 5000
+
+_STOP = object()
+
+def _event_row(event):
+    latency = event.get('latency_ms') or {}
+    return (event['ts'], event.get('ip'), event.get('endpoint'), event['status'], event.get('http_status'),
+            event.get('field'), event.get('confidence'), event.get('stage'), event.get('model_version'),
+            latency.get('total'), json.dumps(latency, separators=(',', ':')), event.get('index'))
+
+def _row_event(row):
+    event = dict(row)
+    event['latency_ms'] = json.loads(event['latency_ms']) if event['latency_ms'] else {}
+    index = event.pop('batch_index')
+    if index is not None:
+        event['index'] = index
+    return event
+
+def _where(since=None, until=None, statuses=None, ip=None, field=None):
+    clauses, params = [], []
+    if since is not None:
+        clauses.append('ts >= ?')
+        params.append(since)
+    if until is not None:
+        clauses.append('ts <= ?')
+        params.append(until)
+    if statuses:
+        clauses.append(f"status IN ({', '.join('?' * len(statuses))})")
+        params.extend(statuses)
+    if ip is not None:
+        clauses.append('ip = ?')
+        params.append(ip)
+    if field is not None:
+        clauses.append('field = ?')
+        params.append(field)
+    return clauses, params
+
+class AuditStore:
+    """SQLite record of every prediction decision, indexed for admin queries.
+
+    ``add`` only queues the event; a background thread inserts queued events
+    in batches of up to ``batch_size`` per transaction, and deletes rows older
+    than ``retention_days`` every ``prune_interval`` seconds. The database
+    runs in WAL mode so queries never wait for the writer, and several worker
+    processes can share one file. Reads use one connection per thread.
+    """
+
+    def __init__(self, path, batch_size=500, flush_interval=0.5, max_queue=10000,
+                 retention_days=None, prune_interval=3600):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.retention_days = retention_days
+        self.prune_interval = prune_interval
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+        self._start()
+        # A forked child inherits the queue but not the thread that drains it
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._start)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.create_function('latency_key', 1, _latency_key, deterministic=True)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def _start(self):
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.inserted = 0
+        self.dropped = 0
+        self.pruned = 0
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, name='audit-store', daemon=True)
+        self._thread.start()
+
+    def add(self, event):
+        """Queue a decision record; returns False if the queue was full and it was dropped"""
+        try:
+            self._queue.put_nowait(_event_row(event))
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def _run(self):
+        connection = self._connect()
+        next_prune = time.monotonic()
+        while True:
+            if self.retention_days and time.monotonic() >= next_prune:
+                self._prune(connection, time.time() - self.retention_days * 86400)
+                next_prune = time.monotonic() + self.prune_interval
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while item is not _STOP and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            stop = batch[-1] is _STOP
+            rows = batch[:-1] if stop else batch
+            if rows:
+                try:
+                    with connection:
+                        connection.executemany(_INSERT, rows)
+                    with self._stats_lock:
+                        self.inserted += len(rows)
+                except sqlite3.Error:
+                    with self._stats_lock:
+                        self.errors += 1
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                connection.close()
+                return
+
+    def _prune(self, connection, before):
+        total = 0
+        try:
+            while True:
+                with connection:
+                    deleted = connection.execute(
+                        'DELETE FROM decisions WHERE id IN (SELECT id FROM decisions WHERE ts < ? LIMIT ?)',
+                        (before, PRUNE_CHUNK)).rowcount
+                total += deleted
+                with self._stats_lock:
+                    self.pruned += deleted
+                if deleted < PRUNE_CHUNK:
+                    return total
+        except sqlite3.Error:
+            with self._stats_lock:
+                self.errors += 1
+            return total
+
+    def prune(self, before):
+        """Delete decisions logged before epoch ``before``; returns the number removed"""
+        return self._prune(self._reader(), before)
+
+    def flush(self):
+        """Block until every queued decision has been inserted"""
+        self._queue.join()
+
+    def close(self):
+        """Insert everything still queued and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _reader(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def query(self, since=None, until=None, statuses=None, limit=100, cursor=None, ip=None, field=None):
+        """One page of decisions, newest first; returns ``(events, next_cursor)``.
+
+        The cursor is the ``ts:id`` of the last (oldest) row returned, so each
+        page is an index range scan rather than an OFFSET. next_cursor is None
+        once the rows run out before the page fills.
+        """
+        clauses, params = _where(since, until, statuses, ip, field)
+        if cursor:
+            try:
+                cursor_ts, cursor_id = cursor.split(':')
+                cursor_ts, cursor_id = float(cursor_ts), int(cursor_id)
+            except ValueError:
+                raise ValueError("Invalid cursor")
+            clauses.append('(ts < ? OR (ts = ? AND id < ?))')
+            params.extend((cursor_ts, cursor_ts, cursor_id))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._reader().execute(
+            f"SELECT {_COLUMNS} FROM decisions {where} ORDER BY ts DESC, id DESC LIMIT ?", (*params, limit)).fetchall()
+        next_cursor = f"{rows[-1]['ts']!r}:{rows[-1]['id']}" if len(rows) == limit else None
+        return [_row_event(row) for row in rows], next_cursor
+
+    def oldest(self):
+        """Time of the oldest decision held, or None while the store is empty"""
+        return self._reader().execute('SELECT MIN(ts) FROM decisions').fetchone()[0]
+
+    def recent(self, limit=1000):
+        """The newest ``limit`` decisions, oldest first"""
+        rows = self._reader().execute(
+            f"SELECT {_COLUMNS} FROM decisions ORDER BY ts DESC, id DESC LIMIT ?", (limit,)).fetchall()
+        return [_row_event(row) for row in reversed(rows)]
+
+    def status_counts(self, since=None, until=None):
+        """Decisions per status: the trigger-kept totals, or counted from the index for a time range"""
+        counts = dict.fromkeys(('Success', 'Blocked', 'Failed'), 0)
+        if since is None and until is None:
+            rows = self._reader().execute('SELECT status, count FROM decision_counts')
+        else:
+            clauses, params = _where(since, until)
+            rows = self._reader().execute(
+                f"SELECT status, COUNT(*) AS count FROM decisions WHERE {' AND '.join(clauses)} GROUP BY status",
+                params)
+        for row in rows:
+            counts[row['status']] = row['count']
+        return counts
+
+    def field_counts(self):
+        """Decisions per blocked field over everything held, counted from the field index"""
+        rows = self._reader().execute(
+            'SELECT field, COUNT(*) AS count FROM decisions WHERE field IS NOT NULL GROUP BY field')
+        return {row['field']: row['count'] for row in rows}
+
+    def rollup(self, resolution, since=None, until=None):
+        """Decisions between ``since`` and ``until`` as RollupBuckets of ``resolution`` seconds, oldest first.
+
+        Statuses, fields and latency sketch buckets are all counted by SQLite,
+        so every process's decisions are included and only one row per bucket
+        and status/field pair or latency bucket is read back.
+        """
+        clauses, params = _where(since, until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        start = 'CAST(ts / ? AS INTEGER) * ?'
+        reader = self._reader()
+        buckets = {}
+        # One snapshot for both queries, so a batch committed between them cannot add latency-only buckets
+        reader.execute('BEGIN')
+        try:
+            for row in reader.execute(
+                    f"SELECT {start} AS start, status, field, COUNT(*) AS count FROM decisions {where} "
+                    f"GROUP BY 1, 2, 3", (resolution, resolution, *params)):
+                bucket = buckets.setdefault(row['start'], RollupBucket(row['start']))
+                bucket.add_count(row['status'], row['field'], row['count'])
+            clauses.append('latency_total IS NOT NULL')
+            for row in reader.execute(
+                    f"SELECT {start} AS start, latency_key(latency_total) AS key, COUNT(*) AS count, "
+                    f"SUM(latency_total) AS total, MAX(latency_total) AS max FROM decisions "
+                    f"WHERE {' AND '.join(clauses)} GROUP BY 1, 2", (resolution, resolution, *params)):
+                buckets[row['start']].latency.add_bucket(row['key'], row['count'], row['total'], row['max'])
+        finally:
+            reader.execute('COMMIT')
+        return [buckets[start] for start in sorted(buckets)]
+
+    def top_ips(self, status='Blocked', since=None, until=None, limit=10):
+        """Client IPs with the most decisions of ``status``, e.g. the top blocked IPs this week"""
+        clauses, params = _where(since, until, [status] if status else None)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._reader().execute(
+            f"SELECT ip, COUNT(*) AS count FROM decisions {where} GROUP BY ip ORDER BY count DESC, ip LIMIT ?",
+            (*params, limit)).fetchall()
+        return [{'ip': row['ip'], 'count': row['count']} for row in rows]
+
+    def stats(self):
+        """Queue depth and inserted/dropped/pruned counters"""
+        with self._stats_lock:
+            return {
+                'queued': self._queue.qsize(),
+                'inserted': self.inserted,
+                'dropped': self.dropped,
+                'pruned': self.pruned,
+                'errors': self.errors
+            }
+
+def import_log(store, lines, before=None, since=None):
+    """Queue the decisions in an iterable of prediction log lines; returns how many were queued.
+
+    Only decisions logged before ``before`` are queued, so passing the
+    store's ``oldest`` time imports just the history it does not hold yet.
+    Decisions before ``since``, such as those past retention that the next
+    prune would delete again, are skipped too.
+    """
+    count = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        event = json.loads(line)
+        if (before is not None and event['ts'] >= before) or (since is not None and event['ts'] < since):
+            continue
+        while not store.add(event):
+            # Importing should not drop rows; wait for the writer to catch up
+            store.flush()
+        count += 1
+    return count
+
+if __name__ == '__main__':
+    from log_segments import list_segments, iter_segment_lines
+
+    parser = argparse.ArgumentParser(description="Load the prediction event log into the audit database")
+    parser.add_argument('--log', default=os.path.join('logs', 'predictions.jsonl'))
+    parser.add_argument('--db', default=os.path.join('logs', 'audit.db'))
+    parser.add_argument('--retention-days', type=float, default=float(os.getenv('AUDIT_RETENTION_DAYS', '90')),
+                        help="Skip decisions older than this many days; 0 imports all of them")
+    args = parser.parse_args()
+
+    store = AuditStore(args.db)
+    # Decisions from the oldest one stored onwards are already there, whether
+    # recorded live or by an earlier import, so running this again adds nothing.
+    # Older ones past retention were pruned, or soon would be, so they stay out
+    before = store.oldest()
+    since = time.time() - args.retention_days * 86400 if args.retention_days else None
+    total = 0
+    for path in list_segments(args.log) + [args.log]:
+        if not os.path.exists(path):
+            continue
+        total += import_log(store, (line.decode('utf-8', 'replace') for _, line in iter_segment_lines(path)), before, since)
+    store.close()
+    print(f"Imported {total} decisions into {args.db}")
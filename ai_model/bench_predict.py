@@ -0,0 +1,50 @@
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+
+PAYLOADS = [
+    {"name": "John Doe", "address": "123 Main St", "location": "New York"},
+    {"name": "Maria Garcia", "address": "456 Elm Avenue", "location": "Austin, TX"},
+    {"name": "user@example.com", "address": "42 Wallaby Way, Sydney", "location": "Sydney (NSW)"},
+    {"name": "<script>alert('xss')</script>", "address": "123 Main St", "location": "New York"}
+]
+
+def run_benchmark(url, total_requests, concurrency):
+    """Fire ``total_requests`` POSTs at ``url`` and return throughput and latency stats"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount('http://', adapter)
+
+    def send(i):
+        start = time.perf_counter()
+        response = session.post(url, json=PAYLOADS[i % len(PAYLOADS)])
+        return time.perf_counter() - start, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, range(total_requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([latency for latency, _ in results]) * 1000
+    errors = sum(1 for _, status in results if status >= 500)
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "rps": total_requests / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99))
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test the /predict endpoint")
+    parser.add_argument('--url', default='http://localhost:5002/predict')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.url, args.requests, args.concurrency), indent=2))
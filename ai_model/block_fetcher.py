@@ -0,0 +1,67 @@
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from rpc_batch import batch_call_or_raise
+
+logger = logging.getLogger(__name__)
+
+class BlockRangeFetcher:
+    """Fetches a range of historical blocks with full transactions concurrently.
+
+    The range is split into chunks of ``chunk_size`` blocks and each chunk is
+    fetched as one batch request by a pool of ``workers`` threads. Blocks are
+    yielded in block order, and at most two chunks per worker are held at a
+    time, so memory stays flat however long the range. A failed chunk is
+    retried up to ``retries`` times, waiting ``backoff`` seconds before the
+    first retry and twice as long before each one after. ``on_progress`` is
+    called with (blocks done, total blocks) after each chunk is yielded.
+    """
+
+    def __init__(self, w3, workers=8, chunk_size=50, retries=3, backoff=0.5, on_progress=None, sleep=time.sleep):
+        if workers < 1 or chunk_size < 1:
+            raise ValueError("workers and chunk_size must be at least 1")
+        self.w3 = w3
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.backoff = backoff
+        self.on_progress = on_progress
+        self._sleep = sleep
+
+    def _fetch_chunk(self, numbers):
+        for attempt in range(self.retries + 1):
+            try:
+                return batch_call_or_raise(
+                    self.w3, [lambda w3, number=number: w3.eth.get_block(number, full_transactions=True)
+                              for number in numbers])
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                logger.warning(f"Fetching blocks {numbers.start}-{numbers.stop - 1} failed, "
+                               f"retrying in {delay:g}s: {str(e)}")
+                self._sleep(delay)
+
+    def fetch(self, start, stop):
+        """Yield blocks ``start`` to ``stop - 1`` in order"""
+        total = max(0, stop - start)
+        chunks = (range(first, min(first + self.chunk_size, stop)) for first in range(start, stop, self.chunk_size))
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='block-fetcher') as pool:
+            pending = deque(pool.submit(self._fetch_chunk, chunk) for chunk in islice(chunks, self.workers * 2))
+            try:
+                while pending:
+                    blocks = pending.popleft().result()
+                    # Keep the pool busy while the caller works through this chunk
+                    for chunk in islice(chunks, 1):
+                        pending.append(pool.submit(self._fetch_chunk, chunk))
+                    yield from blocks
+                    done += len(blocks)
+                    if self.on_progress is not None:
+                        self.on_progress(done, total)
+            finally:
+                # Stopped early or failed: don't start the chunks still queued
+                for future in pending:
+                    future.cancel()
@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import threading
+import time
+from rpc_batch import batch_call_or_raise
+
+logger = logging.getLogger(__name__)
+
+def sender_key(address):
+    """An address as its 20 raw bytes, whatever its case or type; None if it is not an address"""
+    if isinstance(address, (bytes, bytearray)):
+        return bytes(address) if len(address) == 20 else None
+    try:
+        key = bytes.fromhex(address[2:] if address[:2] in ('0x', '0X') else address)
+    except (TypeError, ValueError):
+        return None
+    return key if len(key) == 20 else None
+
+class SenderCounts:
+    """Transactions per sender over a set of blocks, updated as blocks enter and leave.
+
+    Senders are keyed by their 20 raw address bytes and dropped once their
+    count reaches zero, so memory follows the senders active in the blocks
+    held. Each block's sender keys are kept until it leaves, so removing it
+    never rescans its transactions.
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._blocks = {}
+
+    def add(self, block):
+        counts = self._counts
+        keys = []
+        for tx in block['transactions']:
+            key = sender_key(tx['from'])
+            if key is not None:
+                counts[key] = counts.get(key, 0) + 1
+                keys.append(key)
+        self._blocks[block['hash']] = tuple(keys)
+
+    def remove(self, block):
+        counts = self._counts
+        for key in self._blocks.pop(block['hash'], ()):
+            remaining = counts.get(key, 0) - 1
+            if remaining > 0:
+                counts[key] = remaining
+            else:
+                counts.pop(key, None)
+
+    def count(self, address):
+        """Transactions sent by ``address`` in the blocks held"""
+        key = sender_key(address)
+        return self._counts.get(key, 0) if key is not None else 0
+
+    def __len__(self):
+        return len(self._counts)
+
+class RecentBlockWindow:
+    """The last ``size`` blocks, with full transactions, kept by a background thread.
+
+    Every ``refresh_interval`` seconds the head block number is polled and only
+    the blocks the window does not hold yet are fetched, in one batch request.
+    If a new block does not chain onto the newest block held, or the head
+    moves backwards, the chain was reorganised and the whole window is
+    fetched again. ``blocks`` returns an immutable tuple swapped in after
+    each refresh, so request threads never wait on the node or on each
+    other. ``sender_count`` reads a per-sender transaction count over the
+    window in O(1); it is updated only for the blocks entering and leaving,
+    so a read racing a refresh may see it part way through one. Failed
+    background refreshes are passed to ``on_error``.
+    """
+
+    def __init__(self, w3, size=5, refresh_interval=1.0, clock=time.monotonic, on_error=None):
+        if size < 1:
+            raise ValueError("Block window size must be at least 1")
+        self.w3 = w3
+        self.size = size
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._blocks = ()
+        self.senders = SenderCounts()
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._updated_at = None
+        self.fetched = 0
+        self.reorgs = 0
+        self.errors = 0
+        self.on_error = on_error
+
+    def start(self):
+        """Fill the window synchronously and start background refreshing"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if not self._blocks:
+                self.refresh()
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='recent-block-window', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.refresh_interval + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                self._failed(e)
+
+    def _failed(self, e):
+        self.errors += 1
+        if self.on_error is not None:
+            self.on_error(e)
+        logger.warning(f"Recent block refresh failed: {str(e)}")
+
+    def _window_range(self, head):
+        return range(max(0, head - self.size + 1), head + 1)
+
+    def _missing(self, head):
+        """Block numbers to fetch to bring the window up to ``head``, and whether they replace it"""
+        newest = self.head()
+        if newest < 0 or head < newest or head - newest >= self.size:
+            return self._window_range(head), True
+        return range(newest + 1, head + 1), False
+
+    def _extend(self, blocks, replace):
+        """Add freshly fetched blocks; False if they do not chain onto the newest block held"""
+        self.fetched += len(blocks)
+        kept = [] if replace else list(self._blocks)
+        if kept and blocks and blocks[0]['parentHash'] != kept[-1]['hash']:
+            return False
+        if blocks:
+            window = tuple((kept + list(blocks))[-self.size:])
+            held = {id(block) for block in window}
+            # Leaving blocks first: a rebuilt window may hold the same blocks again
+            for block in self._blocks:
+                if id(block) not in held:
+                    self.senders.remove(block)
+            for block in blocks:
+                if id(block) in held:
+                    self.senders.add(block)
+            self._blocks = window
+        self._updated_at = self._clock()
+        return True
+
+    def refresh(self):
+        """Fetch the blocks up to the current head that the window is missing; returns the head number"""
+        with self._lock:
+            head = self.w3.eth.block_number
+            missing, replace = self._missing(head)
+            if head < self.head() or not self._extend(self._fetch_all(missing), replace):
+                # Reorganised under the window: fetch all of it again
+                self.reorgs += 1
+                self._extend(self._fetch_all(self._window_range(head)), True)
+            return head
+
+    def _fetch_all(self, numbers):
+        return batch_call_or_raise(
+            self.w3, [lambda w3, number=number: w3.eth.get_block(number, full_transactions=True) for number in numbers])
+
+    def blocks(self):
+        """Window blocks, oldest first; starts the window on first use"""
+        if self._thread is None:
+            self.start()
+        return self._blocks
+
+    def sender_count(self, address):
+        """Transactions sent by ``address`` in the window; starts the window on first use"""
+        if self._thread is None:
+            self.start()
+        return self.senders.count(address)
+
+    def head(self):
+        """Number of the newest block held, or -1 while the window is empty"""
+        blocks = self._blocks
+        return blocks[-1]['number'] if blocks else -1
+
+    def latest(self):
+        """The newest block held"""
+        blocks = self.blocks()
+        return blocks[-1] if blocks else None
+
+    def staleness(self):
+        """Seconds since the last successful refresh, or None if never refreshed"""
+        updated_at = self._updated_at
+        return None if updated_at is None else self._clock() - updated_at
+
+    def stats(self):
+        """Blocks held, active senders, staleness and fetch/reorg/error counters"""
+        return {
+            'blocks': [block['number'] for block in self._blocks],
+            'size': self.size,
+            'senders': len(self.senders),
+            'staleness_seconds': self.staleness(),
+            'refresh_interval': self.refresh_interval,
+            'fetched': self.fetched,
+            'reorgs': self.reorgs,
+            'errors': self.errors
+        }
+
+class AsyncRecentBlockWindow(RecentBlockWindow):
+    """RecentBlockWindow for asyncio services, refreshed by a task using AsyncWeb3.
+
+    ``start``, ``refresh``, ``blocks`` and ``sender_count`` are coroutines;
+    missing blocks are fetched concurrently.
+    """
+
+    def __init__(self, w3, size=5, refresh_interval=1.0, clock=time.monotonic, on_error=None):
+        super().__init__(w3, size, refresh_interval, clock, on_error)
+        self._start_lock = asyncio.Lock()
+        self._task = None
+
+    async def start(self):
+        """Fill the window and start the refresh task on the running loop"""
+        # Coroutines arriving while the first fill is awaited wait for it instead of starting their own
+        async with self._start_lock:
+            if self._task is not None and not self._task.done():
+                return
+            if not self._blocks:
+                await self.refresh()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Cancel the refresh task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                self._failed(e)
+
+    async def _fetch_all(self, numbers):
+        return await asyncio.gather(*(self.w3.eth.get_block(number, full_transactions=True) for number in numbers))
+
+    async def refresh(self):
+        """Fetch the missing blocks up to the current head concurrently; returns the head number"""
+        head = await self.w3.eth.block_number
+        missing, replace = self._missing(head)
+        if head < self.head() or not self._extend(await self._fetch_all(missing), replace):
+            # Reorganised under the window: fetch all of it again
+            self.reorgs += 1
+            self._extend(await self._fetch_all(self._window_range(head)), True)
+        return head
+
+    async def blocks(self):
+        """Window blocks, oldest first; starts the window on first use"""
+        if self._task is None:
+            await self.start()
+        return self._blocks
+
+    async def latest(self):
+        """The newest block held"""
+        blocks = await self.blocks()
+        return blocks[-1] if blocks else None
+
+    async def sender_count(self, address):
+        """Transactions sent by ``address`` in the window; starts the window on first use"""
+        if self._task is None:
+            await self.start()
+        return self.senders.count(address)
@@ -1,88 +1,134 @@
+import argparse
+from collections import Counter, deque
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 import joblib
 import logging
 from web3 import Web3
+from gas_oracle import GasPriceOracle
+from block_window import RecentBlockWindow, SenderCounts
+from block_fetcher import BlockRangeFetcher
+from rpc_batch import batch_call_or_raise
 
 class BlockchainSecurityModel:
-    def __init__(self):
+    def __init__(self, gas_oracle=None, block_window=None):
         self.model = RandomForestClassifier(
             n_estimators=100,
             max_depth=10,
             random_state=42
         )
         self.w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
+        # Share an existing oracle and block window when given them, otherwise refresh our own
+        self.gas_oracle = gas_oracle or GasPriceOracle(self.w3)
+        self.block_window = block_window or RecentBlockWindow(self.w3)
         
     def extract_features(self, transaction_data):
         """Extract features from blockchain transaction data"""
-        features = []
+        return self.extract_features_many([transaction_data])
+    
+    def extract_features_many(self, transactions):
+        """Extract features for a list of transactions as an (n, 5) matrix.
+
+        Columns are the gas price ratio to the network average, the value in
+        ETH, recent transactions from the sender, the gas limit ratio to the
+        block gas limit and the value to sender balance ratio. The gas price,
+        block gas limit and sender counts are read once for the whole list,
+        each distinct sender's balance is fetched once in a batch request,
+        and the ratios are computed on arrays.
+        """
+        if not transactions:
+            return np.zeros((0, 5))
         try:
-            # Gas price ratio to network average
-            avg_gas_price = self.w3.eth.gas_price
-            gas_price_ratio = transaction_data.get('gasPrice', avg_gas_price) / avg_gas_price
-            features.append(gas_price_ratio)
-            
-            # Transaction value in ETH
-            value_in_eth = self.w3.from_wei(transaction_data.get('value', 0), 'ether')
-            features.append(float(value_in_eth))
-            
-            # Number of recent transactions from this address
-            recent_blocks = [self.w3.eth.get_block('latest', full_transactions=True) for _ in range(5)]
-            recent_txs = sum(1 for block in recent_blocks for tx in block['transactions'] 
-                           if tx['from'] == transaction_data.get('from'))
-            features.append(recent_txs)
-            
-            # Gas limit ratio to block gas limit
-            block_gas_limit = self.w3.eth.get_block('latest')['gasLimit']
-            gas_limit_ratio = transaction_data.get('gas', 21000) / block_gas_limit
-            features.append(gas_limit_ratio)
-            
-            # Account balance ratio to transaction value
-            if transaction_data.get('from'):
-                balance = self.w3.eth.get_balance(transaction_data['from'])
-                value = transaction_data.get('value', 0)
-                balance_ratio = value / balance if balance > 0 else 1
-                features.append(balance_ratio)
-            else:
-                features.append(0)
-            
-            return np.array(features).reshape(1, -1)
+            avg_gas_price = self.gas_oracle.get()
+            senders = [tx.get('from') for tx in transactions]
+            return self._feature_matrix(
+                senders,
+                [tx.get('gasPrice', avg_gas_price) for tx in transactions],
+                [tx.get('value', 0) for tx in transactions],
+                [tx.get('gas', 21000) for tx in transactions],
+                self.block_window.latest()['gasLimit'],
+                [self.block_window.sender_count(sender) for sender in senders],
+                avg_gas_price
+            )
         except Exception as e:
             logging.error(f"Error extracting features: {str(e)}")
-            return np.zeros((1, 5))  # Return zero features on error
+            return np.zeros((len(transactions), 5))  # Return zero features on error
+    
+    def _feature_matrix(self, senders, gas_prices, values, gas_limits, block_gas_limits, recent_txs, avg_gas_price):
+        """Feature rows from per-transaction columns, fetching each distinct sender's balance once"""
+        distinct_senders = list(dict.fromkeys(sender for sender in senders if sender))
+        balances = dict(zip(distinct_senders, batch_call_or_raise(
+            self.w3, [lambda w3, sender=sender: w3.eth.get_balance(sender) for sender in distinct_senders])))
+        sender_balances = np.array([balances.get(sender, 0) if sender else 0 for sender in senders], dtype=float)
+        has_sender = np.array([bool(sender) for sender in senders])
+        values = np.asarray(values, dtype=float)
+        
+        # Spending with no balance counts as ratio 1; no sender as 0
+        balance_ratios = np.where(sender_balances > 0, values / np.where(sender_balances > 0, sender_balances, 1), 1.0)
+        balance_ratios = np.where(has_sender, balance_ratios, 0.0)
+        
+        return np.column_stack([
+            np.asarray(gas_prices, dtype=float) / avg_gas_price,
+            values / 10**18,
+            np.asarray(recent_txs, dtype=float),
+            np.asarray(gas_limits, dtype=float) / np.asarray(block_gas_limits, dtype=float),
+            balance_ratios
+        ])
     
-    def generate_training_data(self):
-        """Generate training data from blockchain history"""
-        X = []
+    def generate_training_data(self, blocks=1000, workers=8, on_progress=None):
+        """Generate training data from the last ``blocks`` blocks of history.
+
+        Blocks are fetched concurrently by a BlockRangeFetcher (``on_progress``
+        receives blocks done and total) and features are computed from them:
+        the recent transaction count covers the block window ending at each
+        transaction's own block, and the gas limit ratio uses that block's gas
+        limit. Only sender balances are read from the node, once per sender.
+        """
+        senders, gas_prices, values, gas_limits, block_gas_limits, recent_txs = [], [], [], [], [], []
         y = []
         
         try:
-            # Get recent blocks
             latest_block = self.w3.eth.block_number
-            for block_num in range(max(0, latest_block - 1000), latest_block):
-                block = self.w3.eth.get_block(block_num, full_transactions=True)
+            gas_price = self.gas_oracle.get()
+            high_value = self.w3.to_wei(100, 'ether')
+            recent = SenderCounts()
+            held = deque()
+            fetcher = BlockRangeFetcher(self.w3, workers=workers, on_progress=on_progress)
+            for block in fetcher.fetch(max(0, latest_block - blocks), latest_block):
+                recent.add(block)
+                held.append(block)
+                if len(held) > self.block_window.size:
+                    recent.remove(held.popleft())
                 
+                block_senders = Counter(tx['from'] for tx in block['transactions'])
                 for tx in block['transactions']:
-                    features = self.extract_features(tx)
-                    X.append(features[0])
+                    senders.append(tx['from'])
+                    gas_prices.append(tx.get('gasPrice', gas_price))
+                    values.append(tx.get('value', 0))
+                    gas_limits.append(tx.get('gas', 21000))
+                    block_gas_limits.append(block['gasLimit'])
+                    recent_txs.append(recent.count(tx['from']))
                     
                     # Label transaction as suspicious if it meets certain criteria
                     is_suspicious = (
-                        tx.get('value', 0) > self.w3.to_wei(100, 'ether') or  # High value
-                        tx.get('gasPrice', 0) > self.w3.eth.gas_price * 2 or  # High gas price
-                        len([t for t in block['transactions'] if t['from'] == tx['from']]) > 5  # Many transactions
+                        tx.get('value', 0) > high_value or  # High value
+                        tx.get('gasPrice', 0) > gas_price * 2 or  # High gas price
+                        block_senders[tx['from']] > 5  # Many transactions
                     )
                     y.append(1 if is_suspicious else 0)
             
-            return np.array(X), np.array(y)
+            if not senders:
+                return np.array([]), np.array([])
+            X = self._feature_matrix(senders, gas_prices, values, gas_limits, block_gas_limits, recent_txs, gas_price)
+            return X, np.array(y)
         except Exception as e:
             logging.error(f"Error generating training data: {str(e)}")
             return np.array([]), np.array([])
     
-    def train(self):
-        """Train the blockchain security model"""
-        X, y = self.generate_training_data()
+    def train(self, blocks=1000, workers=8, on_progress=None):
+        """Train the blockchain security model on the last ``blocks`` blocks"""
+        X, y = self.generate_training_data(blocks, workers, on_progress)
         
         if len(X) == 0 or len(y) == 0:
             logging.error("No training data available")
@@ -125,14 +171,47 @@ class BlockchainSecurityModel:
                 'balance_ratio': float(features[0][4])
             }
         }
+    
+    def predict_many(self, transactions):
+        """Score a list of transactions, such as a mempool snapshot or a block's transactions, at once.
+
+        Returns a dict of arrays aligned with ``transactions``: 'is_suspicious'
+        (bool), 'confidence' (probability of being suspicious) and the (n, 5)
+        'features' matrix.
+        """
+        features = self.extract_features_many(transactions)
+        if len(features) == 0:
+            return {'is_suspicious': np.zeros(0, dtype=bool), 'confidence': np.zeros(0), 'features': features}
+        
+        probabilities = self.model.predict_proba(features)[:, 1]
+        return {
+            'is_suspicious': self.model.predict(features).astype(bool),
+            'confidence': probabilities,
+            'features': features
+        }
+
+def progress_logger(steps=20):
+    """on_progress callback logging block fetching progress ``steps`` times over the range"""
+    logged = set()
+    def log_progress(done, total):
+        step = done * steps // total
+        if step not in logged:
+            logged.add(step)
+            logging.info(f"Fetched {done}/{total} blocks ({done / total:.0%})")
+    return log_progress
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the blockchain security model on recent chain history")
+    parser.add_argument('--blocks', type=int, default=1000, help="Blocks of history to train on (default: 1000)")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent block fetch threads (default: 8)")
+    args = parser.parse_args()
+    
     # Set up logging
     logging.basicConfig(level=logging.INFO)
     
     # Initialize and train model
     model = BlockchainSecurityModel()
-    if model.train():
+    if model.train(args.blocks, args.workers, progress_logger()):
         logging.info("Model trained and saved successfully")
     else:
-        logging.error("Failed to train model") 
\ No newline at end of file
+        logging.error("Failed to train model")
@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from collections import deque
+
+# Entries a slow subscriber can fall behind by before the oldest are dropped
+DEFAULT_BUFFER_SIZE = 256
+
+class Subscription:
+    """One subscriber's bounded buffer of published events"""
+
+    def __init__(self, broadcaster, buffer_size):
+        self._broadcaster = broadcaster
+        self.buffer = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self.closed = False
+
+    def next(self, timeout=None):
+        """Wait up to ``timeout`` seconds for events; returns ``(events, dropped_since_last_call)``"""
+        with self._broadcaster._condition:
+            self._broadcaster._condition.wait_for(lambda: self.buffer or self.closed, timeout)
+            events = list(self.buffer)
+            self.buffer.clear()
+            dropped, self.dropped = self.dropped, 0
+        return events, dropped
+
+    def close(self):
+        self._broadcaster.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class EventBroadcaster:
+    """Fans published events out to any number of subscribers.
+
+    ``publish`` appends to each subscriber's bounded buffer and wakes the
+    waiting readers; a subscriber that falls behind loses its oldest events
+    (counted in ``dropped``) rather than slowing the publisher or growing
+    without bound. Given ``poll``, one background thread calls it every
+    ``poll_interval`` seconds while anyone is subscribed, so the cost of
+    finding new events does not grow with the number of subscribers. The
+    first subscriber after an idle spell polls once before joining, so the
+    backlog built up meanwhile is published to no one. At most
+    ``max_subscribers`` may be subscribed at once.
+    """
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE, poll=None, poll_interval=0.5, max_subscribers=None):
+        self.buffer_size = buffer_size
+        self.poll = poll
+        self.poll_interval = poll_interval
+        self.max_subscribers = max_subscribers
+        self._condition = threading.Condition()
+        self._subscribers = set()
+        self._poller = None
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self):
+        """A new Subscription, or None if ``max_subscribers`` are already subscribed"""
+        with self._condition:
+            idle = self.poll is not None and self._poller is None
+        if idle:
+            # Skip to the end of the source: only events found from now on are sent
+            self._poll_once()
+        subscription = Subscription(self, self.buffer_size)
+        with self._condition:
+            if self.max_subscribers is not None and len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers.add(subscription)
+            if self.poll is not None and self._poller is None:
+                self._poller = threading.Thread(target=self._poll_loop, name='event-poller', daemon=True)
+                self._poller.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._condition:
+            self._subscribers.discard(subscription)
+            subscription.closed = True
+            self._condition.notify_all()
+
+    def publish(self, event):
+        with self._condition:
+            self.published += 1
+            for subscription in self._subscribers:
+                if len(subscription.buffer) == subscription.buffer.maxlen:
+                    subscription.dropped += 1
+                    self.dropped += 1
+                subscription.buffer.append(event)
+            if self._subscribers:
+                self._condition.notify_all()
+
+    def _poll_loop(self):
+        while True:
+            with self._condition:
+                if not self._subscribers:
+                    self._poller = None
+                    return
+            self._poll_once()
+            time.sleep(self.poll_interval)
+
+    def _poll_once(self):
+        try:
+            self.poll()
+        except Exception:
+            pass
+
+    def stats(self):
+        """Subscriber count and published/dropped event counters"""
+        with self._condition:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self.published,
+                'dropped': self.dropped
+            }
+
+def format_sse(data, event=None):
+    """Encode ``data`` as one server-sent event"""
+    message = f"event: {event}\n" if event else ''
+    return message + f"data: {json.dumps(data, separators=(',', ':'))}\n\n"
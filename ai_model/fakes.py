@@ -0,0 +1,93 @@
+"""Fakes shared by the unit tests"""
+import asyncio
+import random
+import threading
+import time
+
+class FakeClock:
+    """Returns ``now``, which only changes when a test sets it"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def empty_block(number):
+    return {'number': number, 'transactions': []}
+
+class FakeEth:
+    """web3's ``eth`` module over in-memory blocks and balances.
+
+    ``blocks`` builds the block for a number. ``failures`` maps block numbers
+    to how many times fetching them raises ConnectionError first, and
+    ``latency`` is the most seconds a block fetch sleeps. Fetched block
+    numbers, balance lookups and the most block fetches in flight at once
+    are recorded for the tests to check.
+    """
+
+    def __init__(self, block_number=1, gas_price=20, blocks=empty_block, balances=None, failures=None, latency=0):
+        self.block_number = block_number
+        self.gas_price = gas_price
+        self.blocks = blocks
+        self.balances = dict(balances or {})
+        self.failures = dict(failures or {})
+        self.latency = latency
+        self.requested = []
+        self.balance_requests = []
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def get_block(self, number, full_transactions=False):
+        assert full_transactions and number != 'latest'
+        with self.lock:
+            if self.failures.get(number):
+                self.failures[number] -= 1
+                raise ConnectionError(f"block {number} timed out")
+            self.requested.append(number)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(random.random() * self.latency)
+        with self.lock:
+            self.active -= 1
+        return self.blocks(number)
+
+    def get_balance(self, address):
+        self.balance_requests.append(address)
+        return self.balances[address]
+
+class AsyncFakeEth:
+    """AsyncWeb3's ``eth`` module over a FakeEth; each call yields to the loop once"""
+
+    def __init__(self, eth):
+        self.eth = eth
+        self.gas_price_requests = 0
+
+    @property
+    def block_number(self):
+        async def fetch():
+            await asyncio.sleep(0)
+            return self.eth.block_number
+        return fetch()
+
+    @property
+    def gas_price(self):
+        async def fetch():
+            self.gas_price_requests += 1
+            await asyncio.sleep(0)
+            return self.eth.gas_price
+        return fetch()
+
+    async def get_block(self, number, full_transactions=False):
+        await asyncio.sleep(0)
+        return self.eth.get_block(number, full_transactions)
+
+class FakeWeb3:
+    """Web3 over ``eth``, or over a FakeEth built from ``options``"""
+
+    def __init__(self, eth=None, **options):
+        self.eth = eth if eth is not None else FakeEth(**options)
+
+    def to_wei(self, value, unit):
+        return value * {'wei': 1, 'gwei': 10**9, 'ether': 10**18}[unit]
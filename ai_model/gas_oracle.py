@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from rpc_batch import batch_call_or_raise
+
+logger = logging.getLogger(__name__)
+
+class GasPriceOracle:
+    """Network gas price cached in memory and refreshed by a background thread.
+
+    Reads are O(1) and never wait on the node once the first price is known.
+    In 'interval' mode the price is re-fetched every ``refresh_interval``
+    seconds; in 'block' mode the block number is polled at that interval and
+    the price is only re-fetched when a new block arrives. One sample per block
+    is kept for the rolling median. Failed background refreshes are passed to
+    ``on_error``.
+    """
+
+    def __init__(self, w3, refresh_interval=5.0, mode='interval', history_size=20, clock=time.monotonic,
+                 on_error=None):
+        if mode not in ('interval', 'block'):
+            raise ValueError(f"Unknown gas price refresh mode '{mode}' - expected 'interval' or 'block'")
+        self.w3 = w3
+        self.refresh_interval = refresh_interval
+        self.mode = mode
+        self._clock = clock
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._gas_price = None
+        self._block_number = None
+        self._updated_at = None
+        self.refreshes = 0
+        self.errors = 0
+        self.on_error = on_error
+
+    def start(self):
+        """Fetch the first price synchronously and start background refreshing"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._gas_price is None:
+                self.refresh()
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='gas-price-oracle', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.refresh_interval + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                if self.mode == 'block' and self.w3.eth.block_number == self._block_number:
+                    continue
+                self.refresh()
+            except Exception as e:
+                self.errors += 1
+                if self.on_error is not None:
+                    self.on_error(e)
+                logger.warning(f"Gas price refresh failed: {str(e)}")
+
+    def refresh(self):
+        """Fetch the current gas price and block number from the node in one batch request"""
+        gas_price, block_number = batch_call_or_raise(
+            self.w3, [lambda w3: w3.eth.gas_price, lambda w3: w3.eth.block_number])
+        self._record(gas_price, block_number)
+        return gas_price
+
+    def _record(self, gas_price, block_number):
+        with self._lock:
+            if self._history and self._history[-1][0] == block_number:
+                self._history[-1] = (block_number, gas_price)
+            else:
+                self._history.append((block_number, gas_price))
+            self._gas_price = gas_price
+            self._block_number = block_number
+            self._updated_at = self._clock()
+            self.refreshes += 1
+
+    def get(self):
+        """Latest known gas price in wei; starts the oracle on first use"""
+        if self._thread is None:
+            self.start()
+        return self._gas_price
+
+    def median(self):
+        """Median gas price over the recent blocks sampled, or None"""
+        with self._lock:
+            prices = [gas_price for _, gas_price in self._history]
+        return int(statistics.median(prices)) if prices else None
+
+    def staleness(self):
+        """Seconds since the last successful refresh, or None if never refreshed"""
+        updated_at = self._updated_at
+        return None if updated_at is None else self._clock() - updated_at
+
+    def stats(self):
+        """Current price, staleness and refresh counters"""
+        return {
+            'gas_price': self._gas_price,
+            'median_gas_price': self.median(),
+            'block_number': self._block_number,
+            'staleness_seconds': self.staleness(),
+            'mode': self.mode,
+            'refresh_interval': self.refresh_interval,
+            'refreshes': self.refreshes,
+            'errors': self.errors
+        }
+
+class AsyncGasPriceOracle(GasPriceOracle):
+    """GasPriceOracle for asyncio services, refreshed by a task using AsyncWeb3.
+
+    ``get`` and ``refresh`` are coroutines; the gas price and block number are
+    fetched concurrently.
+    """
+
+    def __init__(self, w3, refresh_interval=5.0, mode='interval', history_size=20, clock=time.monotonic,
+                 on_error=None):
+        super().__init__(w3, refresh_interval, mode, history_size, clock, on_error)
+        self._start_lock = asyncio.Lock()
+        self._task = None
+
+    async def start(self):
+        """Fetch the first price and start the refresh task on the running loop"""
+        # Coroutines arriving while the first fetch is awaited wait for it instead of starting their own
+        async with self._start_lock:
+            if self._task is not None and not self._task.done():
+                return
+            if self._gas_price is None:
+                await self.refresh()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Cancel the refresh task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                if self.mode == 'block' and await self.w3.eth.block_number == self._block_number:
+                    continue
+                await self.refresh()
+            except Exception as e:
+                self.errors += 1
+                if self.on_error is not None:
+                    self.on_error(e)
+                logger.warning(f"Gas price refresh failed: {str(e)}")
+
+    async def refresh(self):
+        """Fetch the current gas price and block number from the node concurrently"""
+        gas_price, block_number = await asyncio.gather(self.w3.eth.gas_price, self.w3.eth.block_number)
+        self._record(gas_price, block_number)
+        return gas_price
+
+    async def get(self):
+        """Latest known gas price in wei; starts the oracle on first use"""
+        if self._task is None:
+            await self.start()
+        return self._gas_price
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+import zlib
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+CSV_COLUMNS = ('timestamp', 'ts', 'ip', 'endpoint', 'status', 'http_status', 'field',
+               'confidence', 'stage', 'model_version', 'latency_ms')
+
+# Bytes collected before a chunk is handed to the response
+CHUNK_SIZE = 64 * 1024
+
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+def ndjson_rows(entries):
+    """One JSON line per entry"""
+    for entry in entries:
+        yield json.dumps(entry, separators=(',', ':')) + '\n'
+
+def csv_rows(entries):
+    """A header line, then one CSV line per entry with the total latency in latency_ms"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for entry in entries:
+        row = dict(entry, latency_ms=(entry.get('latency_ms') or {}).get('total'))
+        writer.writerow(['' if row.get(column) is None else row[column] for column in CSV_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def export_rows(entries, export_format):
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{export_format}' - expected one of {', '.join(EXPORT_FORMATS)}")
+    return ndjson_rows(entries) if export_format == 'ndjson' else csv_rows(entries)
+
+def encode_chunks(rows, chunk_size=CHUNK_SIZE, compress=False):
+    """Join text rows into UTF-8 chunks of about ``chunk_size`` bytes, gzipped as they go if ``compress``.
+
+    Only one chunk is held at a time, so memory use does not depend on how
+    many rows there are.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    pending = []
+    size = 0
+    for row in rows:
+        data = row.encode('utf-8')
+        pending.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            chunk = b''.join(pending)
+            pending, size = [], 0
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+    chunk = b''.join(pending)
+    if compressor is not None:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
@@ -0,0 +1,628 @@
+import json
+import os
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows): every process writes the state files
+    fcntl = None
+import re
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from log_segments import (SEGMENT_SUFFIX, list_segments, segment_id, segment_inode, read_segment_header,
+                          iter_segment_lines)
+
+# Parsed entries kept in memory and returned by /admin/logs
+DEFAULT_RECENT_ENTRIES = 1000
+
+# Entries returned per page by time-range queries
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Access lines are written by concurrent threads, so a line may carry a
+# timestamp slightly older than the one before it
+TIMESTAMP_SKEW_SECONDS = 60
+
+LOG_STATUSES = ('Success', 'Blocked', 'Failed')
+
+_TIMESTAMP = re.compile(r'\[(.*?)\]')
+_TIMESTAMP_FORMATS = ('%d/%b/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S')
+
+def parse_access_line(line):
+    """Turn a 'POST /predict' access log line into an admin log entry, or None"""
+    # Only process logs that contain actual transactions
+    if "POST /predict" not in line:
+        return None
+
+    # Extract timestamp if it exists in the log
+    timestamp_match = _TIMESTAMP.search(line)
+    if timestamp_match:
+        timestamp = timestamp_match.group(1)
+    else:
+        # If log starts with timestamp in different format
+        timestamp_parts = line.split(' - ', 1)
+        if len(timestamp_parts) > 1:
+            timestamp = timestamp_parts[0]
+        else:
+            return None
+
+    # Determine status and type based on response code
+    if '403' in line:
+        status = 'Blocked'
+        log_type = 'Security Alert'
+        message = 'Security threat detected - Transaction blocked'
+    elif '200' in line:
+        status = 'Success'
+        log_type = 'Transaction'
+        message = 'New blockchain transaction processed'
+    else:
+        status = 'Failed'
+        log_type = 'Transaction'
+        message = 'Transaction failed to process'
+
+    return {
+        'timestamp': timestamp,
+        'type': log_type,
+        'message': message,
+        'status': status
+    }
+
+def parse_timestamp(text):
+    """Epoch seconds of a log timestamp (local time), or None if unrecognised"""
+    for timestamp_format in _TIMESTAMP_FORMATS:
+        try:
+            return time.mktime(datetime.strptime(text, timestamp_format).timetuple())
+        except ValueError:
+            continue
+    return None
+
+def summarize_access_line(line):
+    """(epoch seconds, status) of an access log line for a segment header"""
+    entry = parse_access_line(line)
+    if entry is None:
+        return None, None
+    return parse_timestamp(entry['timestamp']), entry['status']
+
+def summarize_json_line(line):
+    """(epoch seconds, status) of a JSON event line for a segment header"""
+    event = json.loads(line)
+    return event.get('ts'), event.get('status')
+
+def transaction_stats(totals):
+    """Per-status totals in the /admin/logs stats format"""
+    return {
+        'total_transactions': sum(totals.values()),
+        'successful_transactions': totals.get('Success', 0),
+        'blocked_transactions': totals.get('Blocked', 0),
+        'failed_transactions': totals.get('Failed', 0)
+    }
+
+def entry_time(entry):
+    """Epoch seconds of a parsed entry: its 'ts' field, else its parsed timestamp"""
+    timestamp = entry.get('ts')
+    return timestamp if timestamp is not None else parse_timestamp(entry['timestamp'])
+
+def _iter_from(f, start):
+    """Yield ``(offset, line)`` from an open binary file starting at ``start``"""
+    f.seek(start)
+    offset = start
+    for line in iter(f.readline, b''):
+        yield offset, line
+        offset += len(line)
+
+def _iter_back(f, end, chunk_size=1 << 16):
+    """Yield ``(offset, line)`` from an open binary file, last line first, for the bytes before ``end``"""
+    position = end
+    tail = b''
+    while position > 0:
+        size = min(chunk_size, position)
+        position -= size
+        f.seek(position)
+        data = f.read(size) + tail
+        # Up to the first newline may belong to a line starting before this chunk
+        start = data.find(b'\n') + 1 if position > 0 else 0
+        if position > 0 and start == 0:
+            tail = data
+            continue
+        tail = data[:start]
+        stop = len(data)
+        while stop > start:
+            begin = max(data.rfind(b'\n', start, stop - 1) + 1, start)
+            yield position + begin, data[begin:stop]
+            stop = begin
+
+class OffsetIndex:
+    """Sidecar file mapping each minute of log time to the offset of its first line.
+
+    Entries are fixed-width (minute, byte offset) pairs appended while the log
+    is ingested, so a time-range query can binary search for where to start
+    reading instead of scanning from the top of the log.
+    """
+
+    RECORD = struct.Struct('<qq')
+
+    def __init__(self, path):
+        self.path = path
+        self.minutes = array('q')
+        self.offsets = array('q')
+        self._pending = bytearray()
+        self._truncate = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        usable = len(data) - len(data) % self.RECORD.size
+        for minute, offset in self.RECORD.iter_unpack(data[:usable]):
+            # Skip records appended out of order by another worker process
+            if not self.minutes or minute > self.minutes[-1] and offset >= self.offsets[-1]:
+                self.minutes.append(minute)
+                self.offsets.append(offset)
+
+    def add(self, timestamp, offset):
+        """Record ``offset`` if it starts a minute later than any indexed so far"""
+        minute = int(timestamp // 60)
+        if self.minutes and minute <= self.minutes[-1]:
+            return
+        self.minutes.append(minute)
+        self.offsets.append(offset)
+        self._pending += self.RECORD.pack(minute, offset)
+
+    def flush(self):
+        """Append records added since the last flush to the sidecar file, emptying it first after a reset"""
+        if self._pending or self._truncate:
+            with open(self.path, 'wb' if self._truncate else 'ab') as f:
+                f.write(self._pending)
+            self._pending.clear()
+            self._truncate = False
+
+    def discard(self):
+        """Drop records not yet flushed, for a process that leaves the sidecar file to another"""
+        self._pending.clear()
+        self._truncate = False
+
+    def reset(self):
+        """Forget every entry, for a log that was rotated or truncated; the file is emptied by the next flush"""
+        self.minutes = array('q')
+        self.offsets = array('q')
+        self._pending.clear()
+        self._truncate = True
+
+    def seek(self, since):
+        """Byte offset from which every line logged at or after ``since`` follows"""
+        position = bisect_left(self.minutes, int((since - TIMESTAMP_SKEW_SECONDS) // 60))
+        return self.offsets[position - 1] if position > 0 else 0
+
+    def seek_end(self, until):
+        """Byte offset before which every line logged at or before ``until`` lies, or None for the end"""
+        position = bisect_right(self.minutes, int((until + TIMESTAMP_SKEW_SECONDS) // 60))
+        return self.offsets[position] if position < len(self.offsets) else None
+
+class LogIngestor:
+    """Consumes an append-only log incrementally and keeps running totals.
+
+    Only bytes appended since the last ``refresh`` are read and parsed; the
+    byte offset, file inode, totals and most recent entries are persisted to
+    ``state_path`` so a restart resumes where it stopped. When several
+    processes read the same log, only the one holding a lock on
+    ``state_path + '.lock'`` writes the state and index files; the others
+    keep theirs in memory, and one takes over when the owner exits. A file replaced by
+    rotation is read to its end through the still-open handle, and any parts
+    rotated since the last refresh are read from their segments, before the
+    new file is consumed from the start. A file truncated in place resets the
+    totals, since the entries they counted are gone.
+
+    While ingesting, the first line of every minute is recorded in an
+    ``OffsetIndex`` at ``index_path`` so ``query`` can jump to a time range,
+    and each new entry is passed to every callable in ``listeners``.
+    """
+
+    def __init__(self, log_path, state_path=None, recent_entries=DEFAULT_RECENT_ENTRIES,
+                 parse_line=parse_access_line, index_path=None, listeners=None):
+        self.log_path = log_path
+        self.listeners = list(listeners or ())
+        self.state_path = state_path or f"{log_path}.offset"
+        self.parse_line = parse_line
+        self.index = OffsetIndex(index_path or f"{log_path}.idx")
+        self._lock = threading.Lock()
+        self._state_lock = None
+        self._file = None
+        self._inode = None
+        self._last_segment = None
+        self.offset = 0
+        self.totals = {'Success': 0, 'Blocked': 0, 'Failed': 0}
+        self.recent = deque(maxlen=recent_entries)
+        self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self._inode = state['inode']
+            self._last_segment = state.get('last_segment')
+            self.offset = state['offset']
+            self.totals.update(state['totals'])
+            self.recent.extend(state['recent'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _owns_state(self):
+        """Whether this process writes the state and index files: the first to lock them, until it exits"""
+        if self._state_lock is not None or fcntl is None:
+            return True
+        lock_file = open(f"{self.state_path}.lock", 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._state_lock = lock_file
+        return True
+
+    def _persist(self):
+        if self._owns_state():
+            self.index.flush()
+            self._save_state()
+        else:
+            self.index.discard()
+
+    def close(self):
+        """Close the log and give up writing the state files"""
+        with self._lock:
+            self._close()
+            if self._state_lock is not None:
+                self._state_lock.close()
+                self._state_lock = None
+
+    def _save_state(self):
+        state = {
+            'inode': self._inode,
+            'last_segment': self._last_segment,
+            'offset': self.offset,
+            'totals': self.totals,
+            'recent': list(self.recent)
+        }
+        # Replaced atomically, as other processes may be loading it
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _reset(self):
+        self.offset = 0
+        self.totals = dict.fromkeys(self.totals, 0)
+        self.recent.clear()
+        self.index.reset()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _consume(self, entry, offset):
+        self.totals[entry['status']] += 1
+        self.recent.append(entry)
+        for listener in self.listeners:
+            listener(entry)
+        timestamp = entry_time(entry)
+        if timestamp is not None:
+            self.index.add(timestamp, offset)
+
+    def _consume_lines(self, lines):
+        """Parse ``(offset, line)`` pairs, advancing the offset past each complete line"""
+        consumed = 0
+        for offset, line in lines:
+            if not line.endswith(b'\n'):
+                # Partial line still being written; re-read it next time
+                break
+            self.offset = offset + len(line)
+            try:
+                entry = self.parse_line(line.decode('utf-8', 'replace'))
+            except Exception:
+                continue
+            if entry is not None:
+                self._consume(entry, offset)
+                consumed += 1
+        return consumed
+
+    def _drain(self):
+        """Parse complete lines from the current offset to the end of the open file"""
+        consumed = self._consume_lines(_iter_from(self._file, self.offset))
+        self._file.seek(self.offset)
+        return consumed
+
+    def _new_segments(self):
+        """Rotated parts newer than any seen by the last refresh"""
+        return [path for path in list_segments(self.log_path)
+                if self._last_segment is None or segment_id(path) > self._last_segment]
+
+    def _catch_up(self, resume):
+        """Consume the parts rotated since the last refresh; returns the entries consumed.
+
+        The one rotated from the file being read is found by its inode and, if
+        ``resume``, read on from the saved offset rather than skipped; every
+        other new part is read in full.
+        """
+        segments = self._new_segments()
+        consumed = 0
+        for path in segments:
+            start = 0
+            if self._inode is not None and segment_inode(path) == self._inode:
+                if not resume:
+                    continue
+                start = self.offset
+            consumed += self._consume_lines(iter_segment_lines(path, start))
+        if segments:
+            self._last_segment = segment_id(segments[-1])
+        return consumed
+
+    def _rotated_unseen(self):
+        """Whether the file last read was rotated while not held open, or new parts appeared without one"""
+        segments = self._new_segments()
+        if self._inode is None:
+            return bool(segments)
+        # Our inode may now belong to a new live file if ours was rotated and compressed
+        return any(segment_inode(path) == self._inode for path in segments)
+
+    def refresh(self):
+        """Read whatever was appended since the last call; returns the number of new entries"""
+        with self._lock:
+            try:
+                live_inode = os.stat(self.log_path).st_ino
+            except FileNotFoundError:
+                live_inode = None
+
+            start = (self._inode, self.offset, self._last_segment)
+            consumed = 0
+            # An open handle pins its inode, so only a closed file can have been replaced by one reusing it
+            replaced = live_inode != self._inode or (self._file is None and self._rotated_unseen())
+            if replaced:
+                # Rotated: finish the old file through the still-open handle, then
+                # read any parts rotated since before starting on the new live file
+                resume = True
+                if self._file is not None:
+                    consumed += self._drain()
+                    self._close()
+                    resume = False
+                consumed += self._catch_up(resume)
+                self.index.reset()
+                self._inode = live_inode
+                self.offset = 0
+
+            if live_inode is not None:
+                if self._file is None:
+                    self._file = open(self.log_path, 'rb')
+                if os.fstat(self._file.fileno()).st_size < self.offset:
+                    # Truncated in place: the entries counted so far are gone
+                    self._reset()
+                self._file.seek(self.offset)
+                consumed += self._drain()
+
+            if consumed or (self._inode, self.offset, self._last_segment) != start:
+                self._persist()
+            return consumed
+
+    def stats(self):
+        """Running totals in the /admin/logs stats format"""
+        return transaction_stats(self.totals)
+
+    def snapshot(self):
+        """Most recent entries plus running totals, after consuming new lines"""
+        self.refresh()
+        with self._lock:
+            return {'logs': list(self.recent), 'stats': self.stats()}
+
+    def _segment_in_range(self, path, since, until):
+        """False only when a segment's header shows it lies outside [since, until]"""
+        if not path.endswith(SEGMENT_SUFFIX):
+            return True
+        try:
+            header = read_segment_header(path)
+        except (OSError, ValueError):
+            return False
+        if not header['lines']:
+            return False
+        if since is not None and header['last_ts'] is not None and header['last_ts'] < since - TIMESTAMP_SKEW_SECONDS:
+            return False
+        if until is not None and header['first_ts'] is not None and header['first_ts'] > until + TIMESTAMP_SKEW_SECONDS:
+            return False
+        return True
+
+    def _iter_live(self, inode, start, end):
+        try:
+            f = open(self.log_path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            if os.fstat(f.fileno()).st_ino != inode:
+                # Rotated since the query began; its lines are in the segments
+                return
+            for offset, line in _iter_from(f, start):
+                if offset >= end:
+                    break
+                yield offset, line
+
+    def _sources(self, since, until, cursor):
+        """(lines, cursor_for) pairs for the rotated segments and live log a query must read"""
+        with self._lock:
+            inode, end = self._inode, self.offset
+            live_start = self.index.seek(since) if since is not None else 0
+
+        segment_cursor = None
+        if cursor:
+            try:
+                if cursor.startswith('s:'):
+                    _, stamp, segment_offset = cursor.split(':')
+                    segment_cursor = (stamp, int(segment_offset))
+                    live_start = 0
+                else:
+                    cursor_inode, live_start = (int(part) for part in cursor.split(':'))
+            except ValueError:
+                raise ValueError("Invalid cursor")
+            if segment_cursor is None and (cursor_inode != inode or not 0 <= live_start <= end):
+                raise ValueError("Cursor has expired - the log was rotated or truncated")
+
+        if not cursor or segment_cursor is not None:
+            segments = list_segments(self.log_path)
+            if segment_cursor is not None and segment_cursor[0] not in map(segment_id, segments):
+                raise ValueError("Cursor has expired - the segment was pruned")
+            for path in segments:
+                stamp = segment_id(path)
+                segment_start = 0
+                if segment_cursor is not None:
+                    if stamp < segment_cursor[0]:
+                        continue
+                    if stamp == segment_cursor[0]:
+                        segment_start = segment_cursor[1]
+                if self._segment_in_range(path, since, until):
+                    yield iter_segment_lines(path, segment_start), lambda offset, stamp=stamp: f"s:{stamp}:{offset}"
+
+        yield self._iter_live(inode, live_start, end), lambda offset: f"{inode}:{offset}"
+
+    def iter_entries(self, since=None, until=None, statuses=None, cursor=None):
+        """Lazily yield ``(cursor, entry)`` in log order, across rotated segments and the live log.
+
+        ``since`` and ``until`` are epoch seconds. Segments whose header puts
+        them outside the range are skipped unopened, the live log is entered
+        at the index offset for ``since``, and reading stops once lines are
+        past ``until``. Each cursor points just past its entry.
+        """
+        self.refresh()
+        for lines, cursor_for in self._sources(since, until, cursor):
+            for offset, line in lines:
+                entry, timestamp = self._match(line, since, until, statuses)
+                if until is not None and timestamp is not None and timestamp > until + TIMESTAMP_SKEW_SECONDS:
+                    return
+                if entry is not None:
+                    yield cursor_for(offset + len(line)), entry
+
+    def _match(self, line, since, until, statuses):
+        """``(entry, timestamp)`` of a log line; entry is None unless it passes the filters.
+
+        The timestamp is only parsed, and otherwise None, when filtering by time.
+        """
+        try:
+            entry = self.parse_line(line.decode('utf-8', 'replace'))
+        except Exception:
+            return None, None
+        if entry is None:
+            return None, None
+        timestamp = None
+        if since is not None or until is not None:
+            timestamp = entry_time(entry)
+            if timestamp is None or (since is not None and timestamp < since) or (until is not None and timestamp > until):
+                return None, timestamp
+        if statuses and entry['status'] not in statuses:
+            return None, timestamp
+        return entry, timestamp
+
+    def _sources_newest_first(self, since, until, cursor):
+        """(path, end, inode, cursor_for) for the live log and rotated segments, newest first.
+
+        Only the lines before ``end`` (None for the whole file) are read, and
+        ``inode`` is the live file's, to detect it being rotated mid-query.
+        """
+        with self._lock:
+            inode, live_end = self._inode, self.offset
+            end = live_end
+            if until is not None:
+                index_end = self.index.seek_end(until)
+                if index_end is not None:
+                    end = min(end, index_end)
+
+        segment_cursor = None
+        if cursor:
+            try:
+                if cursor.startswith('s:'):
+                    _, stamp, segment_offset = cursor.split(':')
+                    segment_cursor = (stamp, int(segment_offset))
+                else:
+                    cursor_inode, cursor_end = (int(part) for part in cursor.split(':'))
+            except ValueError:
+                raise ValueError("Invalid cursor")
+            if segment_cursor is None:
+                if cursor_inode != inode or not 0 <= cursor_end <= live_end:
+                    raise ValueError("Cursor has expired - the log was rotated or truncated")
+                end = min(end, cursor_end)
+
+        if segment_cursor is None:
+            yield self.log_path, end, inode, lambda offset: f"{inode}:{offset}"
+        segments = list_segments(self.log_path)
+        if segment_cursor is not None and segment_cursor[0] not in map(segment_id, segments):
+            raise ValueError("Cursor has expired - the segment was pruned")
+        for path in reversed(segments):
+            stamp = segment_id(path)
+            segment_end = None
+            if segment_cursor is not None:
+                if stamp > segment_cursor[0]:
+                    continue
+                if stamp == segment_cursor[0]:
+                    segment_end = segment_cursor[1]
+            if self._segment_in_range(path, since, until):
+                yield path, segment_end, None, lambda offset, stamp=stamp: f"s:{stamp}:{offset}"
+
+    def _read_newest_first(self, path, end, inode, since, until, statuses, limit):
+        """Up to ``limit`` matching ``(offset, entry)`` pairs before ``end``, newest first.
+
+        Plain files are read backwards, stopping at lines older than
+        ``since``. A compressed segment can only be read forwards, so it is
+        scanned keeping just the newest ``limit`` matches.
+        """
+        if path.endswith(SEGMENT_SUFFIX):
+            found = deque(maxlen=limit)
+            for offset, line in iter_segment_lines(path):
+                if end is not None and offset >= end:
+                    break
+                entry, timestamp = self._match(line, since, until, statuses)
+                if until is not None and timestamp is not None and timestamp > until + TIMESTAMP_SKEW_SECONDS:
+                    break
+                if entry is not None:
+                    found.append((offset, entry))
+            return list(reversed(found))
+
+        def matches(f, end):
+            for offset, line in _iter_back(f, end):
+                if not line.endswith(b'\n'):
+                    # Partial line still being written
+                    continue
+                entry, timestamp = self._match(line, since, until, statuses)
+                if since is not None and timestamp is not None and timestamp < since - TIMESTAMP_SKEW_SECONDS:
+                    return
+                if entry is not None:
+                    yield offset, entry
+
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return []
+        with f:
+            if inode is not None and os.fstat(f.fileno()).st_ino != inode:
+                # Rotated since the query began; its lines are in the segments
+                return []
+            return list(islice(matches(f, os.fstat(f.fileno()).st_size if end is None else end), limit))
+
+    def query(self, since=None, until=None, statuses=None, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """One page of matching entries, newest first; returns ``(entries, next_cursor)``.
+
+        The live log is read backwards from its end, or from the index offset
+        past ``until``, then the rotated segments from newest to oldest. The
+        cursor points at the oldest entry returned, and next_cursor is None
+        once the entries run out before the page fills.
+        """
+        self.refresh()
+        entries = []
+        for path, end, inode, cursor_for in self._sources_newest_first(since, until, cursor):
+            for offset, entry in self._read_newest_first(path, end, inode, since, until, statuses,
+                                                         limit - len(entries)):
+                entries.append(entry)
+                if len(entries) >= limit:
+                    return entries, cursor_for(offset)
+        return entries, None
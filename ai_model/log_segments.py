@@ -0,0 +1,172 @@
+import glob
+import gzip
+import json
+import os
+import struct
+import time
+from datetime import datetime
+
+# Compressed segment layout: magic, header length, JSON header, gzip stream
+SEGMENT_MAGIC = b'LOGSEG1\n'
+_HEADER_LENGTH = struct.Struct('<I')
+
+ROTATING_SUFFIX = '.rotating'
+SEGMENT_SUFFIX = '.seg'
+
+def write_segment(source_path, segment_path, summarize_line=None):
+    """Compress a rotated log into a segment whose header holds its time span and counts.
+
+    ``summarize_line`` maps a line to ``(epoch_seconds, status)`` (either may
+    be None) and feeds the header, which also records the source file's inode;
+    the source is read twice, once for the header and once while compressing,
+    so memory use stays constant.
+    """
+    header = {'first_ts': None, 'last_ts': None, 'lines': 0, 'counts': {}, 'bytes': 0}
+    with open(source_path, 'rb') as source:
+        # Lets a reader that had the live file open find what became of it
+        header['inode'] = os.fstat(source.fileno()).st_ino
+        for line in source:
+            header['lines'] += 1
+            header['bytes'] += len(line)
+            if summarize_line is None:
+                continue
+            try:
+                timestamp, status = summarize_line(line.decode('utf-8', 'replace'))
+            except Exception:
+                continue
+            if timestamp is not None:
+                if header['first_ts'] is None or timestamp < header['first_ts']:
+                    header['first_ts'] = timestamp
+                if header['last_ts'] is None or timestamp > header['last_ts']:
+                    header['last_ts'] = timestamp
+            if status is not None:
+                header['counts'][status] = header['counts'].get(status, 0) + 1
+
+    encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    tmp_path = f"{segment_path}.{os.getpid()}.tmp"
+    with open(source_path, 'rb') as source, open(tmp_path, 'wb') as target:
+        target.write(SEGMENT_MAGIC)
+        target.write(_HEADER_LENGTH.pack(len(encoded)))
+        target.write(encoded)
+        with gzip.GzipFile(fileobj=target, mode='wb', compresslevel=6) as compressed:
+            for chunk in iter(lambda: source.read(1 << 16), b''):
+                compressed.write(chunk)
+    os.replace(tmp_path, segment_path)
+    return header
+
+def read_segment_header(path):
+    """Header of a compressed segment, read without touching the compressed data"""
+    with open(path, 'rb') as f:
+        return _read_header(f, path)
+
+def _read_header(f, path):
+    if f.read(len(SEGMENT_MAGIC)) != SEGMENT_MAGIC:
+        raise ValueError(f"{path} is not a log segment")
+    (length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+    return json.loads(f.read(length))
+
+def iter_segment_lines(path, start=0):
+    """Yield ``(offset, line)`` from a segment or a not yet compressed rotated log.
+
+    Offsets count uncompressed bytes, so they are the same before and after
+    compression. Compressed data is decompressed as it is read.
+    """
+    with open(path, 'rb') as f:
+        if path.endswith(SEGMENT_SUFFIX):
+            _read_header(f, path)
+            stream = gzip.GzipFile(fileobj=f, mode='rb')
+        else:
+            stream = f
+        offset = 0
+        for line in stream:
+            if offset >= start:
+                yield offset, line
+            offset += len(line)
+
+def segment_inode(path):
+    """Inode of the live file a rotated part came from, or None if unreadable"""
+    try:
+        if path.endswith(SEGMENT_SUFFIX):
+            return read_segment_header(path).get('inode')
+        return os.stat(path).st_ino
+    except (OSError, ValueError):
+        return None
+
+def segment_id(path):
+    """Rotation stamp shared by a rotated log and the segment compressed from it"""
+    name = os.path.basename(path)
+    for suffix in (SEGMENT_SUFFIX, ROTATING_SUFFIX):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name.rsplit('.', 1)[-1]
+
+def list_segments(log_path):
+    """Rotated parts of ``log_path``, oldest first; compressed and pending alike"""
+    segments = {}
+    for path in glob.glob(f"{glob.escape(log_path)}.*"):
+        if path.endswith(SEGMENT_SUFFIX) or path.endswith(ROTATING_SUFFIX):
+            # Prefer the compressed copy once it exists
+            if path.endswith(SEGMENT_SUFFIX) or segment_id(path) not in segments:
+                segments[segment_id(path)] = path
+    return [segments[stamp] for stamp in sorted(segments)]
+
+class LogRotator:
+    """Size- or age-based rotation of one log file into compressed segments.
+
+    ``rotate`` renames the live file aside; other processes that still hold it
+    open keep appending until they notice the new inode, so it is only
+    compressed ``grace`` seconds later by ``compress_pending``. Only the newest
+    ``keep`` segments are kept.
+    """
+
+    def __init__(self, path, max_bytes=50 * 1024 * 1024, max_age=None, keep=20,
+                 summarize_line=None, grace=5.0, clock=time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep = keep
+        self.summarize_line = summarize_line
+        self.grace = grace
+        self._clock = clock
+        self.rotations = 0
+
+    def due(self, size, opened_at):
+        """Whether a live file of ``size`` bytes opened at ``opened_at`` should rotate"""
+        if size <= 0:
+            return False
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        return bool(self.max_age) and self._clock() - opened_at >= self.max_age
+
+    def rotate(self):
+        """Move the live file aside; returns the rotated path, or None if another process did it"""
+        stamp = datetime.fromtimestamp(self._clock()).strftime('%Y%m%d%H%M%S%f')
+        rotated_path = f"{self.path}.{stamp}{ROTATING_SUFFIX}"
+        try:
+            os.rename(self.path, rotated_path)
+        except FileNotFoundError:
+            return None
+        self.rotations += 1
+        return rotated_path
+
+    def compress_pending(self):
+        """Compress rotated files whose grace period is over, then prune old segments"""
+        for path in glob.glob(f"{glob.escape(self.path)}.*{ROTATING_SUFFIX}"):
+            try:
+                if self._clock() - os.path.getmtime(path) < self.grace:
+                    continue
+                write_segment(path, path[:-len(ROTATING_SUFFIX)] + SEGMENT_SUFFIX, self.summarize_line)
+                os.remove(path)
+            except FileNotFoundError:
+                # Another process compressed it first
+                continue
+        self.prune()
+
+    def prune(self):
+        """Delete the oldest segments beyond ``keep``"""
+        segments = sorted(glob.glob(f"{glob.escape(self.path)}.*{SEGMENT_SUFFIX}"), key=segment_id)
+        for path in segments[:-self.keep] if self.keep else []:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,215 @@
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+# When written data is forced to disk: 'never' leaves it to the OS, 'batch'
+# fsyncs after every batch, 'interval' at most once per fsync_interval
+FSYNC_POLICIES = ('never', 'batch', 'interval')
+
+_STOP = object()
+
+class BatchingLogWriter:
+    """Appends queued log lines to their files from a background thread.
+
+    ``submit`` never blocks: when the queue is full the line is dropped and
+    counted. The writer collects lines until ``batch_size`` are waiting or
+    ``flush_interval`` seconds have passed since the first one, then writes
+    each file's lines with a single write and applies the fsync policy.
+
+    Files with a ``LogRotator`` in ``rotators`` are rotated by this thread when
+    due, and a file replaced by another process is reopened before writing.
+    """
+
+    def __init__(self, max_queue=10000, batch_size=256, flush_interval=0.5,
+                 fsync='never', fsync_interval=1.0, echo_stream=sys.stdout, rotators=None):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}' - expected one of {', '.join(FSYNC_POLICIES)}")
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.echo_stream = echo_stream
+        self.rotators = {rotator.path: rotator for rotator in rotators or ()}
+        self._start()
+        # A forked child inherits the queue but not the thread that drains it
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._files = {}
+        self._opened_at = {}
+        self._last_fsync = {}
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, path, line, echo=False):
+        """Queue ``line`` for ``path``; returns False if it was dropped"""
+        try:
+            self._queue.put_nowait((path, line, echo))
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+        with self._stats_lock:
+            self.submitted += 1
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                self._maintain()
+                continue
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while item is not _STOP and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            stop = batch[-1] is _STOP
+            lines = batch[:-1] if stop else batch
+            if lines:
+                self._write(lines)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                self._close_files()
+                return
+            self._maintain()
+
+    def _write(self, lines):
+        by_path = {}
+        echoed = []
+        for path, line, echo in lines:
+            by_path.setdefault(path, []).append(line)
+            if echo:
+                echoed.append(line)
+
+        for path, path_lines in by_path.items():
+            try:
+                f = self._open(path)
+                f.write(''.join(path_lines))
+                f.flush()
+                self._apply_fsync(path, f)
+                with self._stats_lock:
+                    self.written += len(path_lines)
+                rotator = self.rotators.get(path)
+                if rotator is not None and rotator.due(f.tell(), self._opened_at[path]):
+                    self._close_file(path)
+                    rotator.rotate()
+            except Exception:
+                with self._stats_lock:
+                    self.errors += 1
+
+        if echoed and self.echo_stream is not None:
+            try:
+                self.echo_stream.write(''.join(echoed))
+                self.echo_stream.flush()
+            except Exception:
+                pass
+        with self._stats_lock:
+            self.batches += 1
+
+    def _open(self, path):
+        f = self._files.get(path)
+        if f is not None:
+            try:
+                replaced = os.stat(path).st_ino != os.fstat(f.fileno()).st_ino
+            except FileNotFoundError:
+                replaced = True
+            if not replaced:
+                return f
+            # Rotated by another process; continue in the new file
+            self._close_file(path)
+        f = self._files[path] = open(path, 'a', encoding='utf-8')
+        self._opened_at[path] = time.time()
+        return f
+
+    def _close_file(self, path):
+        f = self._files.pop(path, None)
+        if f is not None:
+            f.close()
+
+    def _maintain(self):
+        """Idle-time housekeeping: age-based rotation and compressing rotated files"""
+        for path, rotator in self.rotators.items():
+            try:
+                f = self._files.get(path)
+                if f is not None and rotator.due(f.tell(), self._opened_at[path]):
+                    self._close_file(path)
+                    rotator.rotate()
+                rotator.compress_pending()
+            except Exception:
+                with self._stats_lock:
+                    self.errors += 1
+
+    def _apply_fsync(self, path, f):
+        if self.fsync == 'never':
+            return
+        now = time.monotonic()
+        if self.fsync == 'interval' and now - self._last_fsync.get(path, 0.0) < self.fsync_interval:
+            return
+        os.fsync(f.fileno())
+        self._last_fsync[path] = now
+
+    def _close_files(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def flush(self):
+        """Block until every line queued so far has been written"""
+        self._queue.join()
+
+    def close(self):
+        """Write everything still queued and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def stats(self):
+        """Queue depth and written/dropped counters"""
+        with self._stats_lock:
+            return {
+                'queued': self._queue.qsize(),
+                'max_queue': self.max_queue,
+                'submitted': self.submitted,
+                'written': self.written,
+                'dropped': self.dropped,
+                'batches': self.batches,
+                'errors': self.errors,
+                'fsync': self.fsync
+            }
+
+class QueuedFileHandler(logging.Handler):
+    """logging handler that hands formatted records to a BatchingLogWriter"""
+
+    def __init__(self, writer, path, echo=True):
+        super().__init__()
+        self.writer = writer
+        self.path = path
+        self.echo = echo
+
+    def emit(self, record):
+        try:
+            self.writer.submit(self.path, self.format(record) + '\n', self.echo)
+        except Exception:
+            self.handleError(record)
@@ -0,0 +1,75 @@
+import os
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+# Latency buckets in seconds, from sub-millisecond scoring up to slow node calls
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+STAGE_SECONDS = Histogram(
+    'predict_stage_seconds', 'Time spent in each stage of a prediction request',
+    ['endpoint', 'stage'], buckets=STAGE_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    'predict_request_seconds', 'Total time taken to decide a prediction request',
+    ['endpoint'], buckets=STAGE_BUCKETS
+)
+DECISIONS = Counter(
+    'predict_decisions_total', 'Prediction decisions by verdict and the cascade stage that decided them',
+    ['endpoint', 'status', 'stage']
+)
+BLOCKED_FIELDS = Counter(
+    'predict_blocked_fields_total', 'Blocked decisions by the field that triggered them',
+    ['endpoint', 'field']
+)
+RPC_ERRORS = Counter('rpc_errors_total', 'Failed blockchain node calls', ['call'])
+ENCODE_ERRORS = Counter(
+    'transaction_encode_errors_total', 'User-data transactions that failed local ABI encoding or validation',
+    ['endpoint']
+)
+CACHE_LOOKUPS = Counter('verdict_cache_lookups_total', 'Verdict cache lookups by result', ['result'])
+# Set once by the process that loads the model; 'max' keeps them after it forks workers
+MODEL_LOAD_SECONDS = Gauge('xss_model_load_seconds', 'Seconds taken to load the XSS model',
+                           multiprocess_mode='max')
+MODEL_INFO = Gauge('xss_model_info', 'Loaded XSS model version and scorer backend (always 1)',
+                   ['version', 'backend'], multiprocess_mode='max')
+
+def observe_event(event):
+    """PredictionEventLog listener: count the verdict and record its stage latencies"""
+    endpoint = event.get('endpoint') or 'unknown'
+    DECISIONS.labels(endpoint, event['status'], event.get('stage') or 'none').inc()
+    if event.get('field'):
+        BLOCKED_FIELDS.labels(endpoint, event['field']).inc()
+
+    # Records of one batch share the request's latencies; observe them once
+    if event.get('index', 0) != 0:
+        return
+    for stage, milliseconds in (event.get('latency_ms') or {}).items():
+        if stage == 'total':
+            REQUEST_SECONDS.labels(endpoint).observe(milliseconds / 1000)
+        else:
+            STAGE_SECONDS.labels(endpoint, stage).observe(milliseconds / 1000)
+
+def observe_cache_lookup(hits, misses):
+    """VerdictCache listener; the hit ratio is hit / (hit + miss)"""
+    if hits:
+        CACHE_LOOKUPS.labels('hit').inc(hits)
+    if misses:
+        CACHE_LOOKUPS.labels('miss').inc(misses)
+
+def record_model_load(seconds, model_version, backend):
+    MODEL_LOAD_SECONDS.set(seconds)
+    MODEL_INFO.labels(model_version, backend).set(1)
+
+def render():
+    """Exposition body and content type.
+
+    When PROMETHEUS_MULTIPROC_DIR is set (serve.py sets it), every worker
+    writes its samples there and this sums them across workers, whichever
+    worker answers the scrape.
+    """
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,118 @@
+import argparse
+import hashlib
+import json
+import os
+import joblib
+import numpy as np
+from xss_scorer import NativeScorer
+
+# Bumped whenever the on-disk layout changes
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+# NativeScorer arrays stored as one .npy file each
+BUNDLE_ARRAYS = ('slot_features', 'feature_hashes', 'key_offsets', 'key_blob',
+                 'idf', 'weights', 'class_log_prior')
+
+def model_fingerprint(*paths):
+    """Short content hash identifying a set of model artifact files"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+def file_checksum(path):
+    """sha256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _replace_file(path, write):
+    # Write beside the target and rename over it, so processes that still have
+    # the old file mapped keep reading the old inode
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+def export_bundle(scorer, bundle_dir, model_version):
+    """Write a NativeScorer's arrays and manifest to ``bundle_dir``"""
+    os.makedirs(bundle_dir, exist_ok=True)
+    arrays = {}
+    for name in BUNDLE_ARRAYS:
+        array = np.ascontiguousarray(getattr(scorer, name))
+        path = os.path.join(bundle_dir, f"{name}.npy")
+        _replace_file(path, lambda f: np.save(f, array, allow_pickle=False))
+        arrays[name] = {
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'sha256': file_checksum(path)
+        }
+
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'model_version': model_version,
+        'classes': [str(label) for label in scorer.classes_],
+        'ngram_range': list(scorer.ngram_range),
+        'lowercase': scorer.lowercase,
+        'arrays': arrays
+    }
+    # The manifest goes last, so a bundle is never visible half written
+    _replace_file(os.path.join(bundle_dir, MANIFEST_NAME),
+                  lambda f: f.write(json.dumps(manifest, indent=2).encode('utf-8')))
+    return manifest
+
+def is_bundle(path):
+    """True if ``path`` is a directory holding a bundle manifest"""
+    return bool(path) and os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+def read_manifest(bundle_dir):
+    """Parse and sanity check a bundle manifest"""
+    with open(os.path.join(bundle_dir, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported model bundle format {manifest.get('format_version')} - expected {BUNDLE_FORMAT_VERSION}")
+    missing = [name for name in BUNDLE_ARRAYS if name not in manifest.get('arrays', {})]
+    if missing:
+        raise ValueError(f"Model bundle manifest is missing arrays: {', '.join(missing)}")
+    return manifest
+
+def load_bundle(bundle_dir, verify=True):
+    """Open a bundle as a NativeScorer whose arrays are memory-mapped read-only.
+
+    Every process that loads the same bundle shares the page cache copy of the
+    arrays. With ``verify`` each file is checked against the manifest checksum.
+    Returns ``(scorer, manifest)``.
+    """
+    manifest = read_manifest(bundle_dir)
+    arrays = {}
+    for name, expected in manifest['arrays'].items():
+        path = os.path.join(bundle_dir, f"{name}.npy")
+        if verify and file_checksum(path) != expected['sha256']:
+            raise ValueError(f"Checksum mismatch for {name}.npy in model bundle {bundle_dir}")
+        array = np.load(path, mmap_mode='r', allow_pickle=False)
+        if array.dtype.str != expected['dtype'] or list(array.shape) != expected['shape']:
+            raise ValueError(f"{name}.npy in model bundle {bundle_dir} does not match its manifest entry")
+        arrays[name] = array
+
+    scorer = NativeScorer(
+        classes=np.array(manifest['classes']),
+        ngram_range=manifest['ngram_range'],
+        lowercase=manifest['lowercase'],
+        **arrays
+    )
+    return scorer, manifest
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export the pickled XSS model as a memory-mappable bundle")
+    parser.add_argument('--vectorizer', default='models/vectorizer.pkl')
+    parser.add_argument('--model', default='models/naive_bayes_model.pkl')
+    parser.add_argument('--output', default='models/xss_bundle')
+    args = parser.parse_args()
+
+    scorer = NativeScorer.from_sklearn(joblib.load(args.vectorizer), joblib.load(args.model))
+    manifest = export_bundle(scorer, args.output, model_fingerprint(args.vectorizer, args.model))
+    print(f"Exported model version {manifest['model_version']} to {args.output}")
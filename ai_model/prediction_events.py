@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from app_logging import prediction_log_file
+
+# Admin log type and message for each decision status
+STATUS_DETAILS = {
+    'Success': ('Transaction', 'New blockchain transaction processed'),
+    'Blocked': ('Security Alert', 'Security threat detected - Transaction blocked'),
+    'Failed': ('Transaction', 'Transaction failed to process')
+}
+
+def decision_status(http_status):
+    """Admin status for an HTTP response code"""
+    if http_status == 200:
+        return 'Success'
+    if http_status == 403:
+        return 'Blocked'
+    return 'Failed'
+
+class StageTimer:
+    """Wall-clock time spent in each named stage of one request"""
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as ``name``; repeated stages accumulate"""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + self._clock() - start
+
+    def latency_ms(self):
+        """Milliseconds per stage, plus the total since the timer was created"""
+        latency = {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+        latency['total'] = round((self._clock() - self.started) * 1000, 3)
+        return latency
+
+class PredictionEventLog:
+    """Appends one compact JSON line per prediction decision.
+
+    Each record holds the epoch timestamp, client IP, endpoint, status, HTTP
+    status, blocked field, confidence, deciding stage, model version and
+    per-stage latency in milliseconds. Given a ``writer`` (BatchingLogWriter)
+    records are queued for its background thread instead of written inline.
+    Each record is also passed to every callable in ``listeners``, such as
+    the in-memory rollups and the audit store.
+    """
+
+    def __init__(self, path=prediction_log_file, writer=None, listeners=None):
+        self.path = path
+        self.writer = writer
+        self.listeners = list(listeners or ())
+        self._lock = threading.Lock()
+        self._file = None
+
+    def record(self, ip, endpoint, http_status, field=None, confidence=None, stage=None,
+               model_version=None, latency=None, index=None):
+        """Write a decision record and return it"""
+        event = {
+            'ts': round(time.time(), 3),
+            'ip': ip,
+            'endpoint': endpoint,
+            'status': decision_status(http_status),
+            'http_status': http_status,
+            'field': field,
+            'confidence': confidence,
+            'stage': stage,
+            'model_version': model_version,
+            'latency_ms': latency or {}
+        }
+        if index is not None:
+            event['index'] = index
+        for listener in self.listeners:
+            listener(event)
+        line = json.dumps(event, separators=(',', ':')) + '\n'
+        if self.writer is not None:
+            self.writer.submit(self.path, line)
+            return event
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+        return event
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+def parse_event_line(line):
+    """Decode a prediction record into an admin log entry, or None for a blank line"""
+    if not line.strip():
+        return None
+    return event_entry(json.loads(line))
+
+def event_entry(event):
+    """Add the admin log timestamp, type and message to a prediction record"""
+    log_type, message = STATUS_DETAILS[event['status']]
+    event['timestamp'] = datetime.fromtimestamp(event['ts']).isoformat(timespec='seconds')
+    event['type'] = log_type
+    event['message'] = message
+    return event
@@ -0,0 +1,88 @@
+import re
+
+# Inputs made only of these characters cannot carry markup or script
+DEFAULT_BENIGN_PATTERN = r"[A-Za-z0-9 ,.\-#']*"
+
+# Case-insensitive markers that are never legitimate in user data fields
+DEFAULT_ATTACK_MARKERS = (
+    '<script',
+    'javascript:',
+    'vbscript:',
+    'onerror=',
+    'onload=',
+    'onmouseover=',
+    'onfocus=',
+    '<iframe',
+    'document.cookie'
+)
+
+class MultiPatternMatcher:
+    """Aho-Corasick automaton that finds any of a fixed set of patterns in one pass"""
+
+    def __init__(self, patterns):
+        self.patterns = tuple(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [None]
+
+        for pattern in self.patterns:
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(None)
+                state = next_state
+            if self._output[state] is None:
+                self._output[state] = pattern
+
+        # Breadth-first pass to link every state to its longest proper suffix
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                if self._output[next_state] is None:
+                    self._output[next_state] = self._output[self._fail[next_state]]
+
+    def search(self, text):
+        """Return the first pattern found in ``text``, or None"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+class Prefilter:
+    """Deterministic first stage of the XSS cascade.
+
+    Plainly benign values (only characters from ``benign_pattern``) are passed
+    and values containing an attack marker are blocked without touching the
+    model. Everything else is left undecided for the model. Either shortcut
+    can be switched off.
+    """
+
+    def __init__(self, attack_markers=DEFAULT_ATTACK_MARKERS, benign_pattern=DEFAULT_BENIGN_PATTERN,
+                 benign_shortcut=True, attack_shortcut=True):
+        self.matcher = MultiPatternMatcher(marker.lower() for marker in attack_markers)
+        self.benign_pattern = re.compile(benign_pattern)
+        self.benign_shortcut = benign_shortcut
+        self.attack_shortcut = attack_shortcut
+
+    def classify(self, value):
+        """Return ('normal' | 'attack', 1.0) if the value is decided here, else None"""
+        if self.benign_shortcut and self.benign_pattern.fullmatch(value):
+            return 'normal', 1.0
+        if self.attack_shortcut and self.matcher.search(value.lower()) is not None:
+            return 'attack', 1.0
+        return None
@@ -0,0 +1,208 @@
+import math
+import threading
+import time
+
+# Rollup resolutions: name, seconds per slot and slots kept (5 minutes of
+# seconds, 24 hours of minutes, 7 days of hours)
+ROLLUP_LEVELS = (('second', 1, 300), ('minute', 60, 1440), ('hour', 3600, 168))
+
+STATUS_KEYS = {
+    'Success': 'successful_transactions',
+    'Blocked': 'blocked_transactions',
+    'Failed': 'failed_transactions'
+}
+
+class LatencySketch:
+    """Latency histogram with log-spaced buckets whose quantiles are within
+    ``relative_accuracy`` of the true value.
+
+    Bucket counts simply add up, so sketches from different slots (or
+    processes) merge without losing accuracy.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def key(self, value):
+        """Bucket ``value`` falls in, or None for zero and negative values"""
+        return math.ceil(math.log(value) / self._log_gamma) if value > 0 else None
+
+    def add(self, value):
+        self.add_bucket(self.key(value), 1, value, value)
+
+    def add_bucket(self, key, count, total, maximum):
+        """Add ``count`` values from bucket ``key`` at once, e.g. as counted by a database"""
+        if key is None:
+            self.zeros += count
+        else:
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += count
+        self.total += total
+        self.max = max(self.max, maximum)
+
+    def merge(self, other):
+        """Add the counts of ``other`` (built with the same accuracy) to this sketch"""
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """Estimated value at quantile ``q`` (0-1), or None when empty"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return min(2 * self._gamma ** key / (self._gamma + 1), self.max)
+        return self.max
+
+    def summary(self):
+        """Count, mean and p50/p90/p99/max in the units that were added"""
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3),
+            'p50': round(self.quantile(0.5), 3),
+            'p90': round(self.quantile(0.9), 3),
+            'p99': round(self.quantile(0.99), 3),
+            'max': round(self.max, 3)
+        }
+
+class RollupBucket:
+    """Decisions counted by status and blocked field, plus their latency sketch"""
+
+    __slots__ = ('start', 'statuses', 'fields', 'latency')
+
+    def __init__(self, start=None):
+        self.start = start
+        self.statuses = {}
+        self.fields = {}
+        self.latency = LatencySketch()
+
+    def add(self, status, field, latency_ms):
+        self.add_count(status, field, 1)
+        if latency_ms is not None:
+            self.latency.add(latency_ms)
+
+    def add_count(self, status, field, count):
+        """Add ``count`` decisions with the same status and field"""
+        self.statuses[status] = self.statuses.get(status, 0) + count
+        if field:
+            self.fields[field] = self.fields.get(field, 0) + count
+
+    def merge(self, other):
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        for field, count in other.fields.items():
+            self.fields[field] = self.fields.get(field, 0) + count
+        self.latency.merge(other.latency)
+
+class RollupSeries:
+    """Fixed ring of ``slots`` buckets, each covering ``resolution`` seconds.
+
+    A slot is reused once the ring wraps around, so old data ages out with no
+    cleanup pass and memory stays constant.
+    """
+
+    def __init__(self, resolution, slots):
+        self.resolution = resolution
+        self.slots = slots
+        self._ring = [None] * slots
+
+    def add(self, timestamp, status, field, latency_ms):
+        start = int(timestamp // self.resolution) * self.resolution
+        position = (start // self.resolution) % self.slots
+        bucket = self._ring[position]
+        if bucket is None or bucket.start != start:
+            if bucket is not None and bucket.start > start:
+                # Older than anything this ring still holds
+                return
+            bucket = self._ring[position] = RollupBucket(start)
+        bucket.add(status, field, latency_ms)
+
+    def buckets(self, since, until):
+        """Non-empty buckets starting within [since, until], oldest first"""
+        since = max(since, until - self.resolution * (self.slots - 1))
+        return sorted((bucket for bucket in self._ring
+                       if bucket is not None and since <= bucket.start <= until),
+                      key=lambda bucket: bucket.start)
+
+def status_totals(counts):
+    """Decisions per status in the /admin/stats ``totals`` format"""
+    totals = {key: counts.get(status, 0) for status, key in STATUS_KEYS.items()}
+    totals['total_transactions'] = sum(counts.values())
+    return totals
+
+def summarize(buckets, resolution, window):
+    """Totals, blocked fields, latency percentiles and a sparse series from buckets, oldest first"""
+    total = RollupBucket()
+    points = []
+    for bucket in buckets:
+        total.merge(bucket)
+        points.append({
+            'ts': bucket.start,
+            'statuses': dict(bucket.statuses),
+            'fields': dict(bucket.fields),
+            'latency_ms': bucket.latency.summary()
+        })
+    return {
+        'resolution': resolution,
+        'window': window,
+        'totals': status_totals(total.statuses),
+        'fields': total.fields,
+        'latency_ms': total.latency.summary(),
+        'series': points
+    }
+
+class RollupEngine:
+    """In-memory per-second, per-minute and per-hour rollups of prediction decisions.
+
+    ``record`` takes the event dict written by ``PredictionEventLog``; every
+    level is updated in O(1), and reads touch only the ring buffers, never
+    the log files. Each process keeps its own rollups.
+    """
+
+    def __init__(self, levels=ROLLUP_LEVELS, clock=time.time):
+        self.levels = {name: RollupSeries(resolution, slots) for name, resolution, slots in levels}
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def record(self, event):
+        latency_ms = (event.get('latency_ms') or {}).get('total')
+        with self._lock:
+            for series in self.levels.values():
+                series.add(event['ts'], event['status'], event.get('field'), latency_ms)
+
+    def span(self, resolution):
+        """Seconds of history kept at ``resolution``"""
+        series = self.levels[resolution]
+        return series.resolution * series.slots
+
+    def window_start(self, resolution, window, until):
+        """Start of the first ``resolution`` bucket inside the ``window`` seconds before ``until``"""
+        seconds = self.levels[resolution].resolution
+        return int((until - window) // seconds + 1) * seconds
+
+    def stats(self, resolution='minute', window=24 * 3600):
+        """Totals, blocked fields, latency percentiles and a sparse series over the last ``window`` seconds"""
+        if resolution not in self.levels:
+            raise ValueError(f"Unknown resolution '{resolution}' - expected one of {', '.join(self.levels)}")
+        until = self._clock()
+        with self._lock:
+            buckets = self.levels[resolution].buckets(self.window_start(resolution, window, until), until)
+            return summarize(buckets, resolution, window)
@@ -0,0 +1,49 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Calls per batch request; many nodes reject larger batches (geth allows 1000)
+MAX_BATCH_CALLS = 500
+
+def batch_call(w3, calls, max_batch_calls=MAX_BATCH_CALLS):
+    """Make several node calls in JSON-RPC batch requests; returns their results in call order.
+
+    Each call is a function taking ``w3`` and making exactly one call through
+    it, e.g. ``lambda w3: w3.eth.get_balance(address)``, so results come back
+    formatted as web3 would return them. Calls are sent ``max_batch_calls``
+    at a time and responses are matched to calls by JSON-RPC id. Providers
+    without batch support (web3 < 7) and batches that fail as a whole, such
+    as when any one call returns an error, fall back to making each call on
+    its own; a call that still fails yields its exception in place of its
+    result.
+    """
+    results = []
+    for start in range(0, len(calls), max_batch_calls):
+        results.extend(_send_batch(w3, calls[start:start + max_batch_calls]))
+    return results
+
+def _send_batch(w3, calls):
+    if len(calls) > 1 and hasattr(w3, 'batch_requests'):
+        try:
+            with w3.batch_requests() as batch:
+                for call in calls:
+                    batch.add(call(w3))
+                return list(batch.execute())
+        except Exception as e:
+            logger.debug(f"Batch of {len(calls)} node calls failed, making them one at a time: {str(e)}")
+
+    results = []
+    for call in calls:
+        try:
+            results.append(call(w3))
+        except Exception as e:
+            results.append(e)
+    return results
+
+def batch_call_or_raise(w3, calls, max_batch_calls=MAX_BATCH_CALLS):
+    """batch_call, raising the first failure instead of returning it"""
+    results = batch_call(w3, calls, max_batch_calls)
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return results
@@ -0,0 +1,90 @@
+import argparse
+import gc
+import multiprocessing
+import os
+import tempfile
+from gunicorn.app.base import BaseApplication
+
+def post_fork(server, worker):
+    """Give each worker its own Web3 session and gas price oracle"""
+    import app as service
+    service.init_worker()
+
+def child_exit(server, worker):
+    """Fold an exited worker's live gauges out of /metrics"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+def prepare_metrics_dir():
+    """Point prometheus_client at an empty directory shared by all workers.
+
+    Must run before prometheus_client is imported. PROMETHEUS_MULTIPROC_DIR
+    is emptied if given, otherwise a fresh temporary directory is used, so
+    counters never carry over from a previous run.
+    """
+    path = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name.endswith('.db'):
+                os.remove(os.path.join(path, name))
+    else:
+        path = tempfile.mkdtemp(prefix='prometheus-')
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = path
+
+class ProductionServer(BaseApplication):
+    """Pre-fork gunicorn server that loads models and the ABI once in the master.
+
+    With ``preload_app`` the Flask app is imported before forking, so every
+    worker shares the loaded models copy-on-write instead of unpickling its own.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app import app
+        # Keep the GC from touching (and so copying) objects loaded by the master
+        gc.freeze()
+        return app
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the AI model API with gunicorn")
+    parser.add_argument('--bind', default=os.getenv('BIND', '0.0.0.0:5002'),
+                        help="Address to listen on (default: 0.0.0.0:5002)")
+    parser.add_argument('--workers', type=int,
+                        default=int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1)),
+                        help="Worker processes (default: 2 x cores + 1)")
+    parser.add_argument('--threads', type=int, default=int(os.getenv('GUNICORN_THREADS', '4')),
+                        help="Threads per worker (default: 4)")
+    parser.add_argument('--max-requests', type=int, default=int(os.getenv('GUNICORN_MAX_REQUESTS', '10000')),
+                        help="Requests served before a worker is recycled, 0 to disable (default: 10000)")
+    parser.add_argument('--max-requests-jitter', type=int, default=int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '1000')),
+                        help="Random extra requests so workers don't recycle together (default: 1000)")
+    parser.add_argument('--graceful-timeout', type=int, default=int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30')),
+                        help="Seconds a recycled worker gets to finish in-flight requests (default: 30)")
+    parser.add_argument('--timeout', type=int, default=int(os.getenv('GUNICORN_TIMEOUT', '30')),
+                        help="Seconds before a silent worker is killed and restarted (default: 30)")
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    prepare_metrics_dir()
+    ProductionServer({
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'preload_app': True,
+        'post_fork': post_fork,
+        'child_exit': child_exit,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests_jitter,
+        'graceful_timeout': args.graceful_timeout,
+        'timeout': args.timeout
+    }).run()
@@ -0,0 +1,53 @@
+import unittest
+import json
+import os
+from eth_abi import encode
+from web3 import Web3
+from abi_encoder import ContractEncoder
+
+class TestContractEncoder(unittest.TestCase):
+    def setUp(self):
+        # Load the compiled UserDataStorage ABI
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        build_file = os.path.join(current_dir, '..', 'build', 'contracts', 'UserDataStorage.json')
+        with open(build_file, 'r') as f:
+            self.abi = json.load(f)['abi']
+        self.encoder = ContractEncoder(self.abi)
+
+    def test_save_user_data_selector(self):
+        """saveUserData selector matches the deployed contract"""
+        self.assertEqual(self.encoder.selector('saveUserData'), '0x4e86aa6f')
+
+    def test_save_user_data_matches_eth_abi(self):
+        """Calldata is byte-identical to web3/eth_abi encoding"""
+        test_cases = [
+            ("John Doe", "123 Main St", "New York"),
+            ("", "", ""),
+            ("a" * 32, "b" * 33, "c" * 64),
+            ("Jöhn 特殊字符", "O'Connor Street", "Zürich")
+        ]
+        selector = bytes(Web3.keccak(text="saveUserData(string,string,string)")[:4])
+
+        for args in test_cases:
+            expected = '0x' + (selector + encode(['string', 'string', 'string'], list(args))).hex()
+            self.assertEqual(self.encoder.encode('saveUserData', *args), expected, f"Mismatch for {args}")
+
+    def test_static_arguments(self):
+        """Address arguments are encoded as left-padded words"""
+        address = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+        selector = bytes(Web3.keccak(text="getUserDataByAddress(address)")[:4])
+        expected = '0x' + (selector + encode(['address'], [address])).hex()
+        self.assertEqual(self.encoder.encode('getUserDataByAddress', address), expected)
+        self.assertEqual(self.encoder.encode('getUserData'), '0x' + bytes(Web3.keccak(text="getUserData()")[:4]).hex())
+
+    def test_invalid_arguments(self):
+        """Wrong argument types and counts are rejected"""
+        with self.assertRaises(TypeError):
+            self.encoder.encode('saveUserData', "John", 5, "New York")
+        with self.assertRaises(TypeError):
+            self.encoder.encode('saveUserData', "John")
+        with self.assertRaises(ValueError):
+            self.encoder.encode('transferOwnership', "0x0")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
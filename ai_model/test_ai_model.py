@@ -2,14 +2,14 @@ import unittest
 import json
 import numpy as np
 from datetime import datetime
-import joblib
 import os
+from xss_detection import load_scorer
 
 class TestAIModel(unittest.TestCase):
     def setUp(self):
-        # Load the model and vectorizer
-        self.vectorizer = joblib.load('models/vectorizer.pkl')
-        self.model = joblib.load('models/naive_bayes_model.pkl')
+        # Load the model from the pickles, or from XSS_MODEL_BUNDLE when set
+        bundle_path = os.getenv('XSS_MODEL_BUNDLE') or None
+        self.scorer, _ = load_scorer('native' if bundle_path else 'sklearn', bundle_path=bundle_path)
         self.test_results = []
         
     def test_xss_detection(self):
@@ -59,12 +59,10 @@ class TestAIModel(unittest.TestCase):
         
         results = []
         for case in test_cases:
-            # Transform input using vectorizer
-            X = self.vectorizer.transform([case['input']])
-            
             # Get prediction and confidence
-            prediction = self.model.predict(X)[0]
-            confidence = float(np.max(self.model.predict_proba(X)[0]))  # Convert to native Python float
+            probabilities = self.scorer.predict_proba([case['input']])[0]
+            prediction = self.scorer.classes_[np.argmax(probabilities)]
+            confidence = float(np.max(probabilities))  # Convert to native Python float
             
             # Determine if test passed
             passed = bool((prediction == case['expected']) and (confidence > 0.75 if prediction == 'attack' else True))
@@ -116,9 +114,9 @@ class TestAIModel(unittest.TestCase):
         ]
         
         for case in edge_cases:
-            X = self.vectorizer.transform([case['input']])
-            prediction = self.model.predict(X)[0]
-            confidence = float(np.max(self.model.predict_proba(X)[0]))  # Convert to native Python float
+            probabilities = self.scorer.predict_proba([case['input']])[0]
+            prediction = self.scorer.classes_[np.argmax(probabilities)]
+            confidence = float(np.max(probabilities))  # Convert to native Python float
             
             result = {
                 "test_case": case['description'],
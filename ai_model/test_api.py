@@ -61,6 +61,39 @@ class TestAPI(unittest.TestCase):
             self.assertEqual(response.status_code, case['expected_status'],
                            f"Failed test case: {case['description']}")
     
+    def test_predict_batch_endpoint(self):
+        """Test the /predict/batch endpoint with mixed records"""
+        records = [
+            {"name": "John Doe", "address": "123 Main St", "location": "New York"},
+            {"name": "<script>alert('xss')</script>", "address": "123 Main St", "location": "New York"},
+            {"name": "John Doe", "address": "<img src=x onerror=alert('XSS')>", "location": "New York"}
+        ]
+        expected_statuses = ["pending", "blocked", "blocked"]
+
+        response = requests.post(f"{self.base_url}/predict/batch", json={"records": records})
+        body = response.json()
+        actual_statuses = [r['status'] for r in body.get('results', [])]
+
+        result = {
+            "test_case": "Batch of normal and XSS records",
+            "input": records,
+            "expected_status": 200,
+            "actual_status": response.status_code,
+            "response": body,
+            "passed": response.status_code == 200 and actual_statuses == expected_statuses
+        }
+        self.test_results.append(result)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(actual_statuses, expected_statuses)
+        self.assertEqual(body['results'][1]['field'], 'name')
+        self.assertEqual(body['results'][2]['field'], 'address')
+        self.assertIn('transaction_data', body['results'][0])
+
+        # Empty batches are rejected
+        response = requests.post(f"{self.base_url}/predict/batch", json={"records": []})
+        self.assertEqual(response.status_code, 400)
+
     def test_admin_login(self):
         """Test the /admin/login endpoint"""
         test_cases = [
@@ -0,0 +1,80 @@
+import os
+# Keep these requests out of the shared audit database
+os.environ.setdefault('AUDIT_DB', '')
+import unittest
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp.test_utils import TestClient, TestServer
+import async_app
+from prediction_events import PredictionEventLog
+
+class FakeGasOracle:
+    async def get(self):
+        return 20 * 10**9
+
+async def fake_chain(app):
+    app[async_app.GAS_ORACLE_KEY] = FakeGasOracle()
+    app[async_app.SCORING_POOL_KEY] = ThreadPoolExecutor(max_workers=2)
+    yield
+    app[async_app.SCORING_POOL_KEY].shutdown()
+
+class TestAsyncApp(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.events = []
+        self.prediction_events = async_app.prediction_events
+        async_app.prediction_events = PredictionEventLog(os.path.join(self.log_dir, 'predictions.jsonl'),
+                                                         listeners=[self.events.append])
+        self.client = TestClient(TestServer(async_app.create_app(context=fake_chain)))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        async_app.prediction_events.close()
+        async_app.prediction_events = self.prediction_events
+        shutil.rmtree(self.log_dir)
+
+    async def test_predict_endpoint(self):
+        """Normal input gets a transaction, XSS is blocked and an empty body is rejected"""
+        test_cases = [
+            ({"name": "John Doe", "address": "123 Main St", "location": "New York"}, 200),
+            ({"name": "<script>alert('xss')</script>", "address": "123 Main St", "location": "New York"}, 403),
+            ({"name": "John Doe", "address": "<img src=x onerror=alert('XSS')>", "location": "New York"}, 403),
+            ({}, 400)
+        ]
+        for body, expected_status in test_cases:
+            response = await self.client.post('/predict', json=body)
+            self.assertEqual(response.status, expected_status, body)
+
+        response = await self.client.post('/predict', json=test_cases[0][0])
+        self.assertIn('transaction_data', await response.json())
+        self.assertEqual([event['status'] for event in self.events],
+                         ['Success', 'Blocked', 'Blocked', 'Failed', 'Success'])
+        self.assertEqual(self.events[2]['field'], 'address')
+
+    async def test_predict_batch_endpoint(self):
+        """Mixed records are scored together and every record is logged with its index"""
+        records = [
+            {"name": "John Doe", "address": "123 Main St", "location": "New York"},
+            {"name": "<script>alert('xss')</script>", "address": "123 Main St", "location": "New York"},
+            {"name": "John Doe", "address": "<img src=x onerror=alert('XSS')>", "location": "New York"}
+        ]
+        response = await self.client.post('/predict/batch', json={"records": records})
+        self.assertEqual(response.status, 200)
+        body = await response.json()
+        self.assertEqual([result['status'] for result in body['results']], ['pending', 'blocked', 'blocked'])
+        self.assertEqual(body['results'][1]['field'], 'name')
+        self.assertEqual(body['results'][2]['field'], 'address')
+        self.assertIn('transaction_data', body['results'][0])
+        self.assertEqual(body['summary'], {'total': 3, 'pending': 1, 'blocked': 2, 'failed': 0})
+        self.assertEqual([(event['index'], event['status']) for event in self.events],
+                         [(0, 'Success'), (1, 'Blocked'), (2, 'Blocked')])
+
+        for invalid in ({"records": []}, {"records": ["not an object"]},
+                        {"records": [records[0]] * (async_app.MAX_BATCH_SIZE + 1)}):
+            response = await self.client.post('/predict/batch', json=invalid)
+            self.assertEqual(response.status, 400)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,156 @@
+import unittest
+import os
+import shutil
+import sqlite3
+import tempfile
+from audit_store import AuditStore, import_log
+from rollups import RollupEngine, summarize
+
+def event(ts, status='Success', ip='10.0.0.1', field=None, index=None):
+    record = {
+        'ts': ts,
+        'ip': ip,
+        'endpoint': '/predict',
+        'status': status,
+        'http_status': {'Success': 200, 'Blocked': 403, 'Failed': 500}[status],
+        'field': field,
+        'confidence': 0.9 if field else None,
+        'stage': 'model',
+        'model_version': 'abc123',
+        'latency_ms': {'scoring': 0.5, 'total': 1.5}
+    }
+    if index is not None:
+        record['index'] = index
+    return record
+
+class TestAuditStore(unittest.TestCase):
+    def setUp(self):
+        self.db_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.db_dir, 'audit.db')
+        self.store = AuditStore(self.path, flush_interval=0.01)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.db_dir)
+
+    def fill(self):
+        for i in range(60):
+            if i % 3 == 0:
+                self.store.add(event(1000.0 + i, 'Blocked', f"10.0.0.{i % 4}", 'name'))
+            else:
+                self.store.add(event(1000.0 + i, 'Success' if i % 5 else 'Failed'))
+        self.store.flush()
+
+    def test_wal_and_indexes(self):
+        connection = sqlite3.connect(self.path)
+        self.assertEqual(connection.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue({'decisions_ts', 'decisions_status_ts', 'decisions_ip_ts', 'decisions_field_ts'} <= indexes)
+        plan = ' '.join(row[3] for row in connection.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM decisions WHERE ip = ? AND ts >= ?", ('10.0.0.1', 0)))
+        self.assertIn('decisions_ip_ts', plan)
+        connection.close()
+
+    def test_batched_round_trip(self):
+        """Queued records come back unchanged, newest first, after a flush"""
+        self.store.add(event(2.0, 'Blocked', field='email', index=3))
+        self.store.add(event(1.0))
+        self.store.flush()
+        events, next_cursor = self.store.query()
+        self.assertIsNone(next_cursor)
+        self.assertEqual([record['ts'] for record in events], [2.0, 1.0])
+        blocked = events[0]
+        self.assertEqual(blocked['field'], 'email')
+        self.assertEqual(blocked['index'], 3)
+        self.assertEqual(blocked['latency_ms'], {'scoring': 0.5, 'total': 1.5})
+        self.assertNotIn('index', events[1])
+        self.assertEqual(self.store.stats()['inserted'], 2)
+
+    def test_paging_and_filters(self):
+        self.fill()
+        seen, cursor = [], None
+        while True:
+            page, cursor = self.store.query(statuses=['Blocked'], limit=7, cursor=cursor)
+            seen.extend(record['ts'] for record in page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, [1000.0 + i for i in range(57, -1, -3)])
+
+        page, _ = self.store.query(since=1010, until=1020, ip='10.0.0.2')
+        self.assertEqual([record['ts'] for record in page], [1018.0])
+        with self.assertRaises(ValueError):
+            self.store.query(cursor='not-a-cursor')
+
+    def test_counts_and_top_ips(self):
+        self.fill()
+        self.assertEqual(self.store.status_counts(), {'Success': 32, 'Blocked': 20, 'Failed': 8})
+        self.assertEqual(self.store.status_counts(since=1030)['Blocked'], 10)
+        top = self.store.top_ips('Blocked', limit=2)
+        self.assertEqual(top, [{'ip': '10.0.0.0', 'count': 5}, {'ip': '10.0.0.1', 'count': 5}])
+        self.assertEqual(self.store.recent(2)[-1]['ts'], 1059.0)
+
+    def test_rollup_matches_in_memory_rollups(self):
+        """SQL-counted buckets give the same stats as recording each event in memory"""
+        engine = RollupEngine(clock=lambda: 1059.5)
+        for i in range(60):
+            record = event(1000.0 + i, 'Blocked' if i % 3 == 0 else 'Success', field='name' if i % 3 == 0 else None)
+            record['latency_ms'] = {'total': float(i % 7)}
+            engine.record(record)
+            self.store.add(record)
+        self.store.flush()
+        buckets = self.store.rollup(60, since=engine.window_start('minute', 120, 1059.5), until=1059.5)
+        self.assertEqual(summarize(buckets, 'minute', 120), engine.stats('minute', 120))
+        self.assertEqual([bucket.start for bucket in self.store.rollup(1, since=1058)], [1058, 1059])
+        self.assertEqual(self.store.field_counts(), {'name': 20})
+
+    def test_rollup_reads_one_snapshot(self):
+        """A batch committed between the count and latency queries is left out of both"""
+        self.store.add(event(1000.0))
+        self.store.flush()
+        reader = self.store._reader()
+        store = self.store
+
+        class InterleavingReader:
+            def execute(self, sql, params=()):
+                if 'latency_key' in sql:
+                    store.add(event(1001.0))
+                    store.flush()
+                return reader.execute(sql, params)
+
+        self.store._local.connection = InterleavingReader()
+        buckets = self.store.rollup(1)
+        self.store._local.connection = reader
+        self.assertEqual([(bucket.start, bucket.latency.count) for bucket in buckets], [(1000, 1)])
+        self.assertEqual([bucket.start for bucket in self.store.rollup(1)], [1000, 1001])
+
+    def test_retention_pruning(self):
+        self.fill()
+        self.assertEqual(self.store.prune(before=1030), 30)
+        self.assertEqual(sum(self.store.status_counts().values()), 30)
+
+    def test_import_log(self):
+        lines = ['{"ts": 5.0, "status": "Blocked", "ip": "10.0.0.9", "field": "name"}\n', '\n']
+        self.assertEqual(import_log(self.store, lines), 1)
+        self.store.flush()
+        self.assertEqual(self.store.top_ips(), [{'ip': '10.0.0.9', 'count': 1}])
+
+    def test_import_only_older_history(self):
+        """Re-importing with the oldest stored time as cutoff adds nothing already held"""
+        self.store.add(event(20.0))
+        self.store.flush()
+        lines = [f'{{"ts": {ts}, "status": "Success"}}\n' for ts in (10.0, 15.0, 20.0, 25.0)]
+        self.assertEqual(import_log(self.store, lines, before=self.store.oldest()), 2)
+        self.store.flush()
+        self.assertEqual(import_log(self.store, lines, before=self.store.oldest()), 0)
+        self.assertEqual(self.store.status_counts()['Success'], 3)
+
+    def test_import_skips_expired_history(self):
+        """After a prune moves the oldest time forward, history past retention is not imported again"""
+        self.fill()
+        self.store.prune(before=1030)
+        lines = [f'{{"ts": {ts}, "status": "Success"}}\n' for ts in (1000.0, 1025.0, 1029.0)]
+        self.assertEqual(import_log(self.store, lines, before=self.store.oldest(), since=1030), 0)
+        self.assertEqual(import_log(self.store, lines, before=self.store.oldest(), since=1028), 1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
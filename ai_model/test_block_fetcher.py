@@ -0,0 +1,47 @@
+import unittest
+from fakes import FakeWeb3
+from block_fetcher import BlockRangeFetcher
+
+class TestBlockRangeFetcher(unittest.TestCase):
+    def setUp(self):
+        self.delays = []
+
+    def fetcher(self, w3, **options):
+        return BlockRangeFetcher(w3, sleep=self.delays.append, **options)
+
+    def test_ordered_and_bounded(self):
+        """Blocks come out in order however the workers finish, with at most ``workers`` in flight"""
+        w3 = FakeWeb3(latency=0.002)
+        progress = []
+        fetcher = self.fetcher(w3, workers=4, chunk_size=3, on_progress=lambda done, total: progress.append((done, total)))
+        numbers = [block['number'] for block in fetcher.fetch(10, 60)]
+        self.assertEqual(numbers, list(range(10, 60)))
+        self.assertLessEqual(w3.eth.max_active, 4)
+        self.assertEqual(progress[0], (3, 50))
+        self.assertEqual(progress[-1], (50, 50))
+        self.assertEqual(len(progress), 17)
+
+    def test_retries_with_backoff(self):
+        w3 = FakeWeb3(failures={7: 2}, latency=0.002)
+        blocks = list(self.fetcher(w3, workers=2, chunk_size=5, backoff=0.5).fetch(0, 10))
+        self.assertEqual(len(blocks), 10)
+        self.assertEqual(self.delays, [0.5, 1.0])
+
+    def test_gives_up_after_retries(self):
+        w3 = FakeWeb3(failures={3: 10}, latency=0.002)
+        with self.assertRaises(ConnectionError):
+            list(self.fetcher(w3, workers=2, chunk_size=2, retries=2).fetch(0, 20))
+        self.assertEqual(self.delays, [0.5, 1.0])
+
+    def test_empty_range_and_early_stop(self):
+        self.assertEqual(list(self.fetcher(FakeWeb3()).fetch(5, 5)), [])
+        blocks = self.fetcher(FakeWeb3(latency=0.002), workers=2, chunk_size=10).fetch(0, 10000)
+        self.assertEqual(next(blocks)['number'], 0)
+        blocks.close()
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            BlockRangeFetcher(FakeWeb3(), workers=0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,147 @@
+import unittest
+import asyncio
+from fakes import FakeWeb3, AsyncFakeEth
+from block_window import RecentBlockWindow, AsyncRecentBlockWindow, SenderCounts, sender_key
+
+ALICE = '0x' + 'ab' * 20
+BOB = '0x' + '0c' * 20
+
+def make_block(number, fork=''):
+    return {
+        'number': number,
+        'hash': f"{fork}{number}",
+        'parentHash': f"{fork}{number - 1}" if number else None,
+        'gasLimit': 6721975,
+        # Alice sends one transaction per block, Bob one on even blocks of the main chain
+        'transactions': [{'from': ALICE}] + ([{'from': BOB}] if number % 2 == 0 and not fork else [])
+    }
+
+def fake_web3():
+    """A node at block 9 serving the main chain, or the ``eth.fork`` chain once a test sets it"""
+    w3 = FakeWeb3(block_number=9)
+    w3.eth.fork = ''
+    w3.eth.blocks = lambda number: make_block(number, w3.eth.fork)
+    return w3
+
+class TestRecentBlockWindow(unittest.TestCase):
+    def setUp(self):
+        self.w3 = fake_web3()
+        self.window = RecentBlockWindow(self.w3, size=5, refresh_interval=60)
+
+    def tearDown(self):
+        self.window.stop()
+
+    def numbers(self):
+        return [block['number'] for block in self.window.blocks()]
+
+    def test_fills_then_fetches_only_new_blocks(self):
+        """The first read fills the window, later refreshes fetch just the new heads"""
+        self.assertEqual(self.numbers(), [5, 6, 7, 8, 9])
+        self.window.refresh()
+        self.w3.eth.block_number = 11
+        self.window.refresh()
+        self.assertEqual(self.numbers(), [7, 8, 9, 10, 11])
+        self.assertEqual(self.w3.eth.requested, [5, 6, 7, 8, 9, 10, 11])
+        self.assertEqual(self.window.latest()['number'], 11)
+
+    def test_reads_are_snapshots(self):
+        blocks = self.window.blocks()
+        self.w3.eth.block_number = 10
+        self.window.refresh()
+        self.assertEqual(blocks[-1]['number'], 9)
+        self.assertIsInstance(self.window.blocks(), tuple)
+
+    def test_large_jump_refetches_window(self):
+        self.window.refresh()
+        self.w3.eth.block_number = 100
+        self.window.refresh()
+        self.assertEqual(self.numbers(), [96, 97, 98, 99, 100])
+        self.assertEqual(self.window.stats()['fetched'], 10)
+
+    def test_reorg_refetches_window(self):
+        """A new head that does not chain onto the window replaces all of it"""
+        self.window.refresh()
+        self.w3.eth.fork = 'b'
+        self.w3.eth.block_number = 10
+        self.window.refresh()
+        self.assertEqual([block['hash'] for block in self.window.blocks()], ['b6', 'b7', 'b8', 'b9', 'b10'])
+        self.assertEqual(self.window.stats()['reorgs'], 1)
+
+        self.w3.eth.block_number = 8
+        self.window.refresh()
+        self.assertEqual(self.numbers(), [4, 5, 6, 7, 8])
+        self.assertEqual(self.window.stats()['reorgs'], 2)
+
+    def test_sender_counts_follow_the_window(self):
+        """Counts change only for blocks entering and leaving, including after a reorg"""
+        self.assertEqual(self.window.sender_count(ALICE), 5)
+        self.assertEqual(self.window.sender_count(BOB), 2)
+        self.w3.eth.block_number = 10
+        self.window.refresh()
+        self.assertEqual(self.window.sender_count(BOB.upper().replace('0X', '0x')), 3)
+
+        self.w3.eth.fork = 'b'
+        self.w3.eth.block_number = 11
+        self.window.refresh()
+        self.assertEqual(self.window.sender_count(ALICE), 5)
+        self.assertEqual(self.window.sender_count(BOB), 0)
+        self.assertEqual(self.window.stats()['senders'], 1)
+        self.assertEqual(self.window.sender_count(None), 0)
+
+    def test_sender_index_is_compact(self):
+        """Senders are held as raw bytes and forgotten when their blocks leave"""
+        counts = SenderCounts()
+        blocks = [{'hash': n, 'transactions': [{'from': '0x%040x' % (n * 1000 + i)} for i in range(1000)]}
+                  for n in range(3)]
+        for block in blocks:
+            counts.add(block)
+        self.assertEqual(len(counts), 3000)
+        self.assertEqual(counts.count('0x%040x' % 1500), 1)
+        for block in blocks:
+            counts.remove(block)
+        self.assertEqual(len(counts), 0)
+        self.assertEqual(sender_key(bytes(20)), bytes(20))
+        self.assertIsNone(sender_key('0x1234'))
+
+    def test_short_chain(self):
+        self.w3.eth.block_number = 1
+        self.assertEqual(self.numbers(), [0, 1])
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            RecentBlockWindow(self.w3, size=0)
+
+class TestAsyncRecentBlockWindow(unittest.TestCase):
+    def test_fills_and_advances(self):
+        eth = fake_web3().eth
+
+        async def scenario():
+            w3 = FakeWeb3(AsyncFakeEth(eth))
+            window = AsyncRecentBlockWindow(w3, size=3, refresh_interval=60)
+            first = [block['number'] for block in await window.blocks()]
+            eth.block_number = 10
+            await window.refresh()
+            latest = await window.latest()
+            await window.stop()
+            return first, latest['number']
+
+        self.assertEqual(asyncio.run(scenario()), ([7, 8, 9], 10))
+        self.assertEqual(eth.requested, [7, 8, 9, 10])
+
+    def test_concurrent_first_use_fills_once(self):
+        """Coroutines racing to start the window share one fill and one refresh task"""
+        eth = fake_web3().eth
+
+        async def scenario():
+            w3 = FakeWeb3(AsyncFakeEth(eth))
+            window = AsyncRecentBlockWindow(w3, size=3, refresh_interval=60)
+            await asyncio.gather(window.start(), window.blocks(), window.sender_count(ALICE))
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            await window.stop()
+            return len(tasks)
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+        self.assertEqual(eth.requested, [7, 8, 9])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -4,7 +4,8 @@ import requests
 from datetime import datetime
 from web3 import Web3
 import numpy as np
-import joblib
+import os
+from xss_detection import load_scorer
 
 class TestBlockchainAI(unittest.TestCase):
     def setUp(self):
@@ -13,9 +14,9 @@ class TestBlockchainAI(unittest.TestCase):
         self.base_url = "http://localhost:5002"
         self.test_results = []
         
-        # Load AI model components
-        self.vectorizer = joblib.load('models/vectorizer.pkl')
-        self.model = joblib.load('models/naive_bayes_model.pkl')
+        # Load AI model components from the pickles, or from XSS_MODEL_BUNDLE when set
+        bundle_path = os.getenv('XSS_MODEL_BUNDLE') or None
+        self.scorer, _ = load_scorer('native' if bundle_path else 'sklearn', bundle_path=bundle_path)
         
         # Test account with some ETH
         self.test_account = self.w3.eth.accounts[0]
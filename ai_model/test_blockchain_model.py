@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from fakes import FakeWeb3
+from blockchain_model import BlockchainSecurityModel
+
+ALICE = '0x' + 'aa' * 20
+BOB = '0x' + 'bb' * 20
+
+class FakeOracle:
+    def get(self):
+        return 20
+
+class FakeWindow:
+    size = 2
+
+    def latest(self):
+        return {'gasLimit': 100000}
+
+    def sender_count(self, address):
+        return {ALICE: 3, BOB: 1}.get(address, 0)
+
+def make_block(number):
+    # Alice sends every block, Bob six times in block 2
+    transactions = [{'from': ALICE, 'value': 10**18, 'gasPrice': 20}]
+    if number == 2:
+        transactions += [{'from': BOB, 'value': 1, 'gasPrice': 20}] * 6
+    return {'number': number, 'hash': number, 'gasLimit': 50000 * (number + 1), 'transactions': transactions}
+
+class TestBlockchainSecurityModel(unittest.TestCase):
+    def setUp(self):
+        self.model = BlockchainSecurityModel(gas_oracle=FakeOracle(), block_window=FakeWindow())
+        self.model.w3 = FakeWeb3(block_number=4, blocks=make_block, balances={ALICE: 4 * 10**18, BOB: 0})
+        self.transactions = [
+            {'from': ALICE, 'value': 10**18, 'gasPrice': 40, 'gas': 50000},
+            {'from': BOB, 'value': 2 * 10**18},
+            {'from': ALICE, 'value': 2 * 10**18, 'gasPrice': 10},
+            {'value': 5}
+        ]
+
+    def test_extract_features_many(self):
+        """Columns match the single-transaction features; balances are fetched once per sender"""
+        features = self.model.extract_features_many(self.transactions)
+        self.assertEqual(features.shape, (4, 5))
+        np.testing.assert_allclose(features, [
+            [2.0, 1.0, 3, 0.5, 0.25],
+            [1.0, 2.0, 1, 0.21, 1.0],
+            [0.5, 2.0, 3, 0.21, 0.5],
+            [1.0, 5e-18, 0, 0.21, 0.0]
+        ])
+        self.assertEqual(self.model.w3.eth.balance_requests, [ALICE, BOB])
+        np.testing.assert_allclose(self.model.extract_features(self.transactions[0]), features[:1])
+
+    def test_errors_give_zero_rows(self):
+        self.assertEqual(self.model.extract_features_many([]).shape, (0, 5))
+        features = self.model.extract_features_many([{'from': '0x' + 'cc' * 20}])
+        np.testing.assert_array_equal(features, np.zeros((1, 5)))
+
+    def test_training_data_from_fetched_blocks(self):
+        """Features come from the fetched blocks; only balances are read, once per sender"""
+        X, y = self.model.generate_training_data(blocks=4, workers=2)
+        self.assertEqual(X.shape, (10, 5))
+        # Alice's recent count spans the two-block window ending at each block
+        np.testing.assert_array_equal(X[[0, 1, 2, 9], 2], [1, 2, 2, 2])
+        self.assertEqual(X[3, 2], 6)
+        np.testing.assert_allclose(X[[0, 1, 2, 9], 3], [0.42, 0.21, 0.14, 0.105])
+        self.assertEqual(y.tolist(), [0, 0, 0, 1, 1, 1, 1, 1, 1, 0])
+        self.assertEqual(self.model.w3.eth.balance_requests, [ALICE, BOB])
+
+    def test_predict_many(self):
+        self.model.model = RandomForestClassifier(n_estimators=5, random_state=42)
+        self.model.model.fit([[1, 0, 0, 0.2, 0], [3, 200, 20, 0.9, 1]], [0, 1])
+        verdicts = self.model.predict_many(self.transactions)
+        self.assertEqual(verdicts['is_suspicious'].dtype, bool)
+        self.assertEqual(verdicts['confidence'].shape, (4,))
+        self.assertEqual(verdicts['features'].shape, (4, 5))
+        self.assertEqual(len(self.model.predict_many([])['is_suspicious']), 0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,81 @@
+import unittest
+import json
+import threading
+from event_stream import EventBroadcaster, format_sse
+
+class TestEventBroadcaster(unittest.TestCase):
+    def test_fan_out(self):
+        """Every subscriber receives every event published while it is subscribed"""
+        broadcaster = EventBroadcaster()
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+        broadcaster.publish({'n': 1})
+        broadcaster.publish({'n': 2})
+        self.assertEqual(first.next(timeout=0), ([{'n': 1}, {'n': 2}], 0))
+        second.close()
+        broadcaster.publish({'n': 3})
+        self.assertEqual(first.next(timeout=0), ([{'n': 3}], 0))
+        self.assertEqual(broadcaster.stats(), {'subscribers': 1, 'published': 3, 'dropped': 0})
+
+    def test_slow_subscriber_drops_oldest(self):
+        """A full buffer drops the oldest events for that subscriber only"""
+        broadcaster = EventBroadcaster(buffer_size=3)
+        slow = broadcaster.subscribe()
+        fast = broadcaster.subscribe()
+        for n in range(5):
+            broadcaster.publish(n)
+            if n == 2:
+                self.assertEqual(fast.next(timeout=0), ([0, 1, 2], 0))
+        self.assertEqual(slow.next(timeout=0), ([2, 3, 4], 2))
+        self.assertEqual(fast.next(timeout=0), ([3, 4], 0))
+        self.assertEqual(slow.next(timeout=0), ([], 0))
+
+    def test_waiting_reader_woken_by_publish(self):
+        broadcaster = EventBroadcaster()
+        received = []
+        with broadcaster.subscribe() as subscription:
+            reader = threading.Thread(target=lambda: received.append(subscription.next(timeout=5)))
+            reader.start()
+            broadcaster.publish('event')
+            reader.join(5)
+        self.assertEqual(received, [(['event'], 0)])
+        self.assertEqual(broadcaster.stats()['subscribers'], 0)
+
+    def test_poller_runs_only_while_subscribed(self):
+        """One poll thread serves all subscribers and stops once the last one leaves"""
+        polled = threading.Event()
+        broadcaster = EventBroadcaster(poll=polled.set, poll_interval=0.01)
+        subscriptions = [broadcaster.subscribe() for _ in range(3)]
+        self.assertTrue(polled.wait(5))
+        poller = broadcaster._poller
+        self.assertIsNotNone(poller)
+        for subscription in subscriptions:
+            subscription.close()
+        poller.join(5)
+        self.assertFalse(poller.is_alive())
+        self.assertIsNone(broadcaster._poller)
+
+    def test_first_subscriber_skips_backlog(self):
+        """Events found by the catch-up poll before the first subscriber joins are not sent to it"""
+        backlog = ['old-1', 'old-2']
+        broadcaster = EventBroadcaster(poll=lambda: [broadcaster.publish(backlog.pop(0)) for _ in list(backlog)],
+                                       poll_interval=60)
+        with broadcaster.subscribe() as subscription:
+            self.assertEqual(backlog, [])
+            broadcaster.publish('new')
+            self.assertEqual(subscription.next(timeout=0), (['new'], 0))
+
+    def test_subscriber_limit(self):
+        broadcaster = EventBroadcaster(max_subscribers=2)
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+        self.assertIsNone(broadcaster.subscribe())
+        first.close()
+        self.assertIsNotNone(broadcaster.subscribe())
+        second.close()
+
+    def test_format_sse(self):
+        message = format_sse({'status': 'Blocked'}, 'decision')
+        self.assertEqual(message, 'event: decision\ndata: {"status":"Blocked"}\n\n')
+        self.assertEqual(json.loads(format_sse([1])[len('data: '):]), [1])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
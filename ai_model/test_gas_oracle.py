@@ -0,0 +1,60 @@
+import unittest
+import asyncio
+from fakes import FakeClock, FakeEth, FakeWeb3, AsyncFakeEth
+from gas_oracle import GasPriceOracle, AsyncGasPriceOracle
+
+class TestGasPriceOracle(unittest.TestCase):
+    def setUp(self):
+        self.w3 = FakeWeb3()
+        self.clock = FakeClock()
+        self.oracle = GasPriceOracle(self.w3, refresh_interval=60, history_size=3, clock=self.clock)
+
+    def tearDown(self):
+        self.oracle.stop()
+
+    def test_get_serves_cached_price(self):
+        """The first read fetches the price, later reads are served from memory"""
+        self.assertEqual(self.oracle.get(), 20)
+        self.w3.eth.gas_price = 50
+        self.assertEqual(self.oracle.get(), 20)
+        self.oracle.refresh()
+        self.assertEqual(self.oracle.get(), 50)
+
+    def test_staleness(self):
+        """Staleness is the time since the last successful refresh"""
+        self.assertIsNone(self.oracle.staleness())
+        self.oracle.refresh()
+        self.clock.now = 12.5
+        self.assertEqual(self.oracle.staleness(), 12.5)
+
+    def test_rolling_median_keeps_one_sample_per_block(self):
+        """Repeated refreshes within a block replace that block's sample"""
+        for block_number, gas_price in [(1, 10), (1, 100), (2, 30), (3, 40), (4, 50)]:
+            self.w3.eth.block_number = block_number
+            self.w3.eth.gas_price = gas_price
+            self.oracle.refresh()
+        # Only blocks 2-4 remain in a history of 3
+        self.assertEqual(self.oracle.median(), 40)
+
+    def test_invalid_mode(self):
+        """Unknown refresh modes are rejected"""
+        with self.assertRaises(ValueError):
+            GasPriceOracle(self.w3, mode='mempool')
+
+class TestAsyncGasPriceOracle(unittest.TestCase):
+    def test_concurrent_first_reads_fetch_once(self):
+        """Coroutines racing to start the oracle share one fetch and one refresh task"""
+        w3 = FakeWeb3(AsyncFakeEth(FakeEth()))
+
+        async def scenario():
+            oracle = AsyncGasPriceOracle(w3, refresh_interval=60)
+            prices = await asyncio.gather(oracle.get(), oracle.get(), oracle.start())
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            await oracle.stop()
+            return prices[:2], len(tasks)
+
+        self.assertEqual(asyncio.run(scenario()), ([20, 20], 1))
+        self.assertEqual(w3.eth.gas_price_requests, 1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,55 @@
+import unittest
+import csv
+import gzip
+import io
+import json
+from log_export import CSV_COLUMNS, export_rows, encode_chunks
+
+def entries(count):
+    for i in range(count):
+        yield {
+            'ts': 1737400000.0 + i,
+            'timestamp': '2025-01-20T19:06:40',
+            'ip': '10.0.0.1',
+            'endpoint': '/predict',
+            'status': 'Blocked' if i % 3 == 0 else 'Success',
+            'http_status': 403 if i % 3 == 0 else 200,
+            'field': 'name, "quoted"' if i % 3 == 0 else None,
+            'latency_ms': {'scoring': 0.5, 'total': 1.25}
+        }
+
+class TestLogExport(unittest.TestCase):
+    def test_ndjson(self):
+        data = b''.join(encode_chunks(export_rows(entries(5), 'ndjson')))
+        lines = data.decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[3])['ts'], 1737400003.0)
+
+    def test_csv(self):
+        """CSV rows carry the total latency and quote awkward values"""
+        data = b''.join(encode_chunks(export_rows(entries(4), 'csv')))
+        rows = list(csv.DictReader(io.StringIO(data.decode())))
+        self.assertEqual(tuple(rows[0]), CSV_COLUMNS)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]['field'], 'name, "quoted"')
+        self.assertEqual(rows[1]['field'], '')
+        self.assertEqual(rows[2]['latency_ms'], '1.25')
+
+    def test_gzip_chunks_stream(self):
+        """Compressed output is produced chunk by chunk and decompresses to the plain export"""
+        plain = b''.join(encode_chunks(export_rows(entries(3000), 'ndjson'), chunk_size=4096))
+        chunks = list(encode_chunks(export_rows(entries(3000), 'ndjson'), chunk_size=4096, compress=True))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(gzip.decompress(b''.join(chunks)), plain)
+
+    def test_chunks_are_bounded(self):
+        """The generator never joins more than about one chunk of rows"""
+        sizes = [len(chunk) for chunk in encode_chunks(export_rows(entries(2000), 'csv'), chunk_size=1024)]
+        self.assertLess(max(sizes), 1024 + 512)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export_rows(entries(1), 'xml')
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
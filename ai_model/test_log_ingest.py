@@ -0,0 +1,201 @@
+import unittest
+import os
+import shutil
+import tempfile
+import log_ingest
+from log_ingest import LogIngestor, OffsetIndex, parse_access_line, parse_timestamp
+
+def access_line(status, second=0, minute=20):
+    return f'127.0.0.1 - - [20/Jan/2025 21:{minute:02d}:{second:02d}] "POST /predict HTTP/1.1" {status} -\n'
+
+class TestLogIngestor(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.log_dir, 'app.log')
+        with open(self.log_path, 'w') as f:
+            f.write("Server starting...\n")
+            f.write(access_line(200, 1))
+            f.write(access_line(403, 2))
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def append(self, text):
+        with open(self.log_path, 'a') as f:
+            f.write(text)
+
+    def test_parse_access_line(self):
+        """Access lines for /predict become admin log entries; other lines are skipped"""
+        entry = parse_access_line(access_line(403, 5))
+        self.assertEqual(entry['status'], 'Blocked')
+        self.assertEqual(entry['timestamp'], '20/Jan/2025 21:20:05')
+        self.assertIsNone(parse_access_line('127.0.0.1 - - [20/Jan/2025 21:20:00] "GET /health HTTP/1.1" 200 -'))
+
+    def test_incremental_reads(self):
+        """Only appended lines are parsed, and a partial last line waits for its newline"""
+        ingestor = LogIngestor(self.log_path)
+        self.assertEqual(ingestor.refresh(), 2)
+        self.assertEqual(ingestor.refresh(), 0)
+
+        self.append(access_line(500, 3) + '127.0.0.1 - - [20/Jan/2025 21:20:04] "POST /pre')
+        self.assertEqual(ingestor.refresh(), 1)
+        self.append('dict HTTP/1.1" 200 -\n')
+        self.assertEqual(ingestor.refresh(), 1)
+
+        self.assertEqual(ingestor.stats(), {
+            'total_transactions': 4,
+            'successful_transactions': 2,
+            'blocked_transactions': 1,
+            'failed_transactions': 1
+        })
+        self.assertEqual(ingestor.offset, os.path.getsize(self.log_path))
+
+    def test_resume_from_persisted_state(self):
+        """A new ingestor continues from the saved offset and totals"""
+        LogIngestor(self.log_path).refresh()
+        self.append(access_line(200, 3))
+
+        ingestor = LogIngestor(self.log_path)
+        self.assertEqual(ingestor.refresh(), 1)
+        self.assertEqual(ingestor.stats()['total_transactions'], 3)
+        self.assertEqual(len(ingestor.snapshot()['logs']), 3)
+
+    def test_one_process_writes_state(self):
+        """A second reader of the same log keeps its state in memory until the first one closes"""
+        first = LogIngestor(self.log_path)
+        second = LogIngestor(self.log_path)
+        first.refresh()
+        saved = os.path.getmtime(first.state_path)
+        os.utime(first.state_path, (saved - 10, saved - 10))
+        self.append(access_line(200, 3))
+        self.assertEqual(second.refresh(), 3)
+        self.assertEqual(os.path.getmtime(first.state_path), saved - 10)
+
+        first.close()
+        self.append(access_line(200, 4))
+        second.refresh()
+        self.assertEqual(LogIngestor(self.log_path).offset, os.path.getsize(self.log_path))
+        second.close()
+
+    def test_rotation(self):
+        """Lines written before a rotation are not lost and totals carry over"""
+        ingestor = LogIngestor(self.log_path)
+        ingestor.refresh()
+        self.append(access_line(403, 3))
+        os.rename(self.log_path, self.log_path + '.1')
+        with open(self.log_path, 'w') as f:
+            f.write(access_line(200, 4))
+
+        self.assertEqual(ingestor.refresh(), 2)
+        self.assertEqual(ingestor.stats()['total_transactions'], 4)
+        self.assertEqual(ingestor.stats()['blocked_transactions'], 2)
+
+    def test_truncation(self):
+        """A log truncated in place is re-read from the start"""
+        ingestor = LogIngestor(self.log_path)
+        ingestor.refresh()
+        with open(self.log_path, 'w') as f:
+            f.write(access_line(500, 9))
+
+        self.assertEqual(ingestor.refresh(), 1)
+        self.assertEqual(ingestor.stats()['total_transactions'], 1)
+        self.assertEqual(ingestor.stats()['failed_transactions'], 1)
+
+    def test_recent_entries_bounded(self):
+        """Only the most recent entries are kept for the response"""
+        self.append(''.join(access_line(200, second) for second in range(10)))
+        ingestor = LogIngestor(self.log_path, recent_entries=5)
+        snapshot = ingestor.snapshot()
+        self.assertEqual(len(snapshot['logs']), 5)
+        self.assertEqual(snapshot['logs'][-1]['timestamp'], '20/Jan/2025 21:20:09')
+        self.assertEqual(snapshot['stats']['total_transactions'], 12)
+
+class TestLogQuery(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.log_dir, 'app.log')
+        # One request per 10 seconds from 21:00 to 21:59, every third one blocked
+        with open(self.log_path, 'w') as f:
+            for minute in range(60):
+                for second in range(0, 60, 10):
+                    f.write(access_line(403 if second % 30 == 0 else 200, second, minute))
+                f.write('127.0.0.1 - - [20/Jan/2025 21:00:00] "GET /admin/logs HTTP/1.1" 200 -\n')
+        self.ingestor = LogIngestor(self.log_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def at(self, minute, second=0):
+        return parse_timestamp(f'20/Jan/2025 21:{minute:02d}:{second:02d}')
+
+    def test_index_has_one_entry_per_minute(self):
+        """The sidecar index records the first line of every minute and survives a reload"""
+        self.ingestor.refresh()
+        self.assertEqual(len(self.ingestor.index.minutes), 60)
+        reloaded = OffsetIndex(self.log_path + '.idx')
+        self.assertEqual(list(reloaded.offsets), list(self.ingestor.index.offsets))
+
+    def test_time_range_and_status(self):
+        """Only entries inside the range with the requested status are returned"""
+        entries, next_cursor = self.ingestor.query(since=self.at(45), until=self.at(59, 59), statuses=['Blocked'])
+        self.assertIsNone(next_cursor)
+        self.assertEqual(len(entries), 30)
+        self.assertEqual(entries[0]['timestamp'], '20/Jan/2025 21:59:30')
+        self.assertEqual(entries[-1]['timestamp'], '20/Jan/2025 21:45:00')
+        self.assertTrue(all(entry['status'] == 'Blocked' for entry in entries))
+
+    def test_seek_skips_earlier_lines(self):
+        """A time-range query starts reading near the requested minute"""
+        self.ingestor.refresh()
+        self.assertGreater(self.ingestor.index.seek(self.at(45)), self.ingestor.index.seek(self.at(10)))
+        self.assertEqual(self.ingestor.index.seek(self.at(0)), 0)
+
+    def test_cursor_pagination(self):
+        """Following next_cursor visits every matching entry exactly once"""
+        seen = []
+        cursor = None
+        while True:
+            entries, cursor = self.ingestor.query(since=self.at(30), limit=25, cursor=cursor)
+            seen.extend(entries)
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 180)
+        self.assertEqual(len({entry['timestamp'] for entry in seen}), 180)
+        self.assertEqual(seen[0]['timestamp'], '20/Jan/2025 21:59:50')
+        self.assertEqual(seen, sorted(seen, key=lambda entry: parse_timestamp(entry['timestamp']), reverse=True))
+
+    def test_newest_page_reads_only_the_end(self):
+        """The first page comes from the end of the log, without reading it all"""
+        self.ingestor.refresh()
+        read = []
+        original = log_ingest._iter_back
+
+        def tracking_iter(f, end, chunk_size=1 << 16):
+            for offset, line in original(f, end, chunk_size=256):
+                read.append(offset)
+                yield offset, line
+
+        log_ingest._iter_back = tracking_iter
+        try:
+            entries, cursor = self.ingestor.query(limit=2)
+        finally:
+            log_ingest._iter_back = original
+        self.assertEqual([entry['timestamp'] for entry in entries], ['20/Jan/2025 21:59:50', '20/Jan/2025 21:59:40'])
+        self.assertLess(len(read), 5)
+        entries, _ = self.ingestor.query(limit=1, cursor=cursor)
+        self.assertEqual(entries[0]['timestamp'], '20/Jan/2025 21:59:30')
+        entries, _ = self.ingestor.query(until=self.at(10, 5), limit=1)
+        self.assertEqual(entries[0]['timestamp'], '20/Jan/2025 21:10:00')
+
+    def test_expired_cursor(self):
+        """Cursors from a truncated log are rejected"""
+        _, cursor = self.ingestor.query(limit=10)
+        with open(self.log_path, 'w') as f:
+            f.write(access_line(200))
+        with self.assertRaises(ValueError):
+            self.ingestor.query(cursor=cursor)
+        with self.assertRaises(ValueError):
+            self.ingestor.query(cursor='not-a-cursor')
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
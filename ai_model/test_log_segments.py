@@ -0,0 +1,170 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import log_ingest
+from fakes import FakeClock
+from log_segments import (LogRotator, write_segment, read_segment_header, iter_segment_lines,
+                          list_segments, segment_id)
+from log_ingest import LogIngestor, summarize_json_line
+from log_writer import BatchingLogWriter
+from prediction_events import parse_event_line
+
+def event_line(ts, status='Success'):
+    return json.dumps({'ts': ts, 'ip': '10.0.0.1', 'status': status}) + '\n'
+
+class TestLogSegments(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.log_dir, 'predictions.jsonl')
+        self.clock = FakeClock(1737400000.0)
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def write_live(self, lines):
+        with open(self.log_path, 'a') as f:
+            f.write(''.join(lines))
+
+    def rotate(self, rotator):
+        rotated = rotator.rotate()
+        self.clock.now += 10
+        os.utime(rotated, (self.clock.now - 10, self.clock.now - 10))
+        rotator.compress_pending()
+        return rotated
+
+    def test_segment_round_trip(self):
+        """A segment's header summarises it and its lines decompress unchanged"""
+        source = os.path.join(self.log_dir, 'source.log')
+        lines = [event_line(100.0 + i, 'Blocked' if i % 4 == 0 else 'Success') for i in range(40)]
+        with open(source, 'w') as f:
+            f.write(''.join(lines))
+
+        segment = os.path.join(self.log_dir, 'source.log.1.seg')
+        header = write_segment(source, segment, summarize_json_line)
+        self.assertEqual(read_segment_header(segment), header)
+        self.assertEqual(header['lines'], 40)
+        self.assertEqual((header['first_ts'], header['last_ts']), (100.0, 139.0))
+        self.assertEqual(header['counts'], {'Blocked': 10, 'Success': 30})
+        self.assertLess(os.path.getsize(segment), os.path.getsize(source))
+
+        decoded = [line.decode() for _, line in iter_segment_lines(segment)]
+        self.assertEqual(decoded, lines)
+        offset, line = next(iter_segment_lines(segment, start=len(lines[0]) * 5))
+        self.assertEqual(line.decode(), lines[5])
+
+    def test_rotation_and_pruning(self):
+        """The live log rotates by size, is compressed after the grace period and old segments are pruned"""
+        rotator = LogRotator(self.log_path, max_bytes=100, keep=2, summarize_line=summarize_json_line,
+                             grace=5, clock=self.clock)
+        self.assertFalse(rotator.due(99, self.clock.now))
+        self.assertTrue(rotator.due(100, self.clock.now))
+
+        for start in (0, 10, 20):
+            self.write_live([event_line(start + i) for i in range(3)])
+            rotated = rotator.rotate()
+            self.clock.now += 1
+            rotator.compress_pending()
+            # Still inside the grace period: left as a plain rotated file
+            self.assertTrue(os.path.exists(rotated))
+            self.assertEqual(list_segments(self.log_path)[-1], rotated)
+            self.clock.now += 10
+            os.utime(rotated, (self.clock.now - 10, self.clock.now - 10))
+            rotator.compress_pending()
+            self.assertFalse(os.path.exists(rotated))
+
+        segments = list_segments(self.log_path)
+        self.assertEqual(len(segments), 2)
+        self.assertEqual([read_segment_header(path)['first_ts'] for path in segments], [10, 20])
+        self.assertEqual(segment_id(segments[0]), segment_id(segments[0].replace('.seg', '.rotating')))
+
+    def test_age_based_rotation(self):
+        rotator = LogRotator(self.log_path, max_bytes=None, max_age=60, clock=self.clock)
+        self.assertFalse(rotator.due(10, self.clock.now - 59))
+        self.assertTrue(rotator.due(10, self.clock.now - 60))
+        self.assertFalse(rotator.due(0, self.clock.now - 600))
+
+    def test_query_across_segments(self):
+        """Queries read segments lazily, skipping those outside the time range by their headers"""
+        rotator = LogRotator(self.log_path, summarize_line=summarize_json_line, grace=5, clock=self.clock)
+        for hour in range(3):
+            self.write_live([event_line(hour * 3600 + minute * 60, 'Blocked' if minute % 2 else 'Success')
+                             for minute in range(60)])
+            self.rotate(rotator)
+        self.write_live([event_line(3 * 3600 + minute * 60) for minute in range(60)])
+        ingestor = LogIngestor(self.log_path, parse_line=parse_event_line)
+        # The first refresh reads the existing segments once for the totals
+        self.assertEqual(ingestor.refresh(), 4 * 60)
+
+        opened = []
+        original = log_ingest.iter_segment_lines
+
+        def tracking_iter(path, start=0):
+            opened.append(path)
+            return original(path, start)
+
+        log_ingest.iter_segment_lines = tracking_iter
+        try:
+            entries, _ = ingestor.query(since=2 * 3600 + 300, until=2 * 3600 + 599, statuses=['Blocked'])
+        finally:
+            log_ingest.iter_segment_lines = original
+
+        self.assertEqual([entry['ts'] for entry in entries], [2 * 3600 + minute * 60 for minute in (9, 7, 5)])
+        self.assertEqual(opened, [list_segments(self.log_path)[2]])
+
+        # Paging runs from the live log back through to the oldest segment
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = ingestor.query(limit=70, cursor=cursor)
+            seen.extend(entry['ts'] for entry in page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, [hour * 3600 + minute * 60 for hour in range(3, -1, -1) for minute in range(59, -1, -1)])
+
+    def test_ingestor_catches_up_on_rotated_parts(self):
+        """Entries rotated away before the ingestor read them still reach its totals"""
+        rotator = LogRotator(self.log_path, summarize_line=summarize_json_line, grace=5, clock=self.clock)
+        ingestor = LogIngestor(self.log_path, parse_line=parse_event_line)
+        self.write_live([event_line(float(i)) for i in range(3)])
+        self.assertEqual(ingestor.refresh(), 3)
+
+        # Two rotations between refreshes, one finishing a partly read file
+        self.write_live([event_line(3.0, 'Blocked')])
+        self.rotate(rotator)
+        self.write_live([event_line(4.0), event_line(5.0, 'Blocked')])
+        self.rotate(rotator)
+        ingestor = LogIngestor(self.log_path, parse_line=parse_event_line)
+        self.assertEqual(ingestor.refresh(), 3)
+        self.assertEqual(ingestor.totals, {'Success': 4, 'Blocked': 2, 'Failed': 0})
+
+        self.write_live([event_line(6.0)])
+        self.assertEqual(ingestor.refresh(), 1)
+        self.assertEqual([entry['ts'] for entry in ingestor.recent], [float(i) for i in range(7)])
+
+        # A fresh ingestor counts the history kept in segments as well as the live log
+        for path in (ingestor.state_path, ingestor.index.path):
+            os.remove(path)
+        fresh = LogIngestor(self.log_path, parse_line=parse_event_line)
+        self.assertEqual(fresh.refresh(), 7)
+
+    def test_writer_rotates_live_log(self):
+        """The log writer rotates a file once it reaches the size limit and keeps writing"""
+        rotator = LogRotator(self.log_path, max_bytes=200, summarize_line=summarize_json_line, grace=0)
+        writer = BatchingLogWriter(batch_size=1, flush_interval=0.01, echo_stream=None, rotators=[rotator])
+        for i in range(20):
+            writer.submit(self.log_path, event_line(float(i)))
+        writer.flush()
+        writer.close()
+
+        self.assertGreater(rotator.rotations, 0)
+        rotator.compress_pending()
+        total = sum(read_segment_header(path)['lines'] for path in list_segments(self.log_path))
+        if os.path.exists(self.log_path):
+            with open(self.log_path) as f:
+                total += len(f.readlines())
+        self.assertEqual(total, 20)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,98 @@
+import unittest
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from log_writer import BatchingLogWriter, QueuedFileHandler
+
+class BlockingStream:
+    """Echo stream that stalls the writer thread until released"""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.lines = []
+
+    def write(self, text):
+        self.entered.set()
+        self.release.wait(5)
+        self.lines.append(text)
+
+    def flush(self):
+        pass
+
+class TestBatchingLogWriter(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.app_log = os.path.join(self.log_dir, 'app.log')
+        self.security_log = os.path.join(self.log_dir, 'security.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_lines_written_in_order_per_file(self):
+        """Queued lines reach their own files in submission order"""
+        writer = BatchingLogWriter(batch_size=8, flush_interval=0.05, echo_stream=None)
+        for i in range(50):
+            writer.submit(self.app_log, f"app {i}\n")
+            if i % 10 == 0:
+                writer.submit(self.security_log, f"security {i}\n")
+        writer.flush()
+
+        self.assertEqual(self.read(self.app_log), ''.join(f"app {i}\n" for i in range(50)))
+        self.assertEqual(self.read(self.security_log), ''.join(f"security {i}\n" for i in range(0, 50, 10)))
+        stats = writer.stats()
+        self.assertEqual(stats['written'], 55)
+        self.assertEqual(stats['dropped'], 0)
+        self.assertLess(stats['batches'], 55)
+        writer.close()
+
+    def test_overload_drops_instead_of_blocking(self):
+        """A full queue drops and counts new lines rather than blocking the caller"""
+        stream = BlockingStream()
+        writer = BatchingLogWriter(max_queue=3, batch_size=1, flush_interval=0.01, echo_stream=stream)
+        writer.submit(self.app_log, "first\n", echo=True)
+        self.assertTrue(stream.entered.wait(5))
+
+        accepted = [writer.submit(self.app_log, f"line {i}\n") for i in range(10)]
+        self.assertEqual(accepted.count(True), 3)
+        self.assertEqual(writer.stats()['dropped'], 7)
+
+        stream.release.set()
+        writer.close()
+        self.assertEqual(self.read(self.app_log), "first\nline 0\nline 1\nline 2\n")
+        self.assertEqual(stream.lines, ["first\n"])
+
+    def test_close_writes_pending_lines(self):
+        """Closing the writer flushes what is still queued"""
+        writer = BatchingLogWriter(flush_interval=10, fsync='batch', echo_stream=None)
+        writer.submit(self.app_log, "pending\n")
+        writer.close()
+        self.assertEqual(self.read(self.app_log), "pending\n")
+
+    def test_unknown_fsync_policy(self):
+        with self.assertRaises(ValueError):
+            BatchingLogWriter(fsync='sometimes')
+
+    def test_logging_handler(self):
+        """Records sent through the logging module are queued for the writer"""
+        writer = BatchingLogWriter(flush_interval=0.01, fsync='interval', echo_stream=None)
+        logger = logging.getLogger('test_log_writer')
+        logger.propagate = False
+        handler = QueuedFileHandler(writer, self.app_log, echo=False)
+        logger.addHandler(handler)
+        try:
+            logger.warning("queued message")
+            writer.flush()
+        finally:
+            logger.removeHandler(handler)
+            writer.close()
+        self.assertEqual(self.read(self.app_log), "queued message\n")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,80 @@
+import unittest
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from prometheus_client import REGISTRY
+import metrics
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def event(status='Blocked', field='name', index=None):
+    record = {
+        'ts': 1000.0,
+        'endpoint': '/predict/batch',
+        'status': status,
+        'field': field,
+        'stage': 'model',
+        'latency_ms': {'parse': 0.2, 'vectorize': 0.5, 'model': 1.5, 'total': 4.0}
+    }
+    if index is not None:
+        record['index'] = index
+    return record
+
+class TestMetrics(unittest.TestCase):
+    def test_observe_event(self):
+        """Every record is counted, but a batch's shared latencies are observed once"""
+        decisions = sample('predict_decisions_total', endpoint='/predict/batch', status='Blocked', stage='model')
+        fields = sample('predict_blocked_fields_total', endpoint='/predict/batch', field='name')
+        vectorize = sample('predict_stage_seconds_count', endpoint='/predict/batch', stage='vectorize')
+        total = sample('predict_request_seconds_sum', endpoint='/predict/batch')
+
+        for index in range(3):
+            metrics.observe_event(event(index=index))
+
+        self.assertEqual(sample('predict_decisions_total', endpoint='/predict/batch', status='Blocked',
+                                stage='model') - decisions, 3)
+        self.assertEqual(sample('predict_blocked_fields_total', endpoint='/predict/batch', field='name') - fields, 3)
+        self.assertEqual(sample('predict_stage_seconds_count', endpoint='/predict/batch',
+                                stage='vectorize') - vectorize, 1)
+        self.assertAlmostEqual(sample('predict_request_seconds_sum', endpoint='/predict/batch') - total, 0.004)
+        self.assertEqual(sample('predict_stage_seconds_count', endpoint='/predict/batch', stage='total'), 0)
+
+    def test_cache_lookups_and_render(self):
+        hits = sample('verdict_cache_lookups_total', result='hit')
+        misses = sample('verdict_cache_lookups_total', result='miss')
+        metrics.observe_cache_lookup(3, 1)
+        metrics.observe_cache_lookup(0, 2)
+        self.assertEqual(sample('verdict_cache_lookups_total', result='hit') - hits, 3)
+        self.assertEqual(sample('verdict_cache_lookups_total', result='miss') - misses, 3)
+
+        metrics.record_model_load(0.25, 'abc123', 'native')
+        body, content_type = metrics.render()
+        self.assertTrue(content_type.startswith('text/plain'))
+        self.assertIn(b'xss_model_info{backend="native",version="abc123"} 1.0', body)
+        self.assertIn(b'xss_model_load_seconds 0.25', body)
+
+class TestMultiprocessMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics_dir = tempfile.mkdtemp()
+        self.env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=self.metrics_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.metrics_dir)
+
+    def run_python(self, code):
+        return subprocess.run([sys.executable, '-c', code], env=self.env, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True).stdout
+
+    def test_workers_are_summed(self):
+        """Samples written by separate worker processes add up in any worker's /metrics"""
+        for _ in range(2):
+            self.run_python("import metrics; metrics.RPC_ERRORS.labels('gas_price').inc(2)")
+        body = self.run_python("import sys, metrics; sys.stdout.buffer.write(metrics.render()[0])")
+        self.assertIn(b'rpc_errors_total{call="gas_price"} 4.0', body)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
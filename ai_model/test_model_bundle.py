@@ -0,0 +1,73 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import joblib
+from xss_scorer import NativeScorer
+from model_bundle import export_bundle, load_bundle, is_bundle, MANIFEST_NAME
+from xss_detection import load_scorer
+
+class TestModelBundle(unittest.TestCase):
+    def setUp(self):
+        self.vectorizer = joblib.load('models/vectorizer.pkl')
+        self.model = joblib.load('models/naive_bayes_model.pkl')
+        self.scorer = NativeScorer.from_sklearn(self.vectorizer, self.model)
+        self.bundle_dir = tempfile.mkdtemp()
+        export_bundle(self.scorer, self.bundle_dir, 'abc123')
+
+    def tearDown(self):
+        shutil.rmtree(self.bundle_dir)
+
+    def test_round_trip(self):
+        """A loaded bundle is memory-mapped and scores exactly like the pickled model"""
+        loaded, manifest = load_bundle(self.bundle_dir)
+        self.assertEqual(manifest['model_version'], 'abc123')
+        self.assertIsInstance(loaded.weights, np.memmap)
+        self.assertFalse(loaded.weights.flags.writeable)
+        # Key lookups read the mapped blob in place rather than a private copy
+        self.assertIs(loaded._blob.obj, loaded.key_blob)
+
+        inputs = ["John Doe", "<script>alert('xss')</script>", "特殊字符测试", "", "a" * 300]
+        np.testing.assert_array_equal(loaded.predict_proba(inputs), self.scorer.predict_proba(inputs))
+        np.testing.assert_array_equal(loaded.classes_, self.model.classes_)
+
+    def test_checksum_mismatch(self):
+        """A modified array file is rejected"""
+        weights_path = os.path.join(self.bundle_dir, 'weights.npy')
+        with open(weights_path, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 0xFF]))
+        with self.assertRaises(ValueError):
+            load_bundle(self.bundle_dir)
+
+    def test_format_version_mismatch(self):
+        """Bundles written in another format version are rejected"""
+        manifest_path = os.path.join(self.bundle_dir, MANIFEST_NAME)
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        manifest['format_version'] = 999
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+        with self.assertRaises(ValueError):
+            load_bundle(self.bundle_dir)
+
+    def test_load_scorer_accepts_either_format(self):
+        """load_scorer opens pickles or a bundle, and bundles need the native backend"""
+        self.assertTrue(is_bundle(self.bundle_dir))
+        self.assertFalse(is_bundle('models'))
+
+        pickled, pickled_version = load_scorer('native')
+        bundled, bundled_version = load_scorer('native', bundle_path=self.bundle_dir)
+        self.assertEqual(bundled_version, 'abc123')
+        self.assertEqual(len(pickled_version), 12)
+        np.testing.assert_array_equal(bundled.predict_proba(["<svg onload=alert(1)>"]),
+                                      pickled.predict_proba(["<svg onload=alert(1)>"]))
+        with self.assertRaises(ValueError):
+            load_scorer('sklearn', bundle_path=self.bundle_dir)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,78 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from fakes import FakeClock
+from prediction_events import PredictionEventLog, StageTimer, decision_status, parse_event_line
+from log_ingest import LogIngestor
+
+class TestPredictionEvents(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.log_dir, 'predictions.jsonl')
+        self.events = PredictionEventLog(self.path)
+
+    def tearDown(self):
+        self.events.close()
+        shutil.rmtree(self.log_dir)
+
+    def test_decision_status(self):
+        """Status comes from the response code, not from digits elsewhere in the line"""
+        self.assertEqual(decision_status(200), 'Success')
+        self.assertEqual(decision_status(403), 'Blocked')
+        self.assertEqual(decision_status(400), 'Failed')
+        self.assertEqual(decision_status(500), 'Failed')
+
+    def test_stage_timer(self):
+        """Stage latencies are reported in milliseconds and repeated stages add up"""
+        clock = FakeClock()
+        timer = StageTimer(clock)
+        with timer.stage('scoring'):
+            clock.now += 0.002
+        with timer.stage('transaction'):
+            clock.now += 0.001
+        with timer.stage('transaction'):
+            clock.now += 0.001
+        self.assertEqual(timer.latency_ms(), {'scoring': 2.0, 'transaction': 2.0, 'total': 4.0})
+
+    def test_record_round_trip(self):
+        """Each decision is one JSON line that decodes into an admin log entry"""
+        self.events.record('10.0.0.200', '/predict', 403, 'name', 0.97, 'model', 'abc123', {'scoring': 1.5})
+        self.events.record('10.0.0.1', '/predict/batch', 200, stage='prefilter', index=3)
+
+        with open(self.path) as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0])['http_status'], 403)
+
+        blocked = parse_event_line(lines[0])
+        self.assertEqual(blocked['status'], 'Blocked')
+        self.assertEqual(blocked['type'], 'Security Alert')
+        self.assertEqual(blocked['field'], 'name')
+        self.assertEqual(blocked['model_version'], 'abc123')
+        self.assertEqual(blocked['latency_ms'], {'scoring': 1.5})
+
+        success = parse_event_line(lines[1])
+        self.assertEqual(success['status'], 'Success')
+        self.assertEqual(success['ip'], '10.0.0.1')
+        self.assertEqual(success['index'], 3)
+        self.assertIsNone(parse_event_line('\n'))
+
+    def test_ingested_by_log_reader(self):
+        """The admin log reader consumes the event log directly"""
+        for http_status in (200, 200, 403, 500):
+            self.events.record('10.0.0.1', '/predict', http_status)
+        ingestor = LogIngestor(self.path, parse_line=parse_event_line)
+        self.assertEqual(ingestor.snapshot()['stats'], {
+            'total_transactions': 4,
+            'successful_transactions': 2,
+            'blocked_transactions': 1,
+            'failed_transactions': 1
+        })
+        entries, _ = ingestor.query(since=0, statuses=['Blocked'])
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(len(ingestor.index.minutes), 1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
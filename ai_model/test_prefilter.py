@@ -0,0 +1,50 @@
+import unittest
+from prefilter import MultiPatternMatcher, Prefilter
+
+class TestMultiPatternMatcher(unittest.TestCase):
+    def test_finds_overlapping_patterns(self):
+        """Patterns sharing prefixes and suffixes are all found"""
+        matcher = MultiPatternMatcher(['he', 'she', 'his', 'hers'])
+        self.assertEqual(matcher.search('ushers'), 'she')
+        self.assertEqual(matcher.search('ahis'), 'his')
+        self.assertIsNone(matcher.search('xyz'))
+
+    def test_suffix_match_through_fail_links(self):
+        """A pattern ending inside a longer partial match is detected"""
+        matcher = MultiPatternMatcher(['<script', 'ript:'])
+        self.assertEqual(matcher.search('<scrjavascript:'), 'ript:')
+
+class TestPrefilter(unittest.TestCase):
+    def setUp(self):
+        self.prefilter = Prefilter()
+
+    def test_benign_fast_path(self):
+        """Plain names and addresses are passed without the model"""
+        for value in ["John Doe", "123 Main St., Apt #4", "O'Connor Street", "New-York"]:
+            self.assertEqual(self.prefilter.classify(value), ('normal', 1.0), value)
+
+    def test_attack_markers(self):
+        """Obvious XSS markers are blocked regardless of case"""
+        for value in ["<script>alert('xss')</script>",
+                      "<IMG SRC=JaVaScRiPt:alert('XSS')>",
+                      "<img src=x onerror=alert('XSS')>",
+                      "<svg/onload=alert(1)>"]:
+            self.assertEqual(self.prefilter.classify(value), ('attack', 1.0), value)
+
+    def test_ambiguous_inputs_left_to_model(self):
+        """Inputs that are neither plainly benign nor marked are undecided"""
+        for value in ["user@example.com", "'; DROP TABLE users--", "特殊字符测试", "<b>bold</b>"]:
+            self.assertIsNone(self.prefilter.classify(value), value)
+
+    def test_shortcuts_can_be_disabled(self):
+        """Each shortcut direction can be switched off independently"""
+        no_benign = Prefilter(benign_shortcut=False)
+        self.assertIsNone(no_benign.classify("John Doe"))
+        self.assertEqual(no_benign.classify("<script>"), ('attack', 1.0))
+
+        no_attack = Prefilter(attack_shortcut=False)
+        self.assertIsNone(no_attack.classify("<script>"))
+        self.assertEqual(no_attack.classify("John Doe"), ('normal', 1.0))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,82 @@
+import unittest
+import random
+from fakes import FakeClock
+from rollups import LatencySketch, RollupEngine, RollupSeries
+
+def event(ts, status='Success', field=None, total=5.0):
+    return {'ts': ts, 'status': status, 'field': field, 'latency_ms': {'total': total}}
+
+class TestLatencySketch(unittest.TestCase):
+    def test_quantiles_within_relative_accuracy(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(1.5, 0.8) for _ in range(5000)]
+        sketch = LatencySketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+        values.sort()
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            self.assertAlmostEqual(sketch.quantile(q), exact, delta=exact * 0.011)
+
+    def test_merge_matches_single_sketch(self):
+        """Merging per-slot sketches gives the same answer as one sketch over all values"""
+        combined, first, second = LatencySketch(), LatencySketch(), LatencySketch()
+        for i in range(1, 200):
+            combined.add(i / 10)
+            (first if i % 2 else second).add(i / 10)
+        first.merge(second)
+        self.assertEqual(first.buckets, combined.buckets)
+        self.assertEqual(first.summary(), combined.summary())
+
+    def test_empty_and_zero(self):
+        sketch = LatencySketch()
+        self.assertIsNone(sketch.quantile(0.5))
+        self.assertEqual(sketch.summary(), {'count': 0})
+        sketch.add(0.0)
+        self.assertEqual(sketch.quantile(0.99), 0.0)
+
+class TestRollups(unittest.TestCase):
+    def test_ring_reuses_slots(self):
+        """Once the ring wraps, a slot's old bucket is replaced and stale writes are ignored"""
+        series = RollupSeries(resolution=60, slots=3)
+        series.add(0, 'Success', None, 1.0)
+        series.add(180, 'Blocked', 'name', 1.0)
+        series.add(30, 'Success', None, 1.0)
+        buckets = series.buckets(0, 200)
+        self.assertEqual([bucket.start for bucket in buckets], [180])
+        self.assertEqual(buckets[0].statuses, {'Blocked': 1})
+
+    def test_stats_by_status_and_field(self):
+        clock = FakeClock(1737400000.0)
+        engine = RollupEngine(clock=clock)
+        engine.record(event(clock.now - 7200, 'Success', total=2.0))
+        engine.record(event(clock.now - 90, 'Blocked', 'email', 4.0))
+        engine.record(event(clock.now - 30, 'Blocked', 'name', 6.0))
+        engine.record(event(clock.now - 1, 'Failed', total=8.0))
+
+        stats = engine.stats('minute', 3600)
+        self.assertEqual(stats['totals'], {
+            'successful_transactions': 0,
+            'blocked_transactions': 2,
+            'failed_transactions': 1,
+            'total_transactions': 3
+        })
+        self.assertEqual(stats['fields'], {'email': 1, 'name': 1})
+        self.assertEqual(stats['latency_ms']['count'], 3)
+        self.assertEqual(stats['latency_ms']['max'], 8.0)
+        self.assertEqual([point['ts'] % 60 for point in stats['series']], [0] * len(stats['series']))
+
+        self.assertEqual(engine.stats('hour', 24 * 3600)['totals']['total_transactions'], 4)
+        self.assertEqual(engine.stats('second', 60)['totals']['total_transactions'], 2)
+
+    def test_window_limited_to_kept_history(self):
+        clock = FakeClock(1737400000.0)
+        engine = RollupEngine(clock=clock)
+        engine.record(event(clock.now - 400))
+        self.assertEqual(engine.stats('second', 3600)['totals']['total_transactions'], 0)
+        self.assertEqual(engine.span('second'), 300)
+        with self.assertRaises(ValueError):
+            engine.stats('day')
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,75 @@
+import unittest
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from web3 import Web3
+from rpc_batch import batch_call, batch_call_or_raise
+
+ADDRESS = '0x' + '0' * 39 + '1'
+
+class FakeNode(BaseHTTPRequestHandler):
+    """JSON-RPC endpoint that answers batches in reverse order and fails eth_getTransactionCount"""
+    posts = []
+
+    def log_message(self, *args):
+        pass
+
+    def answer(self, request):
+        response = {'jsonrpc': '2.0', 'id': request['id']}
+        if request['method'] == 'eth_getTransactionCount':
+            response['error'] = {'code': -32000, 'message': 'unsupported'}
+        else:
+            response['result'] = {'eth_gasPrice': '0x14', 'eth_blockNumber': '0x9',
+                                  'eth_getBalance': '0x64', 'eth_chainId': '0x539'}[request['method']]
+        return response
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        FakeNode.posts.append(body)
+        answer = [self.answer(request) for request in reversed(body)] if isinstance(body, list) else self.answer(body)
+        data = json.dumps(answer).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+class TestBatchCall(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeNode)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.w3 = Web3(Web3.HTTPProvider(f"http://127.0.0.1:{cls.server.server_address[1]}"))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FakeNode.posts.clear()
+
+    def test_one_round_trip_matched_by_id(self):
+        """Responses answered out of order still reach the call that made them"""
+        results = batch_call(self.w3, [lambda w3: w3.eth.gas_price,
+                                       lambda w3: w3.eth.block_number,
+                                       lambda w3: w3.eth.get_balance(ADDRESS)])
+        self.assertEqual(results, [20, 9, 100])
+        self.assertEqual(len(FakeNode.posts), 1)
+        self.assertEqual(len(FakeNode.posts[0]), 3)
+
+    def test_failed_call_falls_back_per_call(self):
+        """One failing call does not cost the others their results"""
+        results = batch_call(self.w3, [lambda w3: w3.eth.get_balance(ADDRESS),
+                                       lambda w3: w3.eth.get_transaction_count(ADDRESS)])
+        self.assertEqual(results[0], 100)
+        self.assertIsInstance(results[1], Exception)
+        with self.assertRaises(Exception):
+            batch_call_or_raise(self.w3, [lambda w3: w3.eth.get_transaction_count(ADDRESS)])
+
+    def test_single_call_is_not_batched(self):
+        self.assertEqual(batch_call_or_raise(self.w3, [lambda w3: w3.eth.gas_price]), [20])
+        self.assertIsInstance(FakeNode.posts[0], dict)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,48 @@
+import unittest
+from fakes import FakeClock
+from verdict_cache import VerdictCache
+
+class TestVerdictCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = VerdictCache(max_entries=2, ttl_seconds=10, clock=self.clock)
+        self.cache.set_model_version('v1')
+
+    def test_hit_and_miss(self):
+        """Cached values are returned and counted as hits"""
+        self.assertEqual(self.cache.get_many(['John Doe']), [None])
+        self.cache.put_many(['John Doe'], [('normal', 0.9)], 'v1')
+        self.assertEqual(self.cache.get_many(['John Doe', 'Jane']), [('normal', 0.9), None])
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted when full"""
+        self.cache.put_many(['a', 'b'], [('normal', 0.9), ('normal', 0.8)], 'v1')
+        self.cache.get_many(['a'])
+        self.cache.put_many(['c'], [('attack', 0.99)], 'v1')
+
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), [('normal', 0.9), None, ('attack', 0.99)])
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_ttl_expiry(self):
+        """Entries older than the TTL are treated as misses"""
+        self.cache.put_many(['a'], [('normal', 0.9)], 'v1')
+        self.clock.now = 11
+        self.assertEqual(self.cache.get_many(['a']), [None])
+        self.assertEqual(self.cache.stats()['expirations'], 1)
+
+    def test_model_change_invalidates(self):
+        """Changing the model version drops entries and rejects stale writes"""
+        self.cache.put_many(['a'], [('normal', 0.9)], 'v1')
+        self.cache.set_model_version('v2')
+        self.assertEqual(self.cache.get_many(['a']), [None])
+
+        self.cache.put_many(['a'], [('normal', 0.9)], 'v1')
+        self.assertEqual(self.cache.stats()['size'], 0)
+        self.assertEqual(self.cache.stats()['invalidations'], 1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,62 @@
+import unittest
+import random
+import string
+import numpy as np
+import joblib
+from xss_scorer import NativeScorer, SklearnScorer, build_scorer
+
+class TestNativeScorer(unittest.TestCase):
+    def setUp(self):
+        # Load the model and vectorizer
+        self.vectorizer = joblib.load('models/vectorizer.pkl')
+        self.model = joblib.load('models/naive_bayes_model.pkl')
+        self.sklearn_scorer = SklearnScorer(self.vectorizer, self.model)
+        self.native_scorer = NativeScorer.from_sklearn(self.vectorizer, self.model)
+
+    def test_parity_with_sklearn(self):
+        """Native scorer matches the sklearn pipeline on normal, attack and edge inputs"""
+        inputs = [
+            "John Doe",
+            "123 Main Street, New York",
+            "Downtown LA",
+            "<script>alert('xss')</script>",
+            "<img src=x onerror=alert('XSS')>",
+            "javascript:alert(document.cookie)",
+            "'; DROP TABLE users--",
+            "",
+            "   ",
+            "tabs\t\tand\n\nnewlines",
+            "特殊字符测试",
+            "ÀÉÎ Straße",
+            "a" * 1000
+        ]
+        rng = random.Random(42)
+        inputs += [
+            ''.join(rng.choice(string.printable) for _ in range(rng.randint(0, 80)))
+            for _ in range(500)
+        ]
+
+        expected = self.sklearn_scorer.predict_proba(inputs)
+        actual = self.native_scorer.predict_proba(inputs)
+
+        np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-12)
+        np.testing.assert_array_equal(
+            self.native_scorer.classes_[np.argmax(actual, axis=1)],
+            self.model.predict(self.vectorizer.transform(inputs))
+        )
+
+    def test_single_value(self):
+        """Scoring one value returns a single row of probabilities"""
+        probabilities = self.native_scorer.predict_proba(["<svg onload=alert(1)>"])
+        self.assertEqual(probabilities.shape, (1, len(self.model.classes_)))
+        self.assertAlmostEqual(float(probabilities.sum()), 1.0)
+
+    def test_build_scorer(self):
+        """Backends are selected by name"""
+        self.assertEqual(build_scorer(self.vectorizer, self.model, 'native').backend, 'native')
+        self.assertEqual(build_scorer(self.vectorizer, self.model, 'sklearn').backend, 'sklearn')
+        with self.assertRaises(ValueError):
+            build_scorer(self.vectorizer, self.model, 'gpu')
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,145 @@
+from abi_encoder import ContractEncoder
+
+# Contract configuration
+CONTRACT_ADDRESS = "0x7635615a00cbC897Bd020468C4338B194C8CC948"
+CONTRACT_ABI = [
+  {
+    "anonymous": False,
+    "inputs": [
+      {
+        "indexed": True,
+        "internalType": "address",
+        "name": "userAccount",
+        "type": "address"
+      },
+      {
+        "indexed": False,
+        "internalType": "string",
+        "name": "name",
+        "type": "string"
+      },
+      {
+        "indexed": False,
+        "internalType": "string",
+        "name": "userAddress",
+        "type": "string"
+      },
+      {
+        "indexed": False,
+        "internalType": "string",
+        "name": "location",
+        "type": "string"
+      }
+    ],
+    "name": "UserDataSaved",
+    "type": "event"
+  },
+  {
+    "inputs": [
+      {
+        "internalType": "string",
+        "name": "_name",
+        "type": "string"
+      },
+      {
+        "internalType": "string",
+        "name": "_userAddress",
+        "type": "string"
+      },
+      {
+        "internalType": "string",
+        "name": "_location",
+        "type": "string"
+      }
+    ],
+    "name": "saveUserData",
+    "outputs": [],
+    "stateMutability": "nonpayable",
+    "type": "function"
+  },
+  {
+    "inputs": [],
+    "name": "getUserData",
+    "outputs": [
+      {
+        "components": [
+          {
+            "internalType": "string",
+            "name": "name",
+            "type": "string"
+          },
+          {
+            "internalType": "string",
+            "name": "userAddress",
+            "type": "string"
+          },
+          {
+            "internalType": "string",
+            "name": "location",
+            "type": "string"
+          }
+        ],
+        "internalType": "struct UserDataStorage.UserData[]",
+        "name": "",
+        "type": "tuple[]"
+      }
+    ],
+    "stateMutability": "view",
+    "type": "function",
+    "constant": True
+  },
+  {
+    "inputs": [
+      {
+        "internalType": "address",
+        "name": "_userAddress",
+        "type": "address"
+      }
+    ],
+    "name": "getUserDataByAddress",
+    "outputs": [
+      {
+        "components": [
+          {
+            "internalType": "string",
+            "name": "name",
+            "type": "string"
+          },
+          {
+            "internalType": "string",
+            "name": "userAddress",
+            "type": "string"
+          },
+          {
+            "internalType": "string",
+            "name": "location",
+            "type": "string"
+          }
+        ],
+        "internalType": "struct UserDataStorage.UserData[]",
+        "name": "",
+        "type": "tuple[]"
+      }
+    ],
+    "stateMutability": "view",
+    "type": "function",
+    "constant": True
+  }
+]
+
+# Ganache chain ID and gas limit for saveUserData transactions
+CHAIN_ID = 1337
+SAVE_USER_DATA_GAS = 2000000
+
+# Precompiled calldata encoder so /predict never goes through the contract machinery
+contract_encoder = ContractEncoder(CONTRACT_ABI)
+
+def build_user_data_transaction(name, user_address, location, gas_price):
+    """Build the saveUserData transaction payload for MetaMask"""
+    return {
+        "to": CONTRACT_ADDRESS,
+        "data": contract_encoder.encode('saveUserData', name, user_address, location),
+        "gas": str(SAVE_USER_DATA_GAS),
+        "gasPrice": str(gas_price),
+        "chainId": CHAIN_ID  # nonce is set by MetaMask
+    }
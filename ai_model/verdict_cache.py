@@ -0,0 +1,114 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+class VerdictCache:
+    """In-process LRU + TTL cache of XSS verdicts keyed by a hash of the field value.
+
+    Entries are tied to the model version they were computed with; switching
+    to a different version clears the cache so stale verdicts are never served.
+    Each ``get_many`` reports its (hits, misses) to every callable in ``listeners``.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.model_version = None
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.listeners = []
+
+    @staticmethod
+    def make_key(value):
+        """Fixed-size content hash of a field value"""
+        return hashlib.blake2b(value.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    def set_model_version(self, model_version):
+        """Record the version of the loaded model, dropping all entries if it changed"""
+        with self._lock:
+            if model_version != self.model_version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.model_version = model_version
+
+    def get_many(self, values):
+        """Return the cached (label, confidence) for each value, or None on a miss"""
+        now = self._clock()
+        results = []
+        hits = 0
+        with self._lock:
+            for value in values:
+                key = self.make_key(value)
+                entry = self._entries.get(key)
+                if entry is None:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+
+                verdict, expires_at = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    self.misses += 1
+                    results.append(None)
+                    continue
+
+                self._entries.move_to_end(key)
+                self.hits += 1
+                hits += 1
+                results.append(verdict)
+        for listener in self.listeners:
+            listener(hits, len(values) - hits)
+        return results
+
+    def put_many(self, values, verdicts, model_version):
+        """Store verdicts computed with ``model_version``.
+
+        Verdicts from a model that is no longer current are discarded.
+        """
+        if self.max_entries <= 0:
+            return
+
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            if model_version != self.model_version:
+                return
+
+            for value, verdict in zip(values, verdicts):
+                key = self.make_key(value)
+                self._entries[key] = (verdict, expires_at)
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all cached verdicts"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return cache size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'model_version': self.model_version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,147 @@
+import os
+from contextlib import nullcontext
+import numpy as np
+import joblib
+from verdict_cache import VerdictCache
+from xss_scorer import build_scorer
+from prefilter import Prefilter
+from model_bundle import model_fingerprint, load_bundle
+
+# Model artifact paths
+VECTORIZER_PATH = 'models/vectorizer.pkl'
+MODEL_PATH = 'models/naive_bayes_model.pkl'
+
+# Minimum model confidence for an 'attack' label to block a request
+ATTACK_CONFIDENCE_THRESHOLD = 0.75
+
+# Maximum number of records accepted by /predict/batch
+MAX_BATCH_SIZE = 1000
+
+def load_scorer(backend='sklearn', vectorizer_path=VECTORIZER_PATH, model_path=MODEL_PATH, bundle_path=None):
+    """Load the XSS scorer from a memory-mapped bundle or the pickled artifacts.
+
+    Returns ``(scorer, model_version)``. Bundles hold the native scorer's
+    arrays only, so they require the 'native' backend.
+    """
+    if bundle_path:
+        if backend != 'native':
+            raise ValueError(f"Model bundles only support the 'native' scorer backend, not '{backend}'")
+        scorer, manifest = load_bundle(bundle_path)
+        return scorer, manifest['model_version']
+
+    vectorizer = joblib.load(vectorizer_path)
+    model = joblib.load(model_path)
+    return build_scorer(vectorizer, model, backend), model_fingerprint(vectorizer_path, model_path)
+
+class XssDetector:
+    """Prefilter -> verdict cache -> model cascade for user-data fields"""
+
+    def __init__(self, prefilter, verdict_cache, backend='sklearn',
+                 vectorizer_path=VECTORIZER_PATH, model_path=MODEL_PATH, bundle_path=None):
+        self.prefilter = prefilter
+        self.verdict_cache = verdict_cache
+        self.backend = backend
+        self.vectorizer_path = vectorizer_path
+        self.model_path = model_path
+        self.bundle_path = bundle_path
+        self.scorer = None
+        self.model_version = None
+
+    def load_models(self):
+        """Load the XSS scorer, invalidating cached verdicts if the model changed"""
+        self.scorer, self.model_version = load_scorer(
+            self.backend, self.vectorizer_path, self.model_path, self.bundle_path
+        )
+        self.verdict_cache.set_model_version(self.model_version)
+
+    def score_values(self, values, timer=None):
+        """Score a list of strings through the prefilter -> model cascade.
+
+        Returns the predicted labels, their confidences and the stage that decided
+        each value ('prefilter' or 'model') as lists aligned with ``values``.
+        Values the prefilter cannot decide are looked up in the verdict cache; only
+        the remaining distinct values reach the scorer, in a single pass, and the
+        label is taken from the probabilities. Given a ``StageTimer``, the
+        scorer's 'vectorize' and 'model' steps are timed on it.
+        """
+        verdicts = [self.prefilter.classify(value) for value in values]
+        stages = ['prefilter' if verdict is not None else 'model' for verdict in verdicts]
+        undecided = [value for value, verdict in zip(values, verdicts) if verdict is None]
+        if undecided:
+            cached = dict(zip(undecided, self.verdict_cache.get_many(undecided)))
+            missing = [value for value, verdict in cached.items() if verdict is None]
+            if missing:
+                scorer, scored_version = self.scorer, self.model_version
+                with timer.stage('vectorize') if timer else nullcontext():
+                    vectors = scorer.vectorize(missing)
+                with timer.stage('model') if timer else nullcontext():
+                    probabilities = scorer.predict_proba_vectors(vectors)
+                labels = scorer.classes_[np.argmax(probabilities, axis=1)]
+                confidences = np.max(probabilities, axis=1)
+                scored = list(zip(labels.tolist(), confidences.tolist()))
+                self.verdict_cache.put_many(missing, scored, scored_version)
+                cached.update(zip(missing, scored))
+            verdicts = [verdict if verdict is not None else cached[value] for value, verdict in zip(values, verdicts)]
+
+        labels = [label for label, _ in verdicts]
+        confidences = [confidence for _, confidence in verdicts]
+        return labels, confidences, stages
+
+    def find_blocked_fields(self, records, timer=None):
+        """Return (field_name, confidence, stage) for the first blocked field of every record.
+
+        All non-empty fields of all records are scored in one pass. Records where
+        every field is safe get (None, None, stage), where stage is 'model' if any
+        of their fields needed the model and 'prefilter' otherwise.
+        """
+        positions = []
+        values = []
+        for index, fields_to_check in enumerate(records):
+            for field_name, field_value in fields_to_check.items():
+                if field_value:
+                    positions.append((index, field_name))
+                    values.append(field_value)
+
+        verdicts = [(None, None, 'prefilter')] * len(records)
+        if not values:
+            return verdicts
+
+        labels, confidences, stages = self.score_values(values, timer)
+        for (index, field_name), label, confidence, stage in zip(positions, labels, confidences, stages):
+            if verdicts[index][0] is not None:
+                continue
+            if label == 'attack' and confidence > ATTACK_CONFIDENCE_THRESHOLD:
+                verdicts[index] = (field_name, float(confidence), stage)
+            elif stage == 'model':
+                verdicts[index] = (None, None, 'model')
+        return verdicts
+
+    def find_blocked_field(self, fields_to_check, timer=None):
+        """Return (field_name, confidence, stage) of the first field flagged as an attack.
+
+        Empty fields are skipped. field_name and confidence are None when every
+        field is safe.
+        """
+        return self.find_blocked_fields([fields_to_check], timer)[0]
+
+def create_detector():
+    """Build and load the detector configured by environment variables"""
+    # Directory written by model_bundle.py; unset to load the pickled artifacts
+    bundle_path = os.getenv('XSS_MODEL_BUNDLE') or None
+    detector = XssDetector(
+        # Deterministic cascade stage ahead of the model; either shortcut can be disabled
+        prefilter=Prefilter(
+            benign_shortcut=os.getenv('PREFILTER_BENIGN_SHORTCUT', 'true').lower() in ('1', 'true', 'yes'),
+            attack_shortcut=os.getenv('PREFILTER_ATTACK_SHORTCUT', 'true').lower() in ('1', 'true', 'yes')
+        ),
+        # Cache of per-value XSS verdicts, invalidated whenever the model changes
+        verdict_cache=VerdictCache(
+            max_entries=int(os.getenv('VERDICT_CACHE_SIZE', '10000')),
+            ttl_seconds=float(os.getenv('VERDICT_CACHE_TTL', '3600'))
+        ),
+        # XSS scoring backend: 'sklearn' (fitted pipeline) or 'native' (flat-array scorer)
+        backend=os.getenv('XSS_SCORER_BACKEND', 'native' if bundle_path else 'sklearn'),
+        bundle_path=bundle_path
+    )
+    detector.load_models()
+    return detector
@@ -0,0 +1,202 @@
+import re
+import zlib
+import numpy as np
+
+# Same whitespace normalisation as sklearn's char analyzer
+_WHITE_SPACES = re.compile(r"\s\s+")
+
+class SklearnScorer:
+    """Scores strings with the fitted sklearn vectorizer/model pair"""
+
+    backend = 'sklearn'
+
+    def __init__(self, vectorizer, model):
+        self.vectorizer = vectorizer
+        self.model = model
+        self.classes_ = model.classes_
+
+    def vectorize(self, values):
+        """TF-IDF feature matrix of the strings"""
+        return self.vectorizer.transform(values)
+
+    def predict_proba_vectors(self, vectors):
+        """Class probabilities for the output of ``vectorize``"""
+        return self.model.predict_proba(vectors)
+
+    def predict_proba(self, values):
+        """Class probabilities for each string, shape (len(values), n_classes)"""
+        return self.predict_proba_vectors(self.vectorize(values))
+
+class NativeScorer:
+    """Char n-gram TF-IDF + MultinomialNB scorer on flat NumPy arrays.
+
+    The vocabulary is an open-addressing hash table: ``slot_features`` maps a
+    crc32 slot to a feature index (-1 when empty), and each feature's UTF-8 key
+    is stored in ``key_blob`` between consecutive ``key_offsets`` so lookups are
+    exact. ``weights`` holds ``feature_log_prob_`` transposed to
+    (n_features, n_classes) so a document's scores are a single gather + dot.
+    """
+
+    backend = 'native'
+
+    def __init__(self, slot_features, feature_hashes, key_offsets, key_blob,
+                 idf, weights, class_log_prior, classes, ngram_range, lowercase=True):
+        self.slot_features = slot_features
+        self.feature_hashes = feature_hashes
+        self.key_offsets = key_offsets
+        self.key_blob = key_blob
+        self.idf = idf
+        self.weights = weights
+        self.class_log_prior = class_log_prior
+        self.classes_ = classes
+        self.ngram_range = tuple(int(n) for n in ngram_range)
+        self.lowercase = bool(lowercase)
+
+        # memoryviews give fast scalar access from the lookup loop. They read the
+        # arrays in place, so memory-mapped bundle pages stay shared between workers
+        self._mask = len(slot_features) - 1
+        self._slots = memoryview(slot_features)
+        self._hashes = memoryview(feature_hashes)
+        self._offsets = memoryview(key_offsets)
+        self._blob = memoryview(key_blob)
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, model):
+        """Build a scorer from a fitted char TfidfVectorizer and MultinomialNB"""
+        unsupported = (
+            vectorizer.analyzer != 'char' or
+            vectorizer.preprocessor is not None or
+            vectorizer.strip_accents is not None or
+            vectorizer.binary or
+            vectorizer.sublinear_tf or
+            not vectorizer.use_idf or
+            vectorizer.norm != 'l2' or
+            vectorizer.input != 'content'
+        )
+        if unsupported:
+            raise ValueError("Native scorer only supports char TF-IDF with l2 norm and idf weighting")
+
+        vocabulary = vectorizer.vocabulary_
+        n_features = len(vocabulary)
+        keys = [None] * n_features
+        for gram, index in vocabulary.items():
+            keys[index] = gram.encode('utf-8', 'surrogatepass')
+
+        key_offsets = np.zeros(n_features + 1, dtype=np.int64)
+        key_offsets[1:] = np.cumsum([len(key) for key in keys])
+        key_blob = np.frombuffer(b''.join(keys), dtype=np.uint8).copy()
+        feature_hashes = np.array([zlib.crc32(key) for key in keys], dtype=np.uint32)
+
+        # Power-of-two table at most half full keeps probe chains short
+        capacity = 1
+        while capacity < 2 * n_features:
+            capacity *= 2
+        slot_features = np.full(capacity, -1, dtype=np.int32)
+        mask = capacity - 1
+        for index, key_hash in enumerate(feature_hashes.tolist()):
+            slot = key_hash & mask
+            while slot_features[slot] >= 0:
+                slot = (slot + 1) & mask
+            slot_features[slot] = index
+
+        return cls(
+            slot_features=slot_features,
+            feature_hashes=feature_hashes,
+            key_offsets=key_offsets,
+            key_blob=key_blob,
+            idf=np.ascontiguousarray(vectorizer.idf_, dtype=np.float64),
+            weights=np.ascontiguousarray(model.feature_log_prob_.T, dtype=np.float64),
+            class_log_prior=np.ascontiguousarray(model.class_log_prior_, dtype=np.float64),
+            classes=np.asarray(model.classes_),
+            ngram_range=vectorizer.ngram_range,
+            lowercase=vectorizer.lowercase
+        )
+
+    def _count_features(self, text):
+        """Map feature index -> n-gram count for one document"""
+        if self.lowercase:
+            text = text.lower()
+        text = _WHITE_SPACES.sub(" ", text)
+
+        # Bind the table locally; this loop is the hot path
+        slots, hashes, offsets, blob = self._slots, self._hashes, self._offsets, self._blob
+        mask = self._mask
+        crc32 = zlib.crc32
+
+        counts = {}
+        min_n, max_n = self.ngram_range
+        text_len = len(text)
+        for n in range(min_n, min(max_n, text_len) + 1):
+            for i in range(text_len - n + 1):
+                key = text[i:i + n].encode('utf-8', 'surrogatepass')
+                key_hash = crc32(key)
+                slot = key_hash & mask
+                while True:
+                    index = slots[slot]
+                    if index < 0:
+                        break
+                    if hashes[index] == key_hash and blob[offsets[index]:offsets[index + 1]] == key:
+                        counts[index] = counts.get(index, 0) + 1
+                        break
+                    slot = (slot + 1) & mask
+        return counts
+
+    def vectorize(self, values):
+        """l2-normalised TF-IDF entries of the strings as ``(n_rows, rows, indices, tfidf)``"""
+        rows = []
+        indices = []
+        counts = []
+        for row, text in enumerate(values):
+            document_counts = self._count_features(text)
+            rows.extend([row] * len(document_counts))
+            indices.extend(document_counts.keys())
+            counts.extend(document_counts.values())
+
+        n_rows = len(values)
+        if not indices:
+            return n_rows, None, None, None
+
+        # TF-IDF weight and l2 norm of every (document, feature) entry at once
+        rows = np.array(rows, dtype=np.int64)
+        indices = np.array(indices, dtype=np.int64)
+        tfidf = np.array(counts, dtype=np.float64) * self.idf[indices]
+        norms = np.sqrt(np.bincount(rows, weights=tfidf * tfidf, minlength=n_rows))
+        tfidf /= norms[rows]
+        return n_rows, rows, indices, tfidf
+
+    def _joint_log_likelihood_vectors(self, vectors):
+        n_rows, rows, indices, tfidf = vectors
+        jll = np.tile(self.class_log_prior, (n_rows, 1))
+        if indices is None:
+            return jll
+
+        contributions = self.weights[indices] * tfidf[:, np.newaxis]
+        for column in range(jll.shape[1]):
+            jll[:, column] += np.bincount(rows, weights=contributions[:, column], minlength=n_rows)
+        return jll
+
+    def joint_log_likelihood(self, values):
+        """Unnormalised class log-likelihoods, shape (len(values), n_classes)"""
+        return self._joint_log_likelihood_vectors(self.vectorize(values))
+
+    def predict_proba_vectors(self, vectors):
+        """Class probabilities for the output of ``vectorize``"""
+        jll = self._joint_log_likelihood_vectors(vectors)
+        top = jll.max(axis=1, keepdims=True)
+        log_prob_x = top + np.log(np.exp(jll - top).sum(axis=1, keepdims=True))
+        return np.exp(jll - log_prob_x)
+
+    def predict_proba(self, values):
+        """Class probabilities for each string, shape (len(values), n_classes)"""
+        return self.predict_proba_vectors(self.vectorize(values))
+
+# Serving backends selectable with XSS_SCORER_BACKEND
+SCORER_BACKENDS = ('sklearn', 'native')
+
+def build_scorer(vectorizer, model, backend='sklearn'):
+    """Create the scorer for the requested serving backend"""
+    if backend == 'sklearn':
+        return SklearnScorer(vectorizer, model)
+    if backend == 'native':
+        return NativeScorer.from_sklearn(vectorizer, model)
+    raise ValueError(f"Unknown scorer backend '{backend}' - expected one of {', '.join(SCORER_BACKENDS)}")
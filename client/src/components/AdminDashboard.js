@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 
 const AdminDashboard = () => {
@@ -9,6 +9,28 @@ const AdminDashboard = () => {
     const [filter, setFilter] = useState('all');
     const [timeRange, setTimeRange] = useState('all');
     const [searchQuery, setSearchQuery] = useState('');
+    const [streamError, setStreamError] = useState('');
+
+    const [nextCursor, setNextCursor] = useState(null);
+
+    // Filtering and paging happen on the server so only one page is transferred.
+    // Pages come newest first; "Load more" appends older ones.
+    const buildLogParams = (cursor) => {
+        const params = { limit: 100 };
+        if (filter !== 'all') params.status = filter;
+        const hours = { '1h': 1, '24h': 24, '7d': 168 }[timeRange];
+        if (hours) params.since = new Date(Date.now() - hours * 60 * 60 * 1000).toISOString();
+        if (cursor) params.cursor = cursor;
+        return params;
+    };
+
+    // Counts come from the server's audit store for the selected range
+    const buildStatsParams = () => {
+        if (timeRange === '1h') return { resolution: 'minute', window: 3600 };
+        if (timeRange === '24h') return { resolution: 'minute', window: 24 * 3600 };
+        if (timeRange === '7d') return { resolution: 'hour', window: 7 * 24 * 3600 };
+        return { resolution: 'hour', window: 'all' };
+    };
 
     const fetchData = async () => {
         setLoading(true);
@@ -17,16 +39,19 @@ const AdminDashboard = () => {
 
         try {
             const [statsResponse, logsResponse] = await Promise.all([
-                axios.get('http://localhost:5002/admin/dashboard', {
-                    headers: { Authorization: `Bearer ${token}` }
+                axios.get('http://localhost:5002/admin/stats', {
+                    headers: { Authorization: `Bearer ${token}` },
+                    params: buildStatsParams()
                 }),
                 axios.get('http://localhost:5002/admin/logs', {
-                    headers: { Authorization: `Bearer ${token}` }
+                    headers: { Authorization: `Bearer ${token}` },
+                    params: buildLogParams()
                 })
             ]);
 
             setStats(statsResponse.data);
             setLogs(logsResponse.data.logs);
+            setNextCursor(logsResponse.data.next_cursor);
         } catch (error) {
             setError(error.response?.data?.error || 'Failed to fetch data');
         } finally {
@@ -34,31 +59,120 @@ const AdminDashboard = () => {
         }
     };
 
+    const fetchStats = async () => {
+        const token = localStorage.getItem('adminToken');
+        try {
+            const response = await axios.get('http://localhost:5002/admin/stats', {
+                headers: { Authorization: `Bearer ${token}` },
+                params: buildStatsParams()
+            });
+            setStats(response.data);
+        } catch (error) {
+            setError(error.response?.data?.error || 'Failed to fetch stats');
+        }
+    };
+
+    const fetchMoreLogs = async () => {
+        const token = localStorage.getItem('adminToken');
+        try {
+            const response = await axios.get('http://localhost:5002/admin/logs', {
+                headers: { Authorization: `Bearer ${token}` },
+                params: buildLogParams(nextCursor)
+            });
+            setLogs(previous => [...previous, ...response.data.logs]);
+            setNextCursor(response.data.next_cursor);
+        } catch (error) {
+            setError(error.response?.data?.error || 'Failed to fetch logs');
+        }
+    };
+
     useEffect(() => {
         fetchData();
-        // Set up auto-refresh every 30 seconds
-        const interval = setInterval(fetchData, 30000);
+        // Stats are counted by the server; log entries arrive over the stream below
+        const interval = setInterval(fetchStats, 30000);
         return () => clearInterval(interval);
+    }, [filter, timeRange]);
+
+    // The stream below stays open across filter changes, so it reads the current ones through refs
+    const filterRef = useRef(filter);
+    const fetchDataRef = useRef(fetchData);
+    filterRef.current = filter;
+    fetchDataRef.current = fetchData;
+
+    // New decisions are pushed over /admin/stream instead of re-polling the logs.
+    // EventSource cannot send the Authorization header, so the stream is read with fetch.
+    // One stream is kept open for the page: the server caps open streams per worker.
+    useEffect(() => {
+        const controller = new AbortController();
+        const token = localStorage.getItem('adminToken');
+        let retryTimer = null;
+        let retryDelay = 1000;
+
+        const handleEvent = (type, data) => {
+            if (type === 'lagged') {
+                // Some decisions were dropped for this tab; reload the page of logs
+                fetchDataRef.current();
+                return;
+            }
+            const entry = JSON.parse(data);
+            if (filterRef.current !== 'all' && entry.status !== filterRef.current) return;
+            // The list is newest first, so new decisions go on top
+            setLogs(previous => [entry, ...previous]);
+        };
+
+        const readStream = async () => {
+            const response = await fetch('http://localhost:5002/admin/stream', {
+                headers: { Authorization: `Bearer ${token}` },
+                signal: controller.signal
+            });
+            if (!response.ok || !response.body) {
+                const body = await response.json().catch(() => ({}));
+                throw new Error(body.error || `HTTP ${response.status}`);
+            }
+            setStreamError('');
+            retryDelay = 1000;
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            for (;;) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const messages = buffer.split('\n\n');
+                buffer = messages.pop();
+                messages.forEach(message => {
+                    let type = 'message';
+                    let data = '';
+                    message.split('\n').forEach(line => {
+                        if (line.startsWith('event: ')) type = line.slice(7);
+                        else if (line.startsWith('data: ')) data += line.slice(6);
+                    });
+                    if (data) handleEvent(type, data);
+                });
+            }
+            throw new Error('connection closed');
+        };
+
+        // Reconnect with exponential backoff, up to 30 seconds apart, until the page is left
+        const connect = () => {
+            readStream().catch(error => {
+                if (controller.signal.aborted) return;
+                setStreamError(`Live updates unavailable (${error.message}), retrying in ${retryDelay / 1000}s`);
+                retryTimer = setTimeout(connect, retryDelay);
+                retryDelay = Math.min(retryDelay * 2, 30000);
+            });
+        };
+
+        connect();
+        return () => {
+            controller.abort();
+            clearTimeout(retryTimer);
+        };
     }, []);
 
-    const filteredLogs = logs.filter(log => {
-        const matchesFilter = filter === 'all' || log.type === filter;
-        const matchesSearch = searchQuery === '' || 
-            log.message.toLowerCase().includes(searchQuery.toLowerCase());
-        
-        if (timeRange === 'all') return matchesFilter && matchesSearch;
-        
-        const logDate = new Date(log.timestamp);
-        const now = new Date();
-        const hoursDiff = (now - logDate) / (1000 * 60 * 60);
-        
-        switch (timeRange) {
-            case '1h': return hoursDiff <= 1 && matchesFilter && matchesSearch;
-            case '24h': return hoursDiff <= 24 && matchesFilter && matchesSearch;
-            case '7d': return hoursDiff <= 168 && matchesFilter && matchesSearch;
-            default: return matchesFilter && matchesSearch;
-        }
-    });
+    const filteredLogs = logs.filter(log =>
+        searchQuery === '' || log.message.toLowerCase().includes(searchQuery.toLowerCase())
+    );
 
     if (loading) {
         return (
@@ -78,19 +192,25 @@ const AdminDashboard = () => {
                 </div>
             )}
 
+            {streamError && (
+                <div className="bg-yellow-100 border border-yellow-400 text-yellow-700 px-4 py-3 rounded relative mb-4">
+                    {streamError}
+                </div>
+            )}
+
             {/* Stats Grid */}
             <div className="grid grid-cols-1 md:grid-cols-3 gap-6 mb-8">
                 <div className="bg-white rounded-lg shadow p-6">
                     <h3 className="text-lg font-medium text-gray-900">Total Logs</h3>
-                    <p className="text-3xl font-bold text-indigo-600">{stats?.total_predictions || 0}</p>
+                    <p className="text-3xl font-bold text-indigo-600">{stats?.totals.total_transactions || 0}</p>
                 </div>
                 <div className="bg-white rounded-lg shadow p-6">
                     <h3 className="text-lg font-medium text-gray-900">Attacks Detected</h3>
-                    <p className="text-3xl font-bold text-red-600">{stats?.attack_predictions || 0}</p>
+                    <p className="text-3xl font-bold text-red-600">{stats?.totals.blocked_transactions || 0}</p>
                 </div>
                 <div className="bg-white rounded-lg shadow p-6">
                     <h3 className="text-lg font-medium text-gray-900">Safe Transactions</h3>
-                    <p className="text-3xl font-bold text-green-600">{stats?.safe_predictions || 0}</p>
+                    <p className="text-3xl font-bold text-green-600">{stats?.totals.successful_transactions || 0}</p>
                 </div>
             </div>
 
@@ -103,8 +223,9 @@ const AdminDashboard = () => {
                         className="rounded-md border-gray-300 shadow-sm focus:border-indigo-500 focus:ring-indigo-500"
                     >
                         <option value="all">All Types</option>
-                        <option value="XSS Attack">Attacks</option>
-                        <option value="Blockchain Transaction">Transactions</option>
+                        <option value="Blocked">Attacks</option>
+                        <option value="Success">Transactions</option>
+                        <option value="Failed">Failed</option>
                     </select>
 
                     <select
@@ -141,7 +262,7 @@ const AdminDashboard = () => {
                                     Type
                                 </th>
                                 <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
-                                    Level
+                                    Status
                                 </th>
                                 <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                                     Message
@@ -156,7 +277,7 @@ const AdminDashboard = () => {
                                     </td>
                                     <td className="px-6 py-4 whitespace-nowrap">
                                         <span className={`px-2 inline-flex text-xs leading-5 font-semibold rounded-full ${
-                                            log.type === 'XSS Attack' 
+                                            log.type === 'Security Alert'
                                                 ? 'bg-red-100 text-red-800'
                                                 : 'bg-green-100 text-green-800'
                                         }`}>
@@ -164,7 +285,7 @@ const AdminDashboard = () => {
                                         </span>
                                     </td>
                                     <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
-                                        {log.level}
+                                        {log.status}
                                     </td>
                                     <td className="px-6 py-4 text-sm text-gray-900">
                                         {log.message}
@@ -174,6 +295,16 @@ const AdminDashboard = () => {
                         </tbody>
                     </table>
                 </div>
+                {nextCursor && (
+                    <div className="px-6 py-4 border-t border-gray-200 text-center">
+                        <button
+                            onClick={fetchMoreLogs}
+                            className="text-sm font-medium text-indigo-600 hover:text-indigo-800"
+                        >
+                            Load more
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );